@@ -8,17 +8,24 @@ from alembic import context
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
 SRC_DIR = BASE_DIR / 'src'
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
 
-from infrastructure.settings import get_settings 
-from infrastructure.db import Base 
-from infrastructure import models  
+if "src.infrastructure.db" in sys.modules:
+    # Invoked in-process by the API (src.infrastructure.migrations); reuse loaded modules
+    from src.infrastructure.settings import get_settings
+    from src.infrastructure.db import Base
+    from src.infrastructure import models
+else:
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+    from infrastructure.settings import get_settings 
+    from infrastructure.db import Base 
+    from infrastructure import models  
 
 config = context.config
 
 # Interpret the config file for Python logging. This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped for in-process runs so the application's logging config is left alone.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # Provide metadata for 'autogenerate'
@@ -41,6 +48,16 @@ def run_migrations_offline():
 
 
 def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
     connectable = create_engine(DB_URL, poolclass=pool.NullPool, future=True)
     with connectable.connect() as connection:
         context.configure(
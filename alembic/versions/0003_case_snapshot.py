@@ -0,0 +1,109 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0003_case_snapshot'
+down_revision = '0002_add_extraction_jobs'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+_SNAPSHOT = sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql')
+
+# Lightweight table definitions: the migration must not depend on the current ORM models
+cases = sa.table(
+    'cases',
+    sa.column('case_id', sa.String),
+    sa.column('resume', sa.Text),
+    sa.column('snapshot', _SNAPSHOT),
+)
+timeline_events = sa.table(
+    'timeline_events',
+    sa.column('case_id', sa.String),
+    sa.column('event_id', sa.Integer),
+    sa.column('event_name', sa.String),
+    sa.column('event_description', sa.Text),
+    sa.column('event_date', sa.String),
+    sa.column('event_page_init', sa.Integer),
+    sa.column('event_page_end', sa.Integer),
+)
+evidences = sa.table(
+    'evidences',
+    sa.column('case_id', sa.String),
+    sa.column('evidence_id', sa.Integer),
+    sa.column('evidence_name', sa.String),
+    sa.column('evidence_flaw', sa.Text),
+    sa.column('evidence_page_init', sa.Integer),
+    sa.column('evidence_page_end', sa.Integer),
+)
+
+
+def upgrade():
+    op.add_column('cases', sa.Column('snapshot', _SNAPSHOT, nullable=True))
+    context = op.get_context()
+    if context.as_sql:
+        # Offline SQL has no rows to read; cases with a NULL snapshot fall back to the normalized read
+        return
+    if getattr(context, '_in_external_transaction', False):
+        # The caller owns the transaction (migrations run on its connection): it cannot be committed here
+        backfill(op.get_bind())
+        return
+    # Commit the new column, then let every batch commit as it goes: no transaction spans
+    # the whole table, and an interrupted backfill keeps its progress (re-runs skip filled rows)
+    with context.autocommit_block():
+        backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cases') as batch:
+        batch.drop_column('snapshot')
+
+
+def _children(bind, table, id_column: str, case_ids: list[str]) -> dict[str, list[dict]]:
+    grouped: dict[str, list[dict]] = {case_id: [] for case_id in case_ids}
+    stmt = (
+        sa.select(*table.c)
+        .where(table.c.case_id.in_(case_ids))
+        .order_by(table.c.case_id, table.c[id_column])
+    )
+    for row in bind.execute(stmt).mappings():
+        record = dict(row)
+        grouped[record.pop('case_id')].append(record)
+    return grouped
+
+
+def backfill(bind, batch_size: int = BATCH_SIZE) -> int:
+    """Write snapshots for cases that have none, ``batch_size`` cases at a time.
+
+    Keyset-paginated on case_id, so memory stays bounded by one batch and the
+    function can be re-run (only NULL snapshots are touched).
+    """
+    update = (
+        cases.update()
+        .where(cases.c.case_id == sa.bindparam('b_case_id'))
+        .values(snapshot=sa.bindparam('b_snapshot', type_=_SNAPSHOT))
+    )
+    last, total = '', 0
+    while True:
+        rows = bind.execute(
+            sa.select(cases.c.case_id, cases.c.resume)
+            .where(cases.c.snapshot.is_(None), cases.c.case_id > last)
+            .order_by(cases.c.case_id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        case_ids = [row.case_id for row in rows]
+        timeline = _children(bind, timeline_events, 'event_id', case_ids)
+        evidence = _children(bind, evidences, 'evidence_id', case_ids)
+        bind.execute(update, [
+            {
+                'b_case_id': row.case_id,
+                'b_snapshot': {'resume': row.resume, 'timeline': timeline[row.case_id], 'evidence': evidence[row.case_id]},
+            }
+            for row in rows
+        ])
+        total += len(rows)
+        last = case_ids[-1]
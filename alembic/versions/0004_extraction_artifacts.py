@@ -0,0 +1,28 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004_extraction_artifacts'
+down_revision = '0003_case_snapshot'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'extraction_artifacts',
+        sa.Column('id', sa.String(length=50), primary_key=True),
+        sa.Column('case_id', sa.String(length=100), index=True, nullable=False),
+        sa.Column('job_id', sa.String(length=50), index=True, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=True),
+        sa.Column('prompt_sha256', sa.String(length=64), nullable=False),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('validation_error', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('encoding', sa.String(length=10), nullable=False),
+        sa.Column('raw_bytes', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table('extraction_artifacts')
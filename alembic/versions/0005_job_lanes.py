@@ -0,0 +1,19 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005_job_lanes'
+down_revision = '0004_extraction_artifacts'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('extraction_jobs', sa.Column('lane', sa.String(length=20), nullable=False, server_default='async'))
+    op.add_column('extraction_jobs', sa.Column('api_key_id', sa.String(length=64), nullable=True))
+    op.create_index('ix_extraction_jobs_api_key_id', 'extraction_jobs', ['api_key_id'])
+
+def downgrade():
+    op.drop_index('ix_extraction_jobs_api_key_id', table_name='extraction_jobs')
+    with op.batch_alter_table('extraction_jobs') as batch:
+        batch.drop_column('api_key_id')
+        batch.drop_column('lane')
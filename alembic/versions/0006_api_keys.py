@@ -0,0 +1,23 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006_api_keys'
+down_revision = '0005_job_lanes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'api_keys',
+        sa.Column('key_id', sa.String(length=16), primary_key=True),
+        sa.Column('key_sha256', sa.String(length=64), nullable=False, unique=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('rate_limit_per_min', sa.Integer(), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+def downgrade():
+    op.drop_table('api_keys')
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007_usage_metering'
+down_revision = '0006_api_keys'
+branch_labels = None
+depends_on = None
+
+_COUNT = dict(nullable=False, server_default='0')
+
+def upgrade():
+    op.create_table(
+        'usage_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, index=True),
+        sa.Column('api_key_id', sa.String(length=16), nullable=False, index=True),
+        sa.Column('case_id', sa.String(length=100), nullable=False),
+        sa.Column('job_id', sa.String(length=50), nullable=True),
+        sa.Column('lane', sa.String(length=20), nullable=True),
+        sa.Column('model', sa.String(length=100), nullable=True),
+        sa.Column('outcome', sa.String(length=20), nullable=False),
+        sa.Column('coalesced', sa.String(length=10), nullable=True),
+        sa.Column('pdf_bytes', sa.BigInteger(), **_COUNT),
+        sa.Column('pdf_pages', sa.Integer(), **_COUNT),
+        sa.Column('prompt_tokens', sa.Integer(), **_COUNT),
+        sa.Column('output_tokens', sa.Integer(), **_COUNT),
+        sa.Column('total_tokens', sa.Integer(), **_COUNT),
+        sa.Column('cached_tokens', sa.Integer(), **_COUNT),
+        sa.Column('stage_ms', sa.JSON(), nullable=True),
+    )
+    op.create_table(
+        'usage_daily',
+        sa.Column('api_key_id', sa.String(length=16), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('extractions', sa.Integer(), **_COUNT),
+        sa.Column('failed', sa.Integer(), **_COUNT),
+        sa.Column('coalesced', sa.Integer(), **_COUNT),
+        *[
+            sa.Column(name, sa.BigInteger(), **_COUNT)
+            for name in ('pdf_bytes', 'pdf_pages', 'prompt_tokens', 'output_tokens', 'total_tokens', 'cached_tokens', 'llm_ms')
+        ],
+    )
+
+def downgrade():
+    op.drop_table('usage_daily')
+    op.drop_table('usage_events')
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0008_case_pdf_profile'
+down_revision = '0007_usage_metering'
+branch_labels = None
+depends_on = None
+
+_PROFILE = sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql')
+
+def upgrade():
+    op.add_column('cases', sa.Column('pdf_profile', _PROFILE, nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('cases') as batch:
+        batch.drop_column('pdf_profile')
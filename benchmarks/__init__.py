@@ -0,0 +1,4 @@
+"""Offline micro-benchmarks for CPU-bound components (parsing, validation, persistence).
+
+Run with ``python -m benchmarks``; see the "Benchmarks" section of the top-level ``README.md``.
+"""
@@ -0,0 +1,76 @@
+"""CLI: ``python -m benchmarks [--filter NAME] [--quick] [--save-baseline]``.
+
+Compares medians against ``benchmarks/baseline.json`` and prints a report;
+``--fail-on-regression`` exits non-zero when any benchmark is slower than
+``--threshold`` times its baseline.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from . import harness
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _registries():
+    from .components import REGISTRY as components
+
+    return [components]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--filter", help="substring to select benchmarks")
+    parser.add_argument("--quick", action="store_true", help="short runs (smoke test, noisy numbers)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--output", help="write this run's results as JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio counted as regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    selected = [b for reg in _registries() for b in reg.select(args.filter)]
+    if args.list:
+        for bench in selected:
+            print(f"{bench.group:<14} {bench.name}")
+        return 0
+    if not selected:
+        print("no benchmarks selected", file=sys.stderr)
+        return 2
+
+    min_time, repeats = (0.01, 3) if args.quick else (0.2, 5)
+    results = harness.run(selected, min_time=min_time, repeats=repeats)
+    document = harness.to_document(results)
+
+    if args.output:
+        harness.save(args.output, document)
+    if args.save_baseline:
+        if args.filter and Path(args.baseline).exists():
+            merged = harness.load(args.baseline)
+            merged["results"].update(document["results"])
+            merged["environment"], merged["created"] = document["environment"], document["created"]
+            document = merged
+        harness.save(args.baseline, document)
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not Path(args.baseline).exists():
+        print(json.dumps(document, indent=2))
+        return 0
+    rows = harness.compare(document, harness.load(args.baseline), threshold=args.threshold)
+    if args.filter:
+        rows = [r for r in rows if r["status"] != "missing"]
+    print(harness.format_report(rows))
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Component benchmarks: JSON salvage, id normalization, validation, serialization, persistence."""
+from __future__ import annotations
+
+import copy
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.application.extract_service import ExtractResponse
+from src.application.extraction_models import CaseExtraction, Event, Evidence, validate_items
+from src.infrastructure.case_repository import CaseRepository
+from src.infrastructure.gemini_client import GeminiClient
+from src.infrastructure.gemini_structured import IncrementalExtractionParser
+from src.infrastructure.json_scan import scan_json
+from src.infrastructure.models import Base
+from src.infrastructure.responses import compress, serialize
+from src.routes.api_router import CaseDetail
+
+from .harness import Registry
+from .synthetic import (
+    brace_heavy_prose,
+    clean_output,
+    fenced_output,
+    make_extraction_dict,
+    truncated_output,
+    unbalanced_braces,
+)
+
+REGISTRY = Registry()
+
+
+def _client() -> GeminiClient:
+    return GeminiClient(api_key="benchmark", model="benchmark")
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+@REGISTRY.add("parse_json_from_text.clean.1k", group="parsing")
+def _parse_clean():
+    client, text = _client(), clean_output(1_000)
+    return lambda: client._parse_json_from_text(text)
+
+
+@REGISTRY.add("parse_json_from_text.fenced.1k", group="parsing")
+def _parse_fenced():
+    client, text = _client(), fenced_output(1_000)
+    return lambda: client._parse_json_from_text(text)
+
+
+def _scan(make_text):
+    def setup():
+        text = make_text()
+        return lambda: scan_json(text)
+
+    return setup
+
+
+for _name, _make in (
+    ("fenced.10k", lambda: fenced_output(10_000)),  # ~3 MB
+    ("truncated.1k", lambda: truncated_output(1_000)),
+    ("truncated.10k", lambda: truncated_output(10_000)),
+    ("adversarial.brace_prose.1mb", lambda: brace_heavy_prose(1 << 20)),
+    ("adversarial.unbalanced.100k", lambda: unbalanced_braces(100_000)),
+):
+    REGISTRY.add(f"scan_json.{_name}", group="parsing")(_scan(_make))
+
+
+@REGISTRY.add("stream_parser.1k.256b_chunks", group="parsing")
+def _stream_parser():
+    text = clean_output(1_000)
+    chunks = [text[i:i + 256] for i in range(0, len(text), 256)]
+
+    def run():
+        parser = IncrementalExtractionParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.finish()
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Normalization / validation
+# ---------------------------------------------------------------------------
+@REGISTRY.add("normalize_ids.1k", group="normalization")
+def _normalize():
+    client, parsed = _client(), make_extraction_dict(1_000)
+    # _normalize_ids rewrites ids in place; re-running on the same dict is idempotent
+    return lambda: client._normalize_ids(parsed)
+
+
+@REGISTRY.add("finalize_parsed.1k", group="normalization")
+def _finalize():
+    client, parsed = _client(), make_extraction_dict(1_000)
+    return lambda: client._finalize_parsed(copy.copy(parsed), raw_text="")
+
+
+@REGISTRY.add("extraction_pipeline.validate.2k", group="validation")
+def _pipeline_validate():
+    """Client validation plus the service's pass-through, persistence model and response."""
+    client, parsed = _client(), make_extraction_dict(2_000)
+
+    def run():
+        out = client._finalize_parsed(copy.copy(parsed), raw_text="")
+        timeline, _ = validate_items(out["timeline"], Event)
+        evidence, _ = validate_items(out["evidence"], Evidence)
+        CaseExtraction.model_construct(resume=out["resume"], timeline=timeline, evidence=evidence)
+        return ExtractResponse.model_construct(resume=out["resume"], timeline=timeline, evidence=evidence, debug=None)
+
+    return run
+
+
+def _validation(n: int):
+    def setup():
+        data = make_extraction_dict(n)
+        return lambda: CaseExtraction(**data)
+
+    return setup
+
+
+for _n, _label in ((10, "10"), (1_000, "1k"), (10_000, "10k")):
+    REGISTRY.add(f"case_extraction_validate.{_label}", group="validation")(_validation(_n))
+
+
+# ---------------------------------------------------------------------------
+# Response serialization
+# ---------------------------------------------------------------------------
+def _case_detail(n: int) -> CaseDetail:
+    extraction = CaseExtraction(**make_extraction_dict(n))
+    return CaseDetail.model_construct(
+        case_id="BENCH-CASE", resume=extraction.resume, timeline=extraction.timeline, evidence=extraction.evidence
+    )
+
+
+@REGISTRY.add("response.case_detail.10k", group="serialization")
+def _serialize_case():
+    detail = _case_detail(10_000)  # ~3.5 MB
+    return lambda: serialize(detail)
+
+
+@REGISTRY.add("response.case_detail.10k.gzip", group="serialization")
+def _compress_case():
+    body = serialize(_case_detail(10_000))
+    return lambda: compress(body, "gzip")
+
+
+# ---------------------------------------------------------------------------
+# Persistence (SQLite in-memory)
+# ---------------------------------------------------------------------------
+def _repository():
+    engine = create_engine("sqlite+pysqlite:///:memory:", poolclass=StaticPool, future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    return CaseRepository(session=session), session
+
+
+def _save(n: int):
+    def setup():
+        repo, _ = _repository()
+        extraction = CaseExtraction(**make_extraction_dict(n))
+        return lambda: repo.save_extraction("BENCH-CASE", extraction)
+
+    return setup
+
+
+for _n, _label in ((100, "100"), (1_000, "1k")):
+    REGISTRY.add(f"repository.save_extraction.{_label}", group="persistence")(_save(_n))
+
+
+@REGISTRY.add("repository.get_case.1k", group="persistence")
+def _get_case():
+    repo, session = _repository()
+    repo.save_extraction("BENCH-CASE", CaseExtraction(**make_extraction_dict(1_000)))
+
+    def run():
+        session.expunge_all()  # force a real read instead of an identity-map hit
+        return repo.get_case("BENCH-CASE")
+
+    return run
+
+
+@REGISTRY.add("repository.list_cases.50x20", group="persistence")
+def _list_cases():
+    repo, session = _repository()
+    extraction = CaseExtraction(**make_extraction_dict(20))
+    for i in range(50):
+        repo.save_extraction(f"BENCH-{i:03d}", extraction)
+
+    def run():
+        session.expunge_all()
+        return repo.list_cases(limit=50)
+
+    return run
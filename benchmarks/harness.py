@@ -0,0 +1,180 @@
+"""Tiny timing harness: calibrated repeats, JSON results, baseline comparison."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import json
+import platform
+import statistics
+import sys
+import time
+
+Setup = Callable[[], Callable[[], Any]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Setup  # returns the zero-arg callable to time (setup cost excluded)
+    group: str = "misc"
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    number: int
+    repeats: int
+    min_us: float
+    median_us: float
+    mean_us: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "group": self.group,
+            "number": self.number,
+            "repeats": self.repeats,
+            "min_us": round(self.min_us, 3),
+            "median_us": round(self.median_us, 3),
+            "mean_us": round(self.mean_us, 3),
+        }
+
+
+@dataclass
+class Registry:
+    benchmarks: List[Benchmark] = field(default_factory=list)
+
+    def add(self, name: str, group: str = "misc") -> Callable[[Setup], Setup]:
+        def decorator(setup: Setup) -> Setup:
+            self.benchmarks.append(Benchmark(name=name, setup=setup, group=group))
+            return setup
+
+        return decorator
+
+    def select(self, pattern: Optional[str]) -> List[Benchmark]:
+        if not pattern:
+            return list(self.benchmarks)
+        return [b for b in self.benchmarks if pattern in b.name]
+
+
+def time_callable(fn: Callable[[], Any], *, min_time: float = 0.2, repeats: int = 5) -> tuple[int, List[float]]:
+    """Calibrate ``number`` so one repeat lasts >= min_time; return per-call seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return number, samples
+
+
+def run(benchmarks: List[Benchmark], *, min_time: float = 0.2, repeats: int = 5, echo: bool = True) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    for bench in benchmarks:
+        fn = bench.setup()
+        number, samples = time_callable(fn, min_time=min_time, repeats=repeats)
+        us = [s * 1e6 for s in samples]
+        results[bench.name] = Result(
+            name=bench.name,
+            group=bench.group,
+            number=number,
+            repeats=repeats,
+            min_us=min(us),
+            median_us=statistics.median(us),
+            mean_us=statistics.fmean(us),
+        )
+        if echo:
+            print(f"  {bench.name:<48} {statistics.median(us):>14.2f} us  (x{number})", file=sys.stderr)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(terse=True),
+    }
+
+
+def to_document(results: Dict[str, Result]) -> Dict[str, Any]:
+    return {
+        "environment": environment(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": {name: r.to_dict() for name, r in sorted(results.items())},
+    }
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save(path: str, document: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(document, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], *, threshold: float = 1.25) -> List[Dict[str, Any]]:
+    """Compare medians; status is regression / improved / ok / new / missing."""
+    rows: List[Dict[str, Any]] = []
+    cur = current.get("results", {})
+    base = baseline.get("results", {})
+    for name in sorted(set(cur) | set(base)):
+        if name not in base:
+            rows.append({"name": name, "status": "new", "current_us": cur[name]["median_us"]})
+            continue
+        if name not in cur:
+            rows.append({"name": name, "status": "missing", "baseline_us": base[name]["median_us"]})
+            continue
+        ratio = cur[name]["median_us"] / max(base[name]["median_us"], 1e-9)
+        status = "ok"
+        if ratio > threshold:
+            status = "regression"
+        elif ratio < 1 / threshold:
+            status = "improved"
+        rows.append(
+            {
+                "name": name,
+                "status": status,
+                "baseline_us": base[name]["median_us"],
+                "current_us": cur[name]["median_us"],
+                "ratio": round(ratio, 3),
+            }
+        )
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    header = f"{'benchmark':<48} {'baseline us':>14} {'current us':>14} {'ratio':>7}  status"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        base = f"{row['baseline_us']:.2f}" if "baseline_us" in row else "-"
+        cur = f"{row['current_us']:.2f}" if "current_us" in row else "-"
+        ratio = f"{row['ratio']:.2f}" if "ratio" in row else "-"
+        lines.append(f"{row['name']:<48} {base:>14} {cur:>14} {ratio:>7}  {row['status']}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "Benchmark",
+    "Registry",
+    "Result",
+    "run",
+    "time_callable",
+    "to_document",
+    "load",
+    "save",
+    "compare",
+    "format_report",
+]
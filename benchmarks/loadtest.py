@@ -0,0 +1,475 @@
+"""End-to-end load generator: ``python -m benchmarks.loadtest``.
+
+Starts the API in-process under uvicorn against SQLite (default) or a local
+Postgres, with the replay LLM client (synthetic cassette, simulated latency)
+and a local static PDF server, then drives an open-loop request mix at a
+target rate. Reports throughput and p50/p95/p99 per route (client side) and
+per pipeline stage (tracing spans), and saves the run as JSON so runs can be
+diffed across releases with ``--compare``.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import argparse
+import asyncio
+import functools
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from . import harness
+from .synthetic import clean_output, make_extraction_dict
+
+ROUTES = ("extract", "extract_async", "cases", "case")
+LOAD_API_KEY = "loadtest-key"
+
+
+@dataclass
+class LoadConfig:
+    rate: float = 10.0  # requests per second (open loop)
+    duration: float = 10.0
+    warmup: float = 0.0
+    mix: Dict[str, float] = field(default_factory=lambda: {"extract": 2, "extract_async": 1, "cases": 3, "case": 4})
+    arrival: str = "poisson"  # poisson | uniform
+    max_in_flight: int = 256  # arrivals beyond this are dropped, not queued
+    timeout: float = 30.0
+    database_url: Optional[str] = None  # default: SQLite file in the work dir
+    llm_latency: str = "lognormal:800,0.4"
+    llm_error_rate: float = 0.0
+    llm_rate_limit_rate: float = 0.0
+    llm_response_mode: str = "text"  # GEMINI_RESPONSE_MODE: text | json | stream
+    n_events: int = 40
+    pdf_pages: int = 20
+    pdf_count: int = 8
+    seed_cases: int = 50
+    seed: int = 7
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """``"extract:2,cases:3"`` -> weights; unknown routes are rejected."""
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route {name!r}; expected one of {ROUTES}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Request mix must have a positive weight")
+    return mix
+
+
+def percentiles(values: List[float]) -> Dict[str, Any]:
+    """Nearest-rank p50/p95/p99 plus mean and max (milliseconds)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    n = len(ordered)
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q * n) - 1)]
+
+    return {
+        "count": n,
+        "mean": round(sum(ordered) / n, 3),
+        "p50": round(rank(0.50), 3),
+        "p95": round(rank(0.95), 3),
+        "p99": round(rank(0.99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Fixtures: PDFs, static server, cassette
+# ---------------------------------------------------------------------------
+def make_pdf(pages: int) -> bytes:
+    """Minimal PDF with ``pages`` page objects (enough for page-count metrics)."""
+    objs = [b"1 0 obj <</Type /Catalog /Pages 2 0 R>> endobj", f"2 0 obj <</Type /Pages /Count {pages}>> endobj".encode()]
+    objs += [f"{i + 3} 0 obj <</Type /Page /Parent 2 0 R>> endobj".encode() for i in range(pages)]
+    return b"%PDF-1.4\n" + b"\n".join(objs) + b"\n%%EOF\n"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@contextmanager
+def static_pdf_server(directory: Path) -> Iterator[str]:
+    """Serve ``directory`` over HTTP on a free port; yields the base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def write_cassette(path: Path, *, n_events: int, entries: int = 5, seed: int = 7) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        for i in range(entries):
+            raw = clean_output(n_events) if i == 0 else json.dumps(make_extraction_dict(n_events, seed=seed + i), ensure_ascii=False)
+            fh.write(json.dumps({"model": "synthetic", "latency_ms": 800.0, "raw_text": raw}, ensure_ascii=False) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# App lifecycle
+# ---------------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _environment(values: Dict[str, str]) -> Iterator[None]:
+    """Apply env vars and rebuild cached settings / engines / singletons built from them."""
+    from src.infrastructure import auth, coalescing, context_cache, gemini_client, metering, scheduler
+    from src.infrastructure.db import dispose_async_engine, dispose_engine
+
+    previous = {k: os.environ.get(k) for k in values}
+
+    def reset() -> None:
+        # Modules bind get_settings at import time; after a settings-module
+        # reload they may hold different cached functions, so clear them all.
+        for module in list(sys.modules.values()):
+            cached = getattr(module, "get_settings", None) if (module.__name__ or "").startswith("src.") else None
+            if hasattr(cached, "cache_clear"):
+                cached.cache_clear()
+        dispose_engine()
+        asyncio.run(dispose_async_engine())
+        gemini_client._replay_singleton = None
+        auth._authenticator = None
+        coalescing._coalescer_singleton = None
+        scheduler._scheduler_singleton = None
+        metering._meter_singleton = None
+        context_cache._context_cache_singleton = None
+
+    os.environ.update(values)
+    reset()
+    try:
+        yield
+    finally:
+        for key, old in previous.items():
+            if old is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = old
+        reset()
+
+
+@contextmanager
+def app_server(port: int) -> Iterator[str]:
+    """Run ``src.main:app`` under uvicorn in a background thread."""
+    import uvicorn
+
+    from src.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False, ws="none"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.02)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+def _seed_cases(count: int, n_events: int) -> List[str]:
+    from src.application.extraction_models import CaseExtraction
+    from src.infrastructure.case_repository import CaseRepository
+
+    repo = CaseRepository()
+    ids = [f"SEED-{i:05d}" for i in range(count)]
+    for i, case_id in enumerate(ids):
+        repo.save_extraction(case_id, CaseExtraction(**make_extraction_dict(n_events, seed=i)))
+    return ids
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+@dataclass
+class Sample:
+    route: str
+    status: int  # 0 = transport error / timeout
+    latency_ms: float
+
+
+class Driver:
+    def __init__(self, base_url: str, pdf_urls: List[str], case_ids: List[str], config: LoadConfig):
+        self.base_url = base_url
+        self.pdf_urls = pdf_urls
+        self.case_ids = case_ids
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.routes = list(config.mix)
+        self.weights = [config.mix[r] for r in self.routes]
+        self._counter = 0
+
+    def _request(self, route: str) -> tuple[str, str, Optional[dict]]:
+        self._counter += 1
+        if route in ("extract", "extract_async"):
+            body = {"pdf_url": self.rng.choice(self.pdf_urls), "case_id": f"LOAD-{self._counter:07d}"}
+            return "POST", "/extract" if route == "extract" else "/extract/async", body
+        if route == "cases":
+            return "GET", f"/cases?limit=20&offset={self.rng.randrange(0, 40)}", None
+        return "GET", f"/cases/{self.rng.choice(self.case_ids)}", None
+
+    async def phase(self, duration: float) -> tuple[List[Sample], int]:
+        import httpx
+
+        samples: List[Sample] = []
+        dropped = 0
+        in_flight: set[asyncio.Task] = set()
+        limits = httpx.Limits(max_connections=self.config.max_in_flight, max_keepalive_connections=self.config.max_in_flight)
+        headers = {"X-API-Key": LOAD_API_KEY}
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.config.timeout, headers=headers) as client:
+
+            async def fire(route: str) -> None:
+                method, path, body = self._request(route)
+                start = time.perf_counter()
+                try:
+                    resp = await client.request(method, path, json=body)
+                    status = resp.status_code
+                except Exception:
+                    status = 0
+                samples.append(Sample(route, status, (time.perf_counter() - start) * 1000))
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            next_at = start
+            while next_at - start < duration:
+                delay = next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                route = self.rng.choices(self.routes, self.weights)[0]
+                if len(in_flight) >= self.config.max_in_flight:
+                    dropped += 1
+                else:
+                    task = asyncio.create_task(fire(route))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                gap = self.rng.expovariate(self.config.rate) if self.config.arrival == "poisson" else 1 / self.config.rate
+                next_at += gap
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        return samples, dropped
+
+
+def summarize(samples: List[Sample], stage_ms: Dict[str, List[float]], *, elapsed: float, dropped: int) -> Dict[str, Any]:
+    routes: Dict[str, Any] = {}
+    for route in sorted({s.route for s in samples}):
+        subset = [s for s in samples if s.route == route]
+        statuses: Dict[str, int] = {}
+        for s in subset:
+            statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        routes[route] = {
+            "requests": len(subset),
+            "errors": sum(1 for s in subset if s.status == 0 or s.status >= 500),
+            "throughput_rps": round(len(subset) / elapsed, 3),
+            "status": statuses,
+            "latency_ms": percentiles([s.latency_ms for s in subset]),
+        }
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(samples),
+        "dropped": dropped,
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+        "routes": routes,
+        "stages": {name: percentiles(values) for name, values in sorted(stage_ms.items())},
+    }
+
+
+def _stage_durations(spans) -> Dict[str, List[float]]:
+    stages: Dict[str, List[float]] = {}
+    for sp in spans:
+        # Server spans ("GET /cases") duplicate the per-route client numbers
+        if sp.duration_ms is None or " " in sp.name:
+            continue
+        stages.setdefault(sp.name, []).append(sp.duration_ms)
+    return stages
+
+
+def run(config: LoadConfig, workdir: Path) -> Dict[str, Any]:
+    """Execute one load test and return the JSON-serialisable report."""
+    from src.infrastructure import metrics
+    from src.infrastructure.tracing import InMemoryExporter, configure_tracing
+
+    pdf_dir = workdir / "pdfs"
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(config.pdf_count):
+        (pdf_dir / f"case-{i}.pdf").write_bytes(make_pdf(config.pdf_pages + i))
+    cassette = workdir / "cassette.jsonl"
+    write_cassette(cassette, n_events=config.n_events, seed=config.seed)
+
+    database_url = config.database_url or f"sqlite:///{workdir / 'loadtest.db'}"
+    sqlite = database_url.startswith("sqlite")
+    env = {
+        "DATABASE_URL": database_url,
+        "DB_STARTUP_MODE": "off" if sqlite else "check",
+        "DB_MIGRATE_ON_STARTUP": "1",
+        "LLM_CLIENT_MODE": "replay",
+        "LLM_CASSETTE_PATH": str(cassette),
+        "REPLAY_LATENCY": config.llm_latency,
+        "REPLAY_ERROR_RATE": str(config.llm_error_rate),
+        "REPLAY_RATE_LIMIT_RATE": str(config.llm_rate_limit_rate),
+        "REPLAY_SEED": str(config.seed),
+        "GEMINI_RESPONSE_MODE": config.llm_response_mode,
+        "API_KEYS": LOAD_API_KEY,
+        "API_RATE_LIMIT_PER_MIN": "0",  # one key drives all the load
+    }
+    exporter = InMemoryExporter()
+    with _environment(env):
+        if sqlite:
+            from src.infrastructure import models  # noqa: F401  (register tables)
+            from src.infrastructure.db import Base, get_engine
+
+            Base.metadata.create_all(bind=get_engine())
+        with static_pdf_server(pdf_dir) as pdf_base, app_server(_free_port()) as base_url:
+            case_ids = _seed_cases(config.seed_cases, config.n_events) or ["MISSING-CASE"]
+            pdf_urls = [f"{pdf_base}/case-{i}.pdf" for i in range(config.pdf_count)]
+            driver = Driver(base_url, pdf_urls, case_ids, config)
+            configure_tracing(exporter)
+            try:
+                if config.warmup > 0:
+                    asyncio.run(driver.phase(config.warmup))
+                exporter.spans.clear()
+                counters_before = {
+                    "validation_errors": metrics.VALIDATION_ERRORS.value(),
+                    "persistence_errors": metrics.PERSISTENCE_ERRORS.value(),
+                }
+                started = time.perf_counter()
+                samples, dropped = asyncio.run(driver.phase(config.duration))
+                elapsed = time.perf_counter() - started
+            finally:
+                configure_tracing(None)
+    report = summarize(samples, _stage_durations(exporter.spans), elapsed=elapsed, dropped=dropped)
+    report["counters"] = {
+        "validation_errors": metrics.VALIDATION_ERRORS.value() - counters_before["validation_errors"],
+        "persistence_errors": metrics.PERSISTENCE_ERRORS.value() - counters_before["persistence_errors"],
+    }
+    return {
+        "environment": harness.environment(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {**asdict(config), "database": "sqlite" if sqlite else "postgres", "database_url": None},
+        **report,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], *, quantile: str = "p95") -> List[Dict[str, Any]]:
+    """Per route / stage ``quantile`` ratio between two saved runs."""
+    rows: List[Dict[str, Any]] = []
+    for section in ("routes", "stages"):
+        cur, prev = current.get(section, {}), previous.get(section, {})
+        for name in sorted(set(cur) | set(prev)):
+            c_stats, p_stats = cur.get(name, {}), prev.get(name, {})
+            if section == "routes":
+                c_stats, p_stats = c_stats.get("latency_ms", {}), p_stats.get("latency_ms", {})
+            c, p = c_stats.get(quantile), p_stats.get(quantile)
+            rows.append(
+                {
+                    "name": f"{section[:-1]}:{name}",
+                    "previous_ms": p,
+                    "current_ms": c,
+                    "ratio": round(c / p, 3) if c is not None and p else None,
+                }
+            )
+    return rows
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    header = f"{'name':<34} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}"
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_s']}s "
+        f"({report['throughput_rps']} rps, {report['dropped']} dropped)",
+        header,
+        "-" * len(header),
+    ]
+
+    def row(name: str, stats: Dict[str, Any]) -> str:
+        if not stats.get("count"):
+            return f"{name:<34} {0:>7}"
+        return f"{name:<34} {stats['count']:>7} {stats['p50']:>10.1f} {stats['p95']:>10.1f} {stats['p99']:>10.1f} {stats['max']:>10.1f}"
+
+    for name, data in report["routes"].items():
+        lines.append(row(f"route:{name} ({data['errors']} err)", data["latency_ms"]))
+    for name, stats in report["stages"].items():
+        lines.append(row(f"stage:{name}", stats))
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = LoadConfig()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=defaults.rate, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=defaults.duration, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=defaults.warmup, help="unmeasured seconds before the run")
+    parser.add_argument("--mix", default="extract:2,extract_async:1,cases:3,case:4", help=f"weights over {', '.join(ROUTES)}")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default=defaults.arrival)
+    parser.add_argument("--max-in-flight", type=int, default=defaults.max_in_flight)
+    parser.add_argument("--timeout", type=float, default=defaults.timeout)
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--llm-latency", default=defaults.llm_latency, help="REPLAY_LATENCY spec")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-response-mode", choices=("text", "json", "stream"), default=defaults.llm_response_mode)
+    parser.add_argument("--events", type=int, default=defaults.n_events, help="timeline events per extraction")
+    parser.add_argument("--seed-cases", type=int, default=defaults.seed_cases)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", default="loadtest-results.json", help="JSON report path")
+    parser.add_argument("--compare", help="previous JSON report to diff p95 against")
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(
+        rate=args.rate,
+        duration=args.duration,
+        warmup=args.warmup,
+        mix=parse_mix(args.mix),
+        arrival=args.arrival,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        database_url=args.database_url,
+        llm_latency=args.llm_latency,
+        llm_error_rate=args.llm_error_rate,
+        llm_rate_limit_rate=args.llm_rate_limit_rate,
+        llm_response_mode=args.llm_response_mode,
+        n_events=args.events,
+        seed_cases=args.seed_cases,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory(prefix="intj-load-") as tmp:
+        report = run(config, Path(tmp))
+    harness.save(args.output, report)
+    print(format_report(report))
+    print(f"report written to {args.output}", file=sys.stderr)
+    if args.compare:
+        print()
+        for r in compare(report, harness.load(args.compare)):
+            ratio = f"{r['ratio']:.2f}" if r["ratio"] is not None else "-"
+            print(f"{r['name']:<40} {r['previous_ms']!s:>10} {r['current_ms']!s:>10} {ratio:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Deterministic synthetic extractions and raw model outputs for benchmarks."""
+from __future__ import annotations
+
+from typing import Any, Dict
+import json
+import random
+
+
+def make_extraction_dict(n_events: int, n_evidence: int | None = None, *, seed: int = 7) -> Dict[str, Any]:
+    """Build a CaseExtraction-shaped dict with ``n_events`` timeline events."""
+    rng = random.Random(seed)
+    n_evidence = max(1, n_events // 4) if n_evidence is None else n_evidence
+    page = 1
+    timeline = []
+    for i in range(n_events):
+        span = rng.randint(0, 4)
+        timeline.append(
+            {
+                "event_id": i,
+                "event_name": f"Evento {i} - Decisão Interlocutória",
+                "event_description": "Descrição objetiva do andamento processual {} com {{chaves}} e \"aspas\".".format(i)
+                + " Lorem ipsum dolor sit amet." * rng.randint(1, 4),
+                "event_date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/20{rng.randint(10, 24)}",
+                "event_page_init": page,
+                "event_page_end": page + span,
+            }
+        )
+        page += span + 1
+    evidence = [
+        {
+            "evidence_id": i,
+            "evidence_name": f"Documento {i}",
+            "evidence_flaw": "Sem inconsistências" if i % 3 else "Assinatura ilegível",
+            "evidence_page_init": i + 1,
+            "evidence_page_end": i + 2,
+        }
+        for i in range(n_evidence)
+    ]
+    return {"resume": "Resumo sintético do caso para benchmark. " * 5, "timeline": timeline, "evidence": evidence}
+
+
+def clean_output(n_events: int) -> str:
+    """Model output that is exactly one JSON object (happy path)."""
+    return json.dumps(make_extraction_dict(n_events), ensure_ascii=False)
+
+
+def fenced_output(n_events: int) -> str:
+    """JSON wrapped in a markdown fence with leading and trailing prose."""
+    body = json.dumps(make_extraction_dict(n_events), ensure_ascii=False, indent=2)
+    return "Aqui está o resultado solicitado:\n```json\n" + body + "\n```\nEspero ter ajudado! {fim}"
+
+
+def truncated_output(n_events: int, keep: float = 0.8) -> str:
+    """JSON cut off part-way (max_output_tokens reached)."""
+    text = clean_output(n_events)
+    return text[: int(len(text) * keep)]
+
+
+def brace_heavy_prose(size: int) -> str:
+    """Prose full of small non-JSON brace groups and stray quotes, then a JSON object."""
+    chunk = 'Ver {fls. 3} e {doc "A"} {x: y} '
+    prose = (chunk * (size // len(chunk) + 1))[:size]
+    return prose + "\n```json\n" + clean_output(10) + "\n```"
+
+
+def unbalanced_braces(n: int) -> str:
+    """``n`` opening braces and no JSON at all (worst case for naive rescans)."""
+    return "{" * n
+
+
+
+def make_pdf(pages: int, text_pages: int | None = None, *, line: str = "Peticao inicial fls. {page}") -> bytes:
+    """Minimal valid PDF with ``pages`` pages; the first ``text_pages`` carry a text layer.
+
+    Pages without text stand in for scanned pages (no extractable text).
+    """
+    text_pages = pages if text_pages is None else text_pages
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]  # pages tree filled in below
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")  # 3 0 R
+    kids = []
+    for page in range(1, pages + 1):
+        if page <= text_pages:
+            text = " ".join([line.format(page=page)] * 8)
+            stream = f"BT /F1 10 Tf 40 800 Td ({text}) Tj ET".encode("latin-1")
+        else:
+            stream = b""
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -1,20 +1,43 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from pathlib import Path
-import tempfile
-import uuid
-import requests
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable
+import asyncio
+import time
 from pydantic import BaseModel, HttpUrl, Field
 from ..infrastructure.gemini_client import get_gemini_client, GeminiClient
 from ..infrastructure.pdf_downloader import get_pdf_downloader, RequestsPdfDownloader
-from ..infrastructure.case_repository import CaseRepository
-from .extraction_models import CaseExtraction, Event, Evidence
+from ..infrastructure.pdf_preflight import PdfProfile, preflight_from_settings
+from ..infrastructure.metrics import (
+    STAGE_SECONDS,
+    VALIDATION_ERRORS,
+    FALLBACKS,
+    PERSISTENCE_ERRORS,
+    PDF_BYTES,
+    PDF_PAGES,
+    DEADLINES_EXCEEDED,
+)
+from ..infrastructure.case_repository import AsyncCaseRepository
+from ..infrastructure.blob_store import FileBlobStore, get_blob_store
+from ..infrastructure.artifact_repository import AsyncExtractionArtifactRepository, ExtractionArtifact
+from ..infrastructure.coalescing import ExtractionCoalescer, get_coalescer
+from ..infrastructure.scheduler import JOB_LANES, LaneScheduler, get_scheduler
+from ..infrastructure.metering import UsageMeter, get_usage_meter
+from ..infrastructure.usage_repository import UsageRecord
+from ..infrastructure.settings import get_settings
+from ..infrastructure.resilience import DeadlineExceeded, deadline_scope
+from ..infrastructure.tracing import span
+from .page_ranges import check_page_ranges
+from .prompts import extraction_prompt
+from .extraction_models import CaseExtraction, Event, Evidence, validate_items
 
 
 class ExtractRequest(BaseModel):
     pdf_url: HttpUrl
     case_id: str = Field(min_length=5)
+    # Overall deadline for download, upload and generation (defaults: EXTRACT_TIMEOUT_S / JOB_TIMEOUT_S)
+    timeout_s: float | None = Field(default=None, gt=0, le=3600)
 
 
 class ExtractResponse(BaseModel):
@@ -31,12 +54,159 @@ class ExtractService:
     Dependencies are injected (pdf_downloader, gemini_client provider) to honor layered architecture.
     """
 
-    def __init__(self, pdf_downloader: RequestsPdfDownloader, gemini_client: GeminiClient | None):
+    def __init__(
+        self,
+        pdf_downloader: RequestsPdfDownloader,
+        gemini_client: GeminiClient | None,
+        case_repository: AsyncCaseRepository | None = None,
+        blob_store: FileBlobStore | None = None,
+        artifact_repository: AsyncExtractionArtifactRepository | None = None,
+        coalescer: ExtractionCoalescer | None = None,
+        scheduler: LaneScheduler | None = None,
+        meter: UsageMeter | None = None,
+    ):
         self._pdf_downloader = pdf_downloader
         self._gemini_client = gemini_client
+        self._case_repository = case_repository
+        self._blob_store = blob_store
+        self._artifact_repository = artifact_repository
+        self._coalescer = coalescer
+        self._scheduler = scheduler
+        self._meter = meter
 
-    async def extract(self, data: ExtractRequest, *, debug: bool | None = None) -> ExtractResponse:
-        pdf_path = self._pdf_downloader.download(str(data.pdf_url), data.case_id)
+    async def extract(
+        self,
+        data: ExtractRequest,
+        *,
+        debug: bool | None = None,
+        job_id: str | None = None,
+        timeout: float | None = None,
+        lane: str | None = None,
+        api_key_id: str | None = None,
+        on_start: Callable[[], Awaitable[None]] | None = None,
+    ) -> ExtractResponse:
+        """Run the pipeline within ``data.timeout_s`` (else ``timeout``) seconds.
+
+        Raises ``DeadlineExceeded`` when the deadline expires; nothing is
+        persisted in that case. With a coalescer, concurrent calls for the
+        same case share one extraction (see ``infrastructure.coalescing``).
+        With a scheduler and a ``lane``, the extraction first waits for a slot
+        in that lane, shared fairly by ``api_key_id``; only then does it take
+        the cluster coalescing lock. For job lanes the
+        deadline starts once the slot is granted. ``on_start`` is awaited when
+        the pipeline starts (e.g. to mark a job running). With a meter, what
+        the call consumed is recorded against ``api_key_id``.
+        """
+        seconds = data.timeout_s or timeout
+        queued = self._scheduler is not None and lane in JOB_LANES
+        usage = (
+            UsageRecord(api_key_id=api_key_id or "unknown", case_id=data.case_id, job_id=job_id, lane=lane)
+            if self._meter is not None
+            else None
+        )
+        with span("extract", **{"case.id": data.case_id}) as root, deadline_scope(None if queued else seconds):
+            if seconds:
+                root.set_attribute("deadline.s", seconds)
+            try:
+                run = partial(self._extract, data, debug=debug, job_id=job_id, usage=usage, root=root)
+                gate = partial(
+                    self._slot,
+                    lane=lane,
+                    api_key_id=api_key_id,
+                    run_seconds=seconds if queued else None,
+                    on_start=on_start,
+                    root=root,
+                )
+                if self._coalescer is None:
+                    async with gate():
+                        return await run()
+                return await self._coalesced(data, debug, run, gate, usage, root)
+            except DeadlineExceeded as exc:
+                DEADLINES_EXCEEDED.inc(exc.stage)
+                root.set_attribute("deadline.exceeded", exc.stage)
+                if usage is not None:
+                    usage.outcome = "deadline"
+                raise
+            except Exception:
+                if usage is not None:
+                    usage.outcome = "error"
+                raise
+            finally:
+                if usage is not None:
+                    meter = self._meter
+                    assert meter is not None
+                    meter.record(usage)
+                    if not meter.running:  # no periodic flush (e.g. Lambda): write before the request ends
+                        await meter.flush()
+
+    @asynccontextmanager
+    async def _slot(self, *, lane, api_key_id, run_seconds, on_start, root) -> AsyncIterator[None]:
+        """Hold a lane slot (when scheduled), then start the job and its run deadline."""
+        slot: AsyncContextManager[None]
+        if self._scheduler is None or lane is None:
+            slot = nullcontext()
+        else:
+            root.set_attribute("scheduler.lane", lane)
+            slot = self._scheduler.slot(lane, api_key_id or "anonymous")
+        async with slot:
+            if on_start is not None:
+                await on_start()
+            with deadline_scope(run_seconds):
+                yield
+
+    async def _coalesced(self, data: ExtractRequest, debug, run, gate, usage, root) -> ExtractResponse:
+        coalescer = self._coalescer
+        assert coalescer is not None
+        key = coalescer.key(data.case_id, str(data.pdf_url))
+
+        async def load() -> CaseExtraction | None:
+            repo = self._case_repository or AsyncCaseRepository()
+            return await repo.get_case(data.case_id)
+
+        def reuse(case: CaseExtraction) -> ExtractResponse:
+            root.set_attribute("coalesced", "remote")
+            if usage is not None:
+                usage.coalesced = "remote"
+            return ExtractResponse.model_construct(
+                resume=case.resume,
+                timeline=case.timeline,
+                evidence=case.evidence,
+                debug={"coalesced": "remote"} if debug else None,
+            )
+
+        if coalescer.in_flight(key):
+            root.set_attribute("coalesced", "local")
+            if usage is not None:
+                usage.coalesced = "local"
+        # Local followers share the leader's slot; only the leader queues for one
+        return await coalescer.run(
+            key,
+            run,
+            load=load,
+            reuse=reuse,
+            gate=gate,
+        )
+
+    async def _extract(
+        self, data: ExtractRequest, *, debug: bool | None, job_id: str | None, usage: UsageRecord | None = None, root
+    ) -> ExtractResponse:
+        stage_ms: dict[str, int] = usage.stage_ms if usage is not None else {}
+        started = time.perf_counter()
+        with STAGE_SECONDS.time("download"), span("extract.download"):
+            # Blocking I/O runs on a worker thread so other extractions (and waiters) keep the loop
+            pdf_path = await asyncio.to_thread(self._pdf_downloader.download, str(data.pdf_url), data.case_id)
+        stage_ms["download"] = _elapsed_ms(started)
+        started = time.perf_counter()
+        with STAGE_SECONDS.time("preflight"), span("extract.preflight") as sp:
+            # Page count and text-layer coverage decide between the text and upload paths
+            preflight = await asyncio.to_thread(preflight_from_settings, pdf_path)
+            profile = preflight.profile
+            sp.set_attributes(**{"pdf.input": profile.mode, "pdf.preflight": profile.reason, "pdf.text_coverage": profile.coverage})
+        stage_ms["preflight"] = _elapsed_ms(started)
+        pdf_bytes, pdf_pages = self._observe_pdf(profile)
+        root.set_attributes(**{"pdf.bytes": pdf_bytes, "pdf.pages": pdf_pages})
+        if usage is not None:
+            usage.pdf_bytes, usage.pdf_pages = pdf_bytes or 0, pdf_pages or 0
         timeline: list[Event] = []
         gemini_client = self._gemini_client
         resume = "PDF downloaded"
@@ -46,53 +216,117 @@ class ExtractService:
         if debug_enabled is None:
             import os
             debug_enabled = os.getenv("INTJ_DEBUG", "0") in {"1", "true", "TRUE", "yes", "on"}
-        debug_payload: dict | None = {"prompt": None} if debug_enabled else None
+        debug_payload: dict | None = {"prompt": None, "pdf_profile": profile.as_dict()} if debug_enabled else None
+        artifact: ExtractionArtifact | None = None
+        failed = False
 
         if gemini_client:
             try:
-                prompt = self._build_prompt()
+                prompt = extraction_prompt()
                 if debug_payload is not None:
-                    debug_payload["prompt"] = prompt
-                model_output = gemini_client.analyze_pdf(str(pdf_path), prompt)
+                    debug_payload["prompt"] = prompt.text
+                    debug_payload["prompt_version"] = prompt.version
+                started = time.perf_counter()
+                analyze = partial(gemini_client.analyze_pdf, str(pdf_path), prompt.text)
+                if preflight.text is not None and getattr(gemini_client, "supports_text_input", False) is True:
+                    analyze = partial(analyze, document_text=preflight.text)
+                if getattr(gemini_client, "supports_pdf_profile", False) is True:  # ModelRouter: no second profiling
+                    analyze = partial(analyze, pdf_profile=profile)
+                with span("extract.llm", **{"pdf.bytes": pdf_bytes, "pdf.pages": pdf_pages, "pdf.input": profile.mode}):
+                    model_output = await asyncio.to_thread(analyze)
+                stage_ms["llm"] = _elapsed_ms(started)
+                routing = model_output.get("routing")
+                model_name = routing["model"] if routing else getattr(gemini_client, "model_name", None)
+                if usage is not None:
+                    usage.add_usage(model_output.get("usage"))
+                    usage.model = model_name
+                if model_output.get("deadline_exceeded"):
+                    raise DeadlineExceeded(str(model_output["deadline_exceeded"]))
+                if model_output.get("generation_timeout"):  # routed rule timeout: failed, not saved
+                    raise TimeoutError(str(model_output["resume"]))
+                # GeminiClient returns typed models (passed through untouched);
+                # plain dicts from other clients are validated here, once.
+                timeline, dropped_events = validate_items(model_output.get("timeline"), Event)
+                evidence, dropped_evidence = validate_items(model_output.get("evidence"), Evidence)
+                validation_error = bool(model_output.get("validation_error") or dropped_events or dropped_evidence)
+                if isinstance(model_output.get("raw_text"), str):
+                    artifact = ExtractionArtifact(
+                        case_id=data.case_id,
+                        job_id=job_id,
+                        prompt_sha256=prompt.sha256,
+                        raw_text=model_output["raw_text"],
+                        model=model_name,
+                        usage=model_output.get("usage"),
+                        response_mode=getattr(gemini_client, "response_mode", None),
+                        validation_error=validation_error,
+                        routing=routing,
+                    )
+                if validation_error:
+                    VALIDATION_ERRORS.inc()
                 resume = model_output.get("resume", resume)
-                if model_output.get("timeline"):
-                    for ev in model_output["timeline"]:
-                        try:
-                            timeline.append(Event(**ev))
-                        except Exception:
-                            continue
-                raw_evidence = model_output.get("evidence", [])
-                evidence = []
-                for evd in raw_evidence:
-                    try:
-                        evidence.append(Evidence(**evd))
-                    except Exception:
-                        continue
+                if profile.pages and profile.reason != "unreadable":  # estimated page counts are not trusted
+                    with span("extract.page_ranges") as sp:
+                        page_check = check_page_ranges(
+                            timeline,
+                            evidence,
+                            profile.pages,
+                            page_chars=profile.page_chars if profile.mode == "text" else None,
+                            policy=get_settings().page_range_policy,
+                        )
+                        page_check.observe(model_name)
+                        sp.set_attributes(**{"page_ranges.flagged": page_check.flagged, "page_ranges.repaired": page_check.repaired})
+                    if debug_payload is not None:
+                        debug_payload["page_ranges"] = page_check.as_dict()
                 if debug_payload is not None:
-                    if "validation_error" in model_output:
-                        debug_payload["validation_error"] = model_output["validation_error"]
+                    if validation_error or "validation_error" in model_output:
+                        debug_payload["validation_error"] = validation_error
                     debug_payload["timeline_count"] = len(model_output.get("timeline", []))
                     debug_payload["evidence_count"] = len(model_output.get("evidence", []))
-            except Exception as exc:  # pragma: no cover
-                timeline.append(
-                    {
-                        "stage": "gemini_error",
-                        "error": str(exc),
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                    }
-                )
+                    if routing:
+                        debug_payload["routing"] = routing
+                    if model_output.get("raw_text"):
+                        debug_payload["raw_output_sha256"] = self._store_raw_output(model_output["raw_text"])
+            except DeadlineExceeded:
+                raise
+            except Exception as exc:
+                # Only validated items reach the response (it keeps its schema); the error goes to debug
+                failed = True
+                FALLBACKS.inc("llm_error")
+                root.set_attribute("llm.error", type(exc).__name__)
                 if debug_payload is not None:
                     debug_payload["error"] = str(exc)
+                if usage is not None:
+                    usage.outcome = "error"
+        else:
+            FALLBACKS.inc("no_client")
 
-        # Persist if DB configured (simple check: attempt repository init)
-        try:
-            repo = CaseRepository()
-            repo.save_extraction(data.case_id, CaseExtraction(resume=resume, timeline=timeline, evidence=evidence))  # type: ignore[arg-type]
-        except Exception:
-            if debug_payload is not None:
-                debug_payload.setdefault("persistence_error", True)
+        # Persist if DB configured (simple check: attempt repository init). A failed model
+        # call never replaces the stored case: coalescing followers on other nodes read an
+        # unchanged case as "the leader failed" and extract themselves.
+        started = time.perf_counter()
+        if failed:
+            root.set_attribute("persistence.skipped", True)
+        else:
+            try:
+                repo = self._case_repository or AsyncCaseRepository()
+                with STAGE_SECONDS.time("persistence"), span("extract.persist"):
+                    extraction = CaseExtraction.model_construct(resume=resume, timeline=timeline, evidence=evidence)
+                    await repo.save_extraction(data.case_id, extraction, pdf_profile=profile.as_dict())
+            except Exception:
+                PERSISTENCE_ERRORS.inc()
+                root.set_attribute("persistence.error", True)
+                if debug_payload is not None:
+                    debug_payload.setdefault("persistence_error", True)
+        stage_ms["persistence"] = _elapsed_ms(started)
 
-        return ExtractResponse(
+        if artifact is not None:
+            artifact_id = await self._archive(artifact, root)
+            if debug_payload is not None and artifact_id:
+                debug_payload["artifact_id"] = artifact_id
+
+        root.set_attributes(**{"timeline.count": len(timeline), "evidence.count": len(evidence)})
+        # Items were validated above; skip a second pass over the lists
+        return ExtractResponse.model_construct(
             resume=resume,
             timeline=timeline,
             evidence=evidence,
@@ -104,54 +338,59 @@ class ExtractService:
     # ------------------------------------------------------------------
     # _download_pdf removed in favor of infrastructure adapter
 
-    def _build_prompt(self) -> str:
-        # Multilingual + strict JSON output instructions. Provide both EN and PT to reduce ambiguity.
-        schema = self._schema_example()
-        return (
-            "ROLE: You are an expert legal document analyst (analista jurídico especializado).\n\n"
-            "TASK (EN): Read the supplied PDF document and extract ONLY the requested structured data.\n"
-            "TAREFA (PT-BR): Leia o PDF fornecido e extraia APENAS os dados estruturados solicitados.\n\n"
-            "OUTPUT RULES / REGRAS DE SAÍDA:\n"
-            "1. Return ONE single JSON object.\n"
-            "2. Do NOT include explanations, commentary, markdown, code fences, or additional keys.\n"
-            "3. Keys required at top level: resume, timeline, evidence.\n"
-            "4. resume: concise case summary in Portuguese (máx ~120 palavras).\n"
-            "5. timeline: array of chronological events. Each event has: event_id (int, sequential from 0), "
-            "event_name (short label PT-BR), event_description (objective PT-BR), event_date (DD/MM/YYYY if present; else ISO or empty string), "
-            "event_page_init (int), event_page_end (int).\n"
-            "6. evidence: array of evidences with: evidence_id (int sequential from 0), evidence_name, evidence_flaw (describe irregularidade ou 'Sem inconsistências'), evidence_page_init, evidence_page_end.\n"
-            "7. If any field unknown, use empty string (''), but keep the key.\n"
-            "8. event_id and evidence_id MUST be strictly incremental starting at 0 with no gaps.\n"
-            "9. PAGE numbers must be integers derived from the PDF order (first page = 1).\n"
-            "10. DO NOT hallucinate dates; if absent, set event_date to ''.\n"
-            "11. No duplicate events; merge if redundant.\n"
-            "12. Output must be valid JSON parseable by a standard JSON parser.\n"
-            "13. Do NOT wrap JSON in backticks.\n\n"
-            "JSON SCHEMA EXAMPLE (MODEL ONLY – ADAPT CONTENT):\n" + schema + "\n"
-            "BEGIN NOW. Return ONLY the JSON object."
-        )
+    @staticmethod
+    def _observe_pdf(profile: PdfProfile) -> tuple[int | None, int | None]:
+        """Record PDF size / page-count metrics; returns (bytes, pages)."""
+        if profile.bytes:
+            PDF_BYTES.observe(profile.bytes)
+        if profile.pages:
+            PDF_PAGES.observe(profile.pages)
+        return profile.bytes or None, profile.pages or None
 
-    def _schema_example(self) -> str:
-        return (
-            '{"resume": "Resumo conciso do caso...", "timeline": ['
-            '{"event_id":0, "event_name":"Marco Inicial", "event_description":"Ajuizamento da ação...", '
-            '"event_date":"22/10/2024", "event_page_init":1, "event_page_end":13}, '
-            '{"event_id":1, "event_name":"Decisão Interlocutória", "event_description":"Tutela concedida...", '
-            '"event_date":"23/10/2024", "event_page_init":32, "event_page_end":34}'
-            '], "evidence": ['
-            '{"evidence_id":0, "evidence_name":"Procuração", "evidence_flaw":"Sem inconsistências", "evidence_page_init":16, "evidence_page_end":16}, '
-            '{"evidence_id":1, "evidence_name":"Contrato", "evidence_flaw":"Assinatura ilegível", "evidence_page_init":20, "evidence_page_end":21}'
-            ']}'
-        )
+    async def _archive(self, artifact: ExtractionArtifact, root) -> str | None:
+        """Keep the raw model output (compressed) for the debug endpoints; never fails the extraction."""
+        if not get_settings().extraction_archive:
+            return None
+        try:
+            repo = self._artifact_repository or AsyncExtractionArtifactRepository()
+            with STAGE_SECONDS.time("archive"), span("extract.archive"):
+                return await repo.save(artifact)
+        except Exception:
+            root.set_attribute("archive.error", True)
+            return None
+
+    def _store_raw_output(self, raw_text: str) -> str | None:
+        """Keep the raw model text in the blob store; the debug payload carries only its key."""
+        try:
+            store = self._blob_store or get_blob_store()
+            return store.put(raw_text.encode("utf-8"))
+        except Exception:  # never fail an extraction over debug artifacts
+            return None
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
 
 
 def get_extract_service(
     pdf_downloader: RequestsPdfDownloader | None = None,
     gemini_client: GeminiClient | None = None,
+    case_repository: AsyncCaseRepository | None = None,
+    blob_store: FileBlobStore | None = None,
+    artifact_repository: AsyncExtractionArtifactRepository | None = None,
+    coalescer: ExtractionCoalescer | None = None,
+    scheduler: LaneScheduler | None = None,
+    meter: UsageMeter | None = None,
 ) -> ExtractService:
     return ExtractService(
         pdf_downloader=pdf_downloader or get_pdf_downloader(),
         gemini_client=gemini_client if gemini_client is not None else get_gemini_client(),
+        case_repository=case_repository,
+        blob_store=blob_store,
+        artifact_repository=artifact_repository,
+        coalescer=coalescer or get_coalescer(),
+        scheduler=scheduler or get_scheduler(),
+        meter=meter or get_usage_meter(),
     )
 
 __all__ = [
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Any, Iterable, List, Tuple, Type, TypeVar
 
 
 class Event(BaseModel):
@@ -27,8 +27,45 @@ class CaseExtraction(BaseModel):
     evidence: List[Evidence]
 
 
+M = TypeVar("M", bound=BaseModel)
+
+# One compiled validator per item list. Model instances pass through without
+# re-validation (pydantic's default ``revalidate_instances="never"``), so
+# stages downstream of the LLM client can call ``validate_items`` on already
+# typed lists at near-zero cost.
+_LIST_ADAPTERS: dict[type, TypeAdapter] = {
+    Event: TypeAdapter(List[Event]),
+    Evidence: TypeAdapter(List[Evidence]),
+}
+
+
+def validate_items(items: Iterable[Any] | None, model: Type[M]) -> Tuple[List[M], int]:
+    """Validate ``items`` as ``list[model]`` in a single pass.
+
+    Returns the typed list and the number of dropped items. The whole list is
+    validated by one ``TypeAdapter`` call; only when that fails is it retried
+    item by item so valid items survive next to invalid ones.
+    """
+    if not items:
+        return [], 0
+    items = list(items)
+    adapter = _LIST_ADAPTERS.get(model) or TypeAdapter(List[model])  # type: ignore[valid-type]
+    try:
+        return adapter.validate_python(items), 0
+    except ValidationError:
+        pass
+    valid: List[M] = []
+    for item in items:
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError:
+            continue
+    return valid, len(items) - len(valid)
+
+
 __all__ = [
     "Event",
     "Evidence",
     "CaseExtraction",
+    "validate_items",
 ]
\ No newline at end of file
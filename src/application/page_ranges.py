@@ -0,0 +1,144 @@
+"""Check model page references against the real document.
+
+The model often cites pages past the end of the PDF, or returns ranges with
+``init > end``. ``check_page_ranges`` checks every timeline event and piece
+of evidence against the pre-flight page count in one columnar pass. It never
+touches a model instance that passes every check.
+
+Flags:
+
+- ``missing``: both ends are 0 or negative (page unknown). Never repaired.
+- ``non_positive``: one end is 0 or negative. It is set to the other end.
+- ``inverted``: ``init > end``. The ends are swapped.
+- ``beyond_document``: an end is past the last page. It is clamped to the
+  last page.
+- ``blank_pages``: every page in the range has no text layer. This is only
+  checked when per-page text is known (text-path documents). Never repaired.
+
+With ``PAGE_RANGE_POLICY=clamp`` (default), repairs are applied to the items
+in place. With ``flag``, items are only reported. Counts go to
+``intj_page_range_items_total`` / ``intj_page_range_flags_total`` per model,
+and the report goes to the debug payload.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Dict, List, Sequence
+
+from ..infrastructure.metrics import PAGE_RANGE_FLAGS, PAGE_RANGE_ITEMS
+from .extraction_models import Event, Evidence
+
+FLAGS = ("missing", "non_positive", "inverted", "beyond_document", "blank_pages")
+POLICIES = {"clamp", "flag"}
+# Flagged items listed individually in the report (counts cover all of them)
+MAX_REPORTED_ITEMS = 50
+
+
+@dataclass
+class PageRangeReport:
+    pages: int
+    policy: str
+    checked: int = 0
+    flagged: int = 0
+    repaired: int = 0
+    counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(FLAGS, 0))
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+    def observe(self, model: str | None) -> None:
+        """Count the checked items and their flags for ``model``."""
+        label = model or "unknown"
+        PAGE_RANGE_ITEMS.inc(label, amount=self.checked)
+        for flag, count in self.counts.items():
+            if count:
+                PAGE_RANGE_FLAGS.inc(label, flag, amount=count)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "policy": self.policy,
+            "checked": self.checked,
+            "flagged": self.flagged,
+            "repaired": self.repaired,
+            "counts": {k: v for k, v in self.counts.items() if v},
+            "items": self.items,
+        }
+
+
+_EVENT_FIELDS = ("event_id", "event_page_init", "event_page_end")
+_EVIDENCE_FIELDS = ("evidence_id", "evidence_page_init", "evidence_page_end")
+
+
+def check_page_ranges(
+    timeline: Sequence[Event],
+    evidence: Sequence[Evidence],
+    pages: int,
+    *,
+    page_chars: Sequence[int] | None = None,
+    policy: str = "clamp",
+) -> PageRangeReport:
+    """Flag (and with ``policy="clamp"`` repair) page ranges outside ``1..pages``."""
+    if policy not in POLICIES:
+        raise ValueError(f"Invalid page range policy {policy!r}; expected one of {sorted(POLICIES)}")
+    report = PageRangeReport(pages=pages, policy=policy)
+    items: List[Any] = [*timeline, *evidence]
+    report.checked = len(items)
+    if not items or pages <= 0:
+        return report
+
+    # Columns for every item at once (timeline and evidence together)
+    names = [_EVENT_FIELDS if isinstance(item, Event) else _EVIDENCE_FIELDS for item in items]
+    inits = [getattr(item, f[1]) for item, f in zip(items, names)]
+    ends = [getattr(item, f[2]) for item, f in zip(items, names)]
+    # Pages with text among the first n pages: a range is blank when its count does not grow
+    with_text = [0, *accumulate(1 if c > 0 else 0 for c in page_chars)] if page_chars and len(page_chars) == pages else None
+
+    # One comparison per item over the columns; only the suspects get the detailed checks
+    suspects = [
+        idx
+        for idx, (init, end) in enumerate(zip(inits, ends))
+        if not 0 < init <= end <= pages or (with_text is not None and with_text[end] == with_text[init - 1])
+    ]
+    for idx in suspects:
+        init, end = inits[idx], ends[idx]
+        flags = []
+        new_init, new_end = init, end
+        if init <= 0 and end <= 0:
+            flags.append("missing")
+        else:
+            if init <= 0 or end <= 0:
+                flags.append("non_positive")
+                new_init = new_end = max(init, end)
+            if new_init > new_end:
+                flags.append("inverted")
+                new_init, new_end = new_end, new_init
+            if new_end > pages:
+                flags.append("beyond_document")
+                new_init, new_end = min(new_init, pages), pages
+            if with_text is not None and with_text[new_end] == with_text[new_init - 1]:
+                flags.append("blank_pages")
+        if not flags:
+            continue
+        report.flagged += 1
+        for flag in flags:
+            report.counts[flag] += 1
+        repaired = (new_init, new_end) != (init, end)
+        if repaired and policy == "clamp":
+            item, (_, init_field, end_field) = items[idx], names[idx]
+            setattr(item, init_field, new_init)
+            setattr(item, end_field, new_end)
+            report.repaired += 1
+        if len(report.items) < MAX_REPORTED_ITEMS:
+            entry: Dict[str, Any] = {
+                "kind": "timeline" if isinstance(items[idx], Event) else "evidence",
+                "id": getattr(items[idx], names[idx][0]),
+                "flags": flags,
+                "pages": [init, end],
+            }
+            if repaired:
+                entry["suggested" if policy == "flag" else "clamped"] = [new_init, new_end]
+            report.items.append(entry)
+    return report
+
+
+__all__ = ["FLAGS", "POLICIES", "PageRangeReport", "check_page_ranges"]
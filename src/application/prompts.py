@@ -0,0 +1,85 @@
+"""Versioned extraction prompts, built once per process.
+
+The instructions and schema example are static, so each version is built on
+first use and reused afterwards, together with its SHA-256. The SHA-256 is
+stored with extraction artifacts. The Gemini client caches the prompt text
+as a context-cache key (see ``context_cache``). Change the wording by adding
+a new version and moving ``PROMPT_VERSION`` to it. Do not edit an existing
+version in place, because artifacts and cassettes refer to it by hash.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict
+import hashlib
+
+PROMPT_VERSION = "v1"
+
+
+@dataclass(frozen=True)
+class Prompt:
+    version: str
+    text: str
+    sha256: str
+
+
+_SCHEMA_EXAMPLE_V1 = (
+    '{"resume": "Resumo conciso do caso...", "timeline": ['
+    '{"event_id":0, "event_name":"Marco Inicial", "event_description":"Ajuizamento da ação...", '
+    '"event_date":"22/10/2024", "event_page_init":1, "event_page_end":13}, '
+    '{"event_id":1, "event_name":"Decisão Interlocutória", "event_description":"Tutela concedida...", '
+    '"event_date":"23/10/2024", "event_page_init":32, "event_page_end":34}'
+    '], "evidence": ['
+    '{"evidence_id":0, "evidence_name":"Procuração", "evidence_flaw":"Sem inconsistências", "evidence_page_init":16, "evidence_page_end":16}, '
+    '{"evidence_id":1, "evidence_name":"Contrato", "evidence_flaw":"Assinatura ilegível", "evidence_page_init":20, "evidence_page_end":21}'
+    ']}'
+)
+
+
+def _v1() -> str:
+    # Multilingual + strict JSON output instructions. Provide both EN and PT to reduce ambiguity.
+    return (
+        "ROLE: You are an expert legal document analyst (analista jurídico especializado).\n\n"
+        "TASK (EN): Read the supplied PDF document and extract ONLY the requested structured data.\n"
+        "TAREFA (PT-BR): Leia o PDF fornecido e extraia APENAS os dados estruturados solicitados.\n\n"
+        "OUTPUT RULES / REGRAS DE SAÍDA:\n"
+        "1. Return ONE single JSON object.\n"
+        "2. Do NOT include explanations, commentary, markdown, code fences, or additional keys.\n"
+        "3. Keys required at top level: resume, timeline, evidence.\n"
+        "4. resume: concise case summary in Portuguese (máx ~120 palavras).\n"
+        "5. timeline: array of chronological events. Each event has: event_id (int, sequential from 0), "
+        "event_name (short label PT-BR), event_description (objective PT-BR), event_date (DD/MM/YYYY if present; else ISO or empty string), "
+        "event_page_init (int), event_page_end (int).\n"
+        "6. evidence: array of evidences with: evidence_id (int sequential from 0), evidence_name, evidence_flaw (describe irregularidade ou 'Sem inconsistências'), evidence_page_init, evidence_page_end.\n"
+        "7. If any field unknown, use empty string (''), but keep the key.\n"
+        "8. event_id and evidence_id MUST be strictly incremental starting at 0 with no gaps.\n"
+        "9. PAGE numbers must be integers derived from the PDF order (first page = 1).\n"
+        "10. DO NOT hallucinate dates; if absent, set event_date to ''.\n"
+        "11. No duplicate events; merge if redundant.\n"
+        "12. Output must be valid JSON parseable by a standard JSON parser.\n"
+        "13. Do NOT wrap JSON in backticks.\n\n"
+        "JSON SCHEMA EXAMPLE (MODEL ONLY – ADAPT CONTENT):\n" + _SCHEMA_EXAMPLE_V1 + "\n"
+        "BEGIN NOW. Return ONLY the JSON object."
+    )
+
+
+_BUILDERS: Dict[str, Callable[[], str]] = {"v1": _v1}
+
+
+def extraction_prompt(version: str = PROMPT_VERSION) -> Prompt:
+    """The extraction prompt for ``version``; built and hashed once per process."""
+    return _prompt(version)
+
+
+@lru_cache(maxsize=None)
+def _prompt(version: str) -> Prompt:
+    try:
+        builder = _BUILDERS[version]
+    except KeyError:
+        raise ValueError(f"Unknown prompt version {version!r}; expected one of {sorted(_BUILDERS)}") from None
+    text = builder()
+    return Prompt(version=version, text=text, sha256=hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+__all__ = ["Prompt", "PROMPT_VERSION", "extraction_prompt"]
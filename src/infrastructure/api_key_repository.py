@@ -0,0 +1,112 @@
+"""API keys stored in the ``api_keys`` table.
+
+Only the SHA-256 digest of each key is stored. ``create`` returns the
+plaintext key once, and ``revoke`` deactivates a key by id. Authentication
+reads keys through ``lookup`` and caches the result (see ``auth``), so a new
+or revoked key takes effect within ``API_KEY_CACHE_TTL_S`` without a
+redeploy.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+import hashlib
+import secrets
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import get_async_session_factory
+from .models import ApiKeyORM
+from .tracing import span
+
+
+def key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def key_id_from_digest(digest: str) -> str:
+    return digest[:16]
+
+
+class AsyncApiKeyRepository:
+    def __init__(self, session: AsyncSession | None = None):
+        self._external_session = session
+        self._Session = get_async_session_factory() if session is None else None
+
+    def _session(self) -> tuple[AsyncSession, bool]:
+        if self._external_session is not None:
+            return self._external_session, False
+        return self._Session(), True  # type: ignore[misc]
+
+    async def lookup(self, digest: str) -> Optional[dict]:
+        """Active key with this SHA-256 digest, as ``{"key_id", "name", "rate_limit_per_min"}``."""
+        s, close = self._session()
+        try:
+            with span("db.api_key.lookup"):
+                row = (
+                    await s.execute(
+                        select(ApiKeyORM.key_id, ApiKeyORM.name, ApiKeyORM.rate_limit_per_min).where(
+                            ApiKeyORM.key_sha256 == digest, ApiKeyORM.active.is_(True)
+                        )
+                    )
+                ).first()
+            return dict(row._mapping) if row is not None else None
+        finally:
+            if close:
+                await s.close()
+
+    async def create(self, name: str, *, rate_limit_per_min: int | None = None) -> tuple[str, str]:
+        """Issue a new key; returns ``(plaintext_key, key_id)``. The plaintext is not stored."""
+        api_key = secrets.token_urlsafe(32)
+        digest = key_digest(api_key)
+        s, close = self._session()
+        try:
+            with span("db.api_key.create"):
+                s.add(
+                    ApiKeyORM(
+                        key_id=key_id_from_digest(digest),
+                        key_sha256=digest,
+                        name=name,
+                        rate_limit_per_min=rate_limit_per_min,
+                        active=True,
+                    )
+                )
+                await s.commit()
+        except Exception:
+            await s.rollback()
+            raise
+        finally:
+            if close:
+                await s.close()
+        return api_key, key_id_from_digest(digest)
+
+    async def revoke(self, key_id: str) -> bool:
+        s, close = self._session()
+        try:
+            with span("db.api_key.revoke", **{"api_key.id": key_id}):
+                row = await s.get(ApiKeyORM, key_id)
+                if row is None or not row.active:
+                    return False
+                row.active = False
+                row.revoked_at = datetime.utcnow()
+                await s.commit()
+                return True
+        except Exception:
+            await s.rollback()
+            raise
+        finally:
+            if close:
+                await s.close()
+
+
+def get_async_api_key_repository() -> AsyncApiKeyRepository:
+    return AsyncApiKeyRepository()
+
+
+__all__ = [
+    "AsyncApiKeyRepository",
+    "get_async_api_key_repository",
+    "key_digest",
+    "key_id_from_digest",
+]
@@ -0,0 +1,201 @@
+"""Archive of raw model outputs, prompt hashes and token usage per extraction.
+
+Each extraction stores one ``extraction_artifacts`` row: filterable metadata
+in columns (case, job, model, prompt hash, token counts) plus the raw output
+and usage as a compressed JSON payload. Payloads are zstd-compressed when the
+optional ``zstandard`` package is installed and gzip-compressed otherwise; the
+codec is recorded per row so both can be read back.
+
+Artifacts are never part of extraction / case responses. They are served on
+demand by the ``/debug/extractions`` endpoints.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import gzip
+import json
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:  # optional: better ratio and much faster than gzip on large outputs
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None  # type: ignore
+
+from .db import get_async_session_factory
+from .metrics import ARTIFACTS
+from .models import ExtractionArtifactORM
+from .tracing import span
+
+ZSTD_LEVEL = 6
+GZIP_LEVEL = 6
+# Payloads above this are compressed (and decompressed) off the event loop
+_THREAD_THRESHOLD = 256 * 1024
+
+
+@dataclass
+class ExtractionArtifact:
+    """Raw model output of one extraction, as archived."""
+
+    case_id: str
+    prompt_sha256: str
+    raw_text: str
+    model: Optional[str] = None
+    job_id: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+    response_mode: Optional[str] = None
+    validation_error: bool = False
+    routing: Optional[Dict[str, Any]] = None  # ModelRouter decision, when routing is enabled
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "raw_text": self.raw_text,
+            "usage": self.usage,
+            "response_mode": self.response_mode,
+            "routing": self.routing,
+        }
+
+
+def encode_payload(payload: Dict[str, Any]) -> Tuple[str, bytes, int]:
+    """Compress ``payload`` as JSON; returns (encoding, blob, uncompressed size)."""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), len(raw)
+    return "gzip", gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0), len(raw)
+
+
+def decode_payload(encoding: str, blob: bytes) -> Dict[str, Any]:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Artifact is zstd-compressed; install 'zstandard' to read it")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    elif encoding == "gzip":
+        raw = gzip.decompress(blob)
+    else:
+        raise ValueError(f"Unknown artifact encoding {encoding!r}")
+    return json.loads(raw)
+
+
+def _metadata(row: ExtractionArtifactORM) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "case_id": row.case_id,
+        "job_id": row.job_id,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "model": row.model,
+        "prompt_sha256": row.prompt_sha256,
+        "prompt_tokens": row.prompt_tokens,
+        "output_tokens": row.output_tokens,
+        "validation_error": row.validation_error,
+        "encoding": row.encoding,
+        "raw_bytes": row.raw_bytes,
+    }
+
+
+class AsyncExtractionArtifactRepository:
+    """Asyncio repository for ``extraction_artifacts``."""
+
+    def __init__(self, session: AsyncSession | None = None):
+        self._external_session = session
+        self._Session = get_async_session_factory() if session is None else None
+
+    def _session(self) -> tuple[AsyncSession, bool]:
+        if self._external_session is not None:
+            return self._external_session, False
+        return self._Session(), True  # type: ignore[misc]
+
+    async def save(self, artifact: ExtractionArtifact) -> str:
+        payload = artifact.payload()
+        if len(artifact.raw_text) > _THREAD_THRESHOLD:
+            encoding, blob, raw_bytes = await asyncio.to_thread(encode_payload, payload)
+        else:
+            encoding, blob, raw_bytes = encode_payload(payload)
+        usage = artifact.usage or {}
+        s, close = self._session()
+        try:
+            with span("db.artifact.save", **{"case.id": artifact.case_id, "artifact.bytes": len(blob)}):
+                s.add(
+                    ExtractionArtifactORM(
+                        id=artifact.id,
+                        case_id=artifact.case_id,
+                        job_id=artifact.job_id,
+                        created_at=artifact.created_at,
+                        model=artifact.model,
+                        prompt_sha256=artifact.prompt_sha256,
+                        prompt_tokens=usage.get("prompt_token_count"),
+                        output_tokens=usage.get("candidates_token_count"),
+                        validation_error=artifact.validation_error,
+                        encoding=encoding,
+                        raw_bytes=raw_bytes,
+                        payload=blob,
+                    )
+                )
+                await s.commit()
+        except Exception:
+            await s.rollback()
+            ARTIFACTS.inc("error")
+            raise
+        finally:
+            if close:
+                await s.close()
+        ARTIFACTS.inc("stored")
+        return artifact.id
+
+    async def get(self, artifact_id: str) -> Dict[str, Any] | None:
+        """Metadata plus the decompressed payload (raw_text, usage, response_mode, routing)."""
+        s, close = self._session()
+        try:
+            with span("db.artifact.get", **{"artifact.id": artifact_id}):
+                row = await s.get(
+                    ExtractionArtifactORM, artifact_id, options=[undefer(ExtractionArtifactORM.payload)], populate_existing=True
+                )
+                if row is None:
+                    return None
+                out = _metadata(row)
+                out["stored_bytes"] = len(row.payload)
+            if (row.raw_bytes or 0) > _THREAD_THRESHOLD:
+                out.update(await asyncio.to_thread(decode_payload, row.encoding, row.payload))
+            else:
+                out.update(decode_payload(row.encoding, row.payload))
+            return out
+        finally:
+            if close:
+                await s.close()
+
+    async def list(self, case_id: str | None = None, job_id: str | None = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest first, metadata only (the deferred payload column is not read)."""
+        stmt = select(ExtractionArtifactORM).order_by(ExtractionArtifactORM.created_at.desc()).limit(limit)
+        if case_id is not None:
+            stmt = stmt.where(ExtractionArtifactORM.case_id == case_id)
+        if job_id is not None:
+            stmt = stmt.where(ExtractionArtifactORM.job_id == job_id)
+        s, close = self._session()
+        try:
+            with span("db.artifact.list", **{"limit": limit}):
+                rows = (await s.execute(stmt)).scalars().all()
+                return [_metadata(row) for row in rows]
+        finally:
+            if close:
+                await s.close()
+
+
+def get_async_artifact_repository() -> AsyncExtractionArtifactRepository:
+    """FastAPI dependency provider (override in tests)."""
+    return AsyncExtractionArtifactRepository()
+
+
+__all__ = [
+    "ExtractionArtifact",
+    "AsyncExtractionArtifactRepository",
+    "get_async_artifact_repository",
+    "encode_payload",
+    "decode_payload",
+]
@@ -1,23 +1,239 @@
+"""API key authentication with per-key rate limits.
+
+Keys from ``API_KEYS`` are hashed once, when the authenticator is built at
+startup. A presented key is hashed (SHA-256) and compared with every stored
+digest using ``hmac.compare_digest``, so the comparison takes the same time
+whichever key, if any, matches. With ``API_KEYS_DB=1``, keys that are not in
+``API_KEYS`` are looked up by digest in the ``api_keys`` table. Hits and
+misses are cached for ``API_KEY_CACHE_TTL_S``, so keys can be issued and
+revoked without a redeploy.
+
+The authenticated ``ApiKeyIdentity``, whose id is a hash prefix and never the
+key, is returned by ``require_api_key`` and kept on ``request.state.api_key``.
+Each identity draws from an in-memory token bucket: ``API_RATE_LIMIT_PER_MIN``
+(or the key's own ``rate_limit_per_min`` from the table) refills it, and
+``API_RATE_LIMIT_BURST`` is its size. An empty bucket answers 429 with
+``Retry-After``. Buckets are per process.
+
+``API_KEYS`` keys are operator keys. ``require_operator_key`` limits the
+diagnostics that expose other tenants' data to them.
+"""
 from __future__ import annotations
-from fastapi import HTTPException, status, Depends, Security
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+import hashlib
+import hmac
+import logging
+import math
+import threading
+import time
+
+from fastapi import HTTPException, Request, status, Depends, Security
 from fastapi.security.api_key import APIKeyHeader
+from .metrics import AUTH_REQUESTS
 from .settings import get_settings
 
+logger = logging.getLogger(__name__)
+
 API_KEY_HEADER = "X-API-Key"
 _api_key_header = APIKeyHeader(name=API_KEY_HEADER, auto_error=False, description="API key issued by the service")
 
 
-def get_api_key(x_api_key: str | None = Security(_api_key_header)) -> str:
-    settings = get_settings()
-    allowed = settings.api_keys()
-    if not allowed:  
+def key_id(api_key: str) -> str:
+    """Stable, non-reversible identifier of an API key (for job rows, scheduling and logs)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ApiKeyIdentity:
+    key_id: str
+    name: str
+    source: str  # env | db
+    rate_limit_per_min: Optional[int] = None
+
+
+class KeyStoreUnavailable(RuntimeError):
+    """The ``api_keys`` table could not be read."""
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 when allowed, else seconds until a token is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket per key id; ``per_minute=0`` disables limiting (unless a key sets its own rate)."""
+
+    def __init__(self, per_minute: int = 0, burst: int = 1, max_keys: int = 10_000):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def check(self, identity: ApiKeyIdentity) -> float:
+        rate = identity.rate_limit_per_min if identity.rate_limit_per_min is not None else self.per_minute
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(identity.key_id)
+            if bucket is None or bucket.rate != rate / 60.0:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()  # idle buckets are full anyway; only bursts in flight are forgiven
+                bucket = self._buckets[identity.key_id] = TokenBucket(rate, self.burst)
+            return bucket.take(now)
+
+
+class ApiKeyAuthenticator:
+    def __init__(
+        self,
+        static_keys: Iterable[str] = (),
+        *,
+        repository: Any | None = None,
+        cache_ttl: float = 60.0,
+        cache_size: int = 10_000,
+        limiter: RateLimiter | None = None,
+    ):
+        self._static = [
+            (hashlib.sha256(k.encode("utf-8")).digest(), ApiKeyIdentity(key_id=key_id(k), name="env", source="env"))
+            for k in dict.fromkeys(static_keys)
+        ]
+        self._repository = repository
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, tuple[float, Optional[ApiKeyIdentity]]]" = OrderedDict()
+        self.limiter = limiter or RateLimiter()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._static) or self._repository is not None
+
+    async def authenticate(self, api_key: str) -> Optional[ApiKeyIdentity]:
+        digest = hashlib.sha256(api_key.encode("utf-8")).digest()
+        match: Optional[ApiKeyIdentity] = None
+        for stored, identity in self._static:  # no early exit: same work whichever key matches
+            if hmac.compare_digest(stored, digest):
+                match = identity
+        if match is not None or self._repository is None:
+            return match
+        return await self._lookup(digest.hex())
+
+    async def _lookup(self, digest: str) -> Optional[ApiKeyIdentity]:
+        now = time.monotonic()
+        cached = self._cache.get(digest)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(digest)
+            return cached[1]
+        try:
+            row = await self._repository.lookup(digest)  # type: ignore[union-attr]
+        except Exception as exc:
+            if cached is not None:  # serve the stale entry rather than lock every client out
+                return cached[1]
+            raise KeyStoreUnavailable(str(exc)) from exc
+        identity = (
+            ApiKeyIdentity(key_id=row["key_id"], name=row["name"], source="db", rate_limit_per_min=row["rate_limit_per_min"])
+            if row
+            else None
+        )
+        self._cache[digest] = (now + self.cache_ttl, identity)
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return identity
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+
+_authenticator: Optional[ApiKeyAuthenticator] = None
+
+
+def get_authenticator() -> ApiKeyAuthenticator:
+    """Process-wide authenticator built from settings (FastAPI dependency; override in tests)."""
+    global _authenticator
+    if _authenticator is None:
+        settings = get_settings()
+        repository = None
+        if settings.api_keys_db:
+            from .api_key_repository import AsyncApiKeyRepository
+
+            repository = AsyncApiKeyRepository()
+        _authenticator = ApiKeyAuthenticator(
+            settings.api_keys(),
+            repository=repository,
+            cache_ttl=settings.api_key_cache_ttl_s,
+            limiter=RateLimiter(settings.api_rate_limit_per_min, settings.api_rate_limit_burst),
+        )
+    return _authenticator
+
+
+async def get_api_key(
+    request: Request,
+    x_api_key: str | None = Security(_api_key_header),
+    authenticator: ApiKeyAuthenticator = Depends(get_authenticator),
+) -> ApiKeyIdentity:
+    if not authenticator.configured:
+        AUTH_REQUESTS.inc("invalid")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key required")
-    if not x_api_key or x_api_key not in allowed:
+    try:
+        identity = await authenticator.authenticate(x_api_key) if x_api_key else None
+    except KeyStoreUnavailable as exc:
+        logger.warning("API key store unavailable: %s", exc)
+        AUTH_REQUESTS.inc("unavailable")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="API key store unavailable")
+    if identity is None:
+        AUTH_REQUESTS.inc("invalid")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
-    return x_api_key
+    retry_after = authenticator.limiter.check(identity)
+    if retry_after:
+        AUTH_REQUESTS.inc("rate_limited")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    AUTH_REQUESTS.inc("ok")
+    request.state.api_key = identity
+    return identity
+
+
+def require_api_key(api_key: ApiKeyIdentity = Depends(get_api_key)) -> ApiKeyIdentity:
+    return api_key
 
 
-def require_api_key(api_key: str = Depends(get_api_key)) -> str:  
+def require_operator_key(api_key: ApiKeyIdentity = Depends(require_api_key)) -> ApiKeyIdentity:
+    """Only ``API_KEYS`` (operator) keys; keys from the ``api_keys`` table get 403."""
+    if api_key.source != "env":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operator API key required")
     return api_key
 
-__all__ = ["require_api_key", "get_api_key", "API_KEY_HEADER"]
+__all__ = [
+    "require_api_key",
+    "require_operator_key",
+    "get_api_key",
+    "get_authenticator",
+    "key_id",
+    "ApiKeyIdentity",
+    "ApiKeyAuthenticator",
+    "RateLimiter",
+    "TokenBucket",
+    "KeyStoreUnavailable",
+    "API_KEY_HEADER",
+]
@@ -0,0 +1,235 @@
+"""Filesystem content-addressed blob store (``StorageRepository``).
+
+Blobs are keyed by the SHA-256 of their content and stored under two levels
+of shard directories, ``<root>/ab/cd/abcd...``, so identical content (the
+same PDF downloaded for several cases) is kept once.
+
+- Writes stream into ``<root>/tmp`` and are published with ``os.replace``.
+  Readers never see a partial blob, and concurrent writers of the same
+  content simply replace one complete file with another.
+- Reads are mmap-backed (``open``), so large PDFs are not copied into the
+  heap.
+- Every write or read touches the blob's mtime. When usage exceeds
+  ``max_bytes``, the least recently used blobs are deleted until usage drops
+  to ``LOW_WATERMARK`` of the quota. Blobs used within the last
+  ``grace_seconds`` are never evicted, so a PDF still being uploaded to the
+  model stays on disk.
+
+The LRU state is the filesystem itself (mtimes), so several workers can share
+one directory. Usage is re-measured by a directory scan only when this
+process believes the quota is exceeded.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+
+from ..domain.repositories import StorageRepository
+from .metrics import BLOB_STORE_BYTES, BLOB_STORE_EVENTS
+from .settings import get_settings
+
+LOW_WATERMARK = 0.9
+# Orphaned temp files (crashed writers) older than this are removed during scans
+_STALE_TMP_SECONDS = 3600
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class FileBlobStore(StorageRepository):
+    """SHA-256 content-addressed store rooted at ``root`` with an optional disk quota."""
+
+    def __init__(self, root: str | os.PathLike, *, max_bytes: int | None = None, grace_seconds: float = 300.0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes or None
+        self.grace_seconds = grace_seconds
+        self._tmp_dir = self.root / "tmp"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._usage: int | None = None  # measured lazily (first write / usage read)
+
+    # ------------------------------------------------------------------
+    # StorageRepository
+    # ------------------------------------------------------------------
+    def save(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``, which must be its SHA-256 hex digest."""
+        if hashlib.sha256(data).hexdigest() != key:
+            raise ValueError("Content-addressed store: key must be the SHA-256 of the data")
+        self.put(data)
+
+    def load(self, key: str) -> bytes:
+        with self.open(key) as view:
+            return bytes(view)
+
+    # ------------------------------------------------------------------
+    # Content-addressed API
+    # ------------------------------------------------------------------
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its key."""
+        return self.put_stream([data])
+
+    def put_stream(self, chunks: Iterable[bytes]) -> str:
+        """Hash and write ``chunks`` to a temp file, then publish it atomically."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self._tmp_dir, prefix="put-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    fh.write(chunk)
+                    size += len(chunk)
+            key = digest.hexdigest()
+            self._publish(tmp, key, size)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(tmp)
+            raise
+        return key
+
+    def path(self, key: str) -> Path:
+        """Filesystem path of ``key`` (which may not exist)."""
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return self.root / key[:2] / key[2:4] / key
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def touch(self, key: str) -> None:
+        """Mark ``key`` as recently used."""
+        with suppress(FileNotFoundError):
+            os.utime(self.path(key))
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[memoryview]:
+        """Read-only, mmap-backed view of the blob (raises KeyError when absent)."""
+        path = self.path(key)
+        try:
+            fh = open(path, "rb")
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        with fh:
+            self.touch(key)
+            if os.fstat(fh.fileno()).st_size == 0:  # empty files cannot be mapped
+                yield memoryview(b"")
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def delete(self, key: str) -> bool:
+        path = self.path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._usage is not None:
+                self._usage = max(0, self._usage - size)
+        return True
+
+    @property
+    def usage(self) -> int:
+        """Bytes currently stored (as last measured / tracked by this process)."""
+        with self._lock:
+            if self._usage is None:
+                self._usage = sum(size for _, size, _ in self._scan())
+            return self._usage
+
+    def evict(self, target_bytes: int | None = None, protect: Iterable[str] = ()) -> int:
+        """Delete least recently used blobs until usage <= ``target_bytes``.
+
+        Defaults to ``LOW_WATERMARK`` of the quota. Returns the number of blobs
+        removed.
+        """
+        if target_bytes is None:
+            if self.max_bytes is None:
+                return 0
+            target_bytes = int(self.max_bytes * LOW_WATERMARK)
+        protected = set(protect)
+        removed = 0
+        with self._lock:
+            entries = self._scan()
+            usage = sum(size for _, size, _ in entries)
+            cutoff = time.time() - self.grace_seconds
+            for mtime, size, path in sorted(entries):
+                if usage <= target_bytes:
+                    break
+                if mtime > cutoff or path.name in protected:
+                    continue
+                with suppress(FileNotFoundError):  # another worker evicted it first
+                    path.unlink()
+                    removed += 1
+                    BLOB_STORE_EVENTS.inc("evict")
+                usage -= size
+            self._usage = usage
+        BLOB_STORE_BYTES.set(usage)
+        return removed
+
+    # ------------------------------------------------------------------
+    def _publish(self, tmp: str, key: str, size: int) -> None:
+        final = self.path(key)
+        if final.is_file():
+            os.unlink(tmp)
+            self.touch(key)
+            BLOB_STORE_EVENTS.inc("dedup")
+            return
+        final.parent.mkdir(parents=True, exist_ok=True)
+        self.usage  # measure before publishing so a first scan cannot count this blob twice
+        os.replace(tmp, final)
+        BLOB_STORE_EVENTS.inc("write")
+        with self._lock:
+            self._usage = (self._usage or 0) + size
+            usage = self._usage
+        BLOB_STORE_BYTES.set(usage)
+        if self.max_bytes is not None and usage > self.max_bytes:
+            self.evict(protect=[key])
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every blob; also sweeps stale temp files."""
+        entries: List[Tuple[float, int, Path]] = []
+        stale = time.time() - _STALE_TMP_SECONDS
+        for shard in _subdirs(self.root):
+            for sub in _subdirs(Path(shard.path)):
+                for entry in os.scandir(sub.path):
+                    with suppress(FileNotFoundError):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        for entry in os.scandir(self._tmp_dir):
+            with suppress(FileNotFoundError):
+                if entry.stat().st_mtime < stale:
+                    os.unlink(entry.path)
+        return entries
+
+
+def _subdirs(path: Path) -> Iterator[os.DirEntry]:
+    for entry in os.scandir(path):
+        if len(entry.name) == 2 and entry.is_dir():
+            yield entry
+
+
+_store_singleton: Optional[FileBlobStore] = None
+
+
+def get_blob_store() -> FileBlobStore:
+    """Process-wide store configured from ``BLOB_STORE_DIR`` / ``BLOB_STORE_MAX_BYTES``."""
+    global _store_singleton
+    if _store_singleton is None:
+        settings = get_settings()
+        root = settings.blob_store_dir or os.path.join(tempfile.gettempdir(), "intj-blobs")
+        _store_singleton = FileBlobStore(root, max_bytes=settings.blob_store_max_bytes)
+    return _store_singleton
+
+
+__all__ = ["FileBlobStore", "get_blob_store", "LOW_WATERMARK"]
@@ -1,57 +1,121 @@
 from __future__ import annotations
 
 from typing import Iterable
-from sqlalchemy import delete
-from sqlalchemy.orm import Session
-from .db import get_session_factory
+from pydantic import ValidationError
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload, undefer
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import get_session_factory, get_async_session_factory
 from .models import CaseORM, TimelineEventORM, EvidenceORM
-from ..application.extraction_models import CaseExtraction
+from .metrics import CASE_SNAPSHOT_READS
+from .tracing import span
+from ..application.extraction_models import CaseExtraction, Event, Evidence
+
+
+def _event_rows(case_id: str, extraction: CaseExtraction) -> list[TimelineEventORM]:
+    return [
+        TimelineEventORM(
+            case_id=case_id,
+            event_id=ev.event_id,
+            event_name=ev.event_name,
+            event_description=ev.event_description,
+            event_date=ev.event_date,
+            event_page_init=ev.event_page_init,
+            event_page_end=ev.event_page_end,
+        )
+        for ev in extraction.timeline
+    ]
+
+
+def _evidence_rows(case_id: str, extraction: CaseExtraction) -> list[EvidenceORM]:
+    return [
+        EvidenceORM(
+            case_id=case_id,
+            evidence_id=evd.evidence_id,
+            evidence_name=evd.evidence_name,
+            evidence_flaw=evd.evidence_flaw,
+            evidence_page_init=evd.evidence_page_init,
+            evidence_page_end=evd.evidence_page_end,
+        )
+        for evd in extraction.evidence
+    ]
+
+
+def _to_extraction(db_case: CaseORM) -> CaseExtraction:
+    """Rebuild a CaseExtraction from ORM rows.
+
+    Rows were written from validated models and the columns are typed, so the
+    models are constructed without another validation pass.
+    """
+    timeline = [
+        Event.model_construct(
+            event_id=t.event_id,
+            event_name=t.event_name,
+            event_description=t.event_description,
+            event_date=t.event_date,
+            event_page_init=t.event_page_init,
+            event_page_end=t.event_page_end,
+        )
+        for t in sorted(db_case.timelines, key=lambda x: x.event_id)
+    ]
+    evidence = [
+        Evidence.model_construct(
+            evidence_id=e.evidence_id,
+            evidence_name=e.evidence_name,
+            evidence_flaw=e.evidence_flaw,
+            evidence_page_init=e.evidence_page_init,
+            evidence_page_end=e.evidence_page_end,
+        )
+        for e in sorted(db_case.evidences, key=lambda x: x.evidence_id)
+    ]
+    return CaseExtraction.model_construct(resume=db_case.resume, timeline=timeline, evidence=evidence)
+
+
+def _snapshot(extraction: CaseExtraction) -> dict:
+    return extraction.model_dump(mode="json")
+
+
+def _from_snapshot(snapshot: dict | None) -> CaseExtraction | None:
+    """CaseExtraction from ``cases.snapshot``; None when missing or not loadable.
+
+    ``model_validate`` on the decoded dict runs in pydantic-core and is faster
+    than building each item with ``model_construct`` in Python.
+    """
+    if not snapshot:
+        return None
+    try:
+        return CaseExtraction.model_validate(snapshot)
+    except ValidationError:
+        return None
 
 
 class CaseRepository:
+    """Synchronous repository (scripts, Alembic data migrations, tests)."""
+
     def __init__(self, session: Session | None = None):
         self._Session = get_session_factory()
         self._external_session = session
 
-    def save_extraction(self, case_id: str, extraction: CaseExtraction) -> None:
+    def save_extraction(self, case_id: str, extraction: CaseExtraction, *, pdf_profile: dict | None = None) -> None:
         session = self._external_session or self._Session()
         close = self._external_session is None
         try:
             # Upsert case
             db_case = session.get(CaseORM, case_id)
             if db_case is None:
-                db_case = CaseORM(case_id=case_id, resume=extraction.resume)
+                db_case = CaseORM(case_id=case_id, resume=extraction.resume, snapshot=_snapshot(extraction))
                 session.add(db_case)
             else:
                 db_case.resume = extraction.resume
+                db_case.snapshot = _snapshot(extraction)
+            if pdf_profile is not None:
+                db_case.pdf_profile = pdf_profile
             # Clear existing children
             session.execute(delete(TimelineEventORM).where(TimelineEventORM.case_id == case_id))
             session.execute(delete(EvidenceORM).where(EvidenceORM.case_id == case_id))
-            # Insert new timeline events
-            for ev in extraction.timeline:
-                session.add(
-                    TimelineEventORM(
-                        case_id=case_id,
-                        event_id=ev.event_id,
-                        event_name=ev.event_name,
-                        event_description=ev.event_description,
-                        event_date=ev.event_date,
-                        event_page_init=ev.event_page_init,
-                        event_page_end=ev.event_page_end,
-                    )
-                )
-            # Insert evidence
-            for evd in extraction.evidence:
-                session.add(
-                    EvidenceORM(
-                        case_id=case_id,
-                        evidence_id=evd.evidence_id,
-                        evidence_name=evd.evidence_name,
-                        evidence_flaw=evd.evidence_flaw,
-                        evidence_page_init=evd.evidence_page_init,
-                        evidence_page_end=evd.evidence_page_end,
-                    )
-                )
+            # Insert new timeline events and evidence
+            session.add_all(_event_rows(case_id, extraction))
+            session.add_all(_evidence_rows(case_id, extraction))
             session.commit()
         except Exception:
             session.rollback()
@@ -64,31 +128,12 @@ class CaseRepository:
         session = self._external_session or self._Session()
         close = self._external_session is None
         try:
-            db_case = session.get(CaseORM, case_id)
+            db_case = session.get(CaseORM, case_id, options=[undefer(CaseORM.snapshot)])
             if not db_case:
                 return None
-            timeline = [
-                {
-                    "event_id": t.event_id,
-                    "event_name": t.event_name,
-                    "event_description": t.event_description,
-                    "event_date": t.event_date,
-                    "event_page_init": t.event_page_init,
-                    "event_page_end": t.event_page_end,
-                }
-                for t in db_case.timelines
-            ]
-            evidence = [
-                {
-                    "evidence_id": e.evidence_id,
-                    "evidence_name": e.evidence_name,
-                    "evidence_flaw": e.evidence_flaw,
-                    "evidence_page_init": e.evidence_page_init,
-                    "evidence_page_end": e.evidence_page_end,
-                }
-                for e in db_case.evidences
-            ]
-            return CaseExtraction(resume=db_case.resume, timeline=timeline, evidence=evidence)  # type: ignore
+            extraction = _from_snapshot(db_case.snapshot)
+            CASE_SNAPSHOT_READS.inc("miss" if extraction is None else "hit")
+            return extraction or _to_extraction(db_case)
         finally:
             if close:
                 session.close()
@@ -102,33 +147,133 @@ class CaseRepository:
         close = self._external_session is None
         try:
             query = session.query(CaseORM).order_by(CaseORM.case_id).offset(offset).limit(limit)
-            results: list[tuple[str, CaseExtraction]] = []
-            for db_case in query.all():
-                timeline = [
-                    {
-                        "event_id": t.event_id,
-                        "event_name": t.event_name,
-                        "event_description": t.event_description,
-                        "event_date": t.event_date,
-                        "event_page_init": t.event_page_init,
-                        "event_page_end": t.event_page_end,
-                    }
-                    for t in sorted(db_case.timelines, key=lambda x: x.event_id)
-                ]
-                evidence = [
-                    {
-                        "evidence_id": e.evidence_id,
-                        "evidence_name": e.evidence_name,
-                        "evidence_flaw": e.evidence_flaw,
-                        "evidence_page_init": e.evidence_page_init,
-                        "evidence_page_end": e.evidence_page_end,
-                    }
-                    for e in sorted(db_case.evidences, key=lambda x: x.evidence_id)
-                ]
-                results.append((db_case.case_id, CaseExtraction(resume=db_case.resume, timeline=timeline, evidence=evidence)))  # type: ignore
-            return results
+            return [(db_case.case_id, _to_extraction(db_case)) for db_case in query.all()]
         finally:
             if close:
                 session.close()
 
-__all__ = ["CaseRepository"]
+
+class AsyncCaseRepository:
+    """Asyncio counterpart of CaseRepository used by the API routes.
+
+    Relationships are eager-loaded with ``selectinload`` because lazy loads
+    are not allowed on an AsyncSession.
+    """
+
+    def __init__(self, session: AsyncSession | None = None):
+        self._external_session = session
+        self._Session = get_async_session_factory() if session is None else None
+
+    def _session(self) -> tuple[AsyncSession, bool]:
+        if self._external_session is not None:
+            return self._external_session, False
+        return self._Session(), True  # type: ignore[misc]
+
+    async def save_extraction(self, case_id: str, extraction: CaseExtraction, *, pdf_profile: dict | None = None) -> None:
+        """Replace the case's extraction; ``pdf_profile`` (pre-flight) is kept when not given."""
+        session, close = self._session()
+        try:
+            with span("db.case.save", **{"case.id": case_id}) as sp:
+                db_case = await session.get(CaseORM, case_id)
+                if db_case is None:
+                    db_case = CaseORM(case_id=case_id, resume=extraction.resume, snapshot=_snapshot(extraction))
+                    session.add(db_case)
+                else:
+                    db_case.resume = extraction.resume
+                    db_case.snapshot = _snapshot(extraction)
+                if pdf_profile is not None:
+                    db_case.pdf_profile = pdf_profile
+                await session.execute(delete(TimelineEventORM).where(TimelineEventORM.case_id == case_id))
+                await session.execute(delete(EvidenceORM).where(EvidenceORM.case_id == case_id))
+                session.add_all(_event_rows(case_id, extraction))
+                session.add_all(_evidence_rows(case_id, extraction))
+                await session.commit()
+                sp.set_attribute("db.rows_written", 1 + len(extraction.timeline) + len(extraction.evidence))
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            if close:
+                await session.close()
+
+    async def get_case(self, case_id: str) -> CaseExtraction | None:
+        """Single primary-key read of ``cases.snapshot``.
+
+        Cases without a snapshot (written before it existed and not yet
+        backfilled) fall back to loading the normalized child tables.
+        """
+        session, close = self._session()
+        try:
+            stmt = (
+                select(CaseORM)
+                .where(CaseORM.case_id == case_id)
+                .options(undefer(CaseORM.snapshot))
+                .execution_options(populate_existing=True)
+            )
+            with span("db.case.get", **{"case.id": case_id}) as sp:
+                db_case = (await session.execute(stmt)).scalar_one_or_none()
+                if db_case is None:
+                    return None
+                extraction = _from_snapshot(db_case.snapshot)
+                if extraction is not None:
+                    CASE_SNAPSHOT_READS.inc("hit")
+                    sp.set_attributes(**{"db.rows_read": 1, "db.snapshot": True})
+                    return extraction
+                CASE_SNAPSHOT_READS.inc("miss")
+                stmt = stmt.options(selectinload(CaseORM.timelines), selectinload(CaseORM.evidences))
+                db_case = (await session.execute(stmt)).scalar_one()
+                sp.set_attributes(**{"db.rows_read": 1 + len(db_case.timelines) + len(db_case.evidences), "db.snapshot": False})
+                return _to_extraction(db_case)
+        finally:
+            if close:
+                await session.close()
+
+    async def get_pdf_profile(self, case_id: str) -> dict | None:
+        """Pre-flight profile stored with the case's last extraction (None when absent)."""
+        session, close = self._session()
+        try:
+            with span("db.case.pdf_profile", **{"case.id": case_id}):
+                return (await session.execute(select(CaseORM.pdf_profile).where(CaseORM.case_id == case_id))).scalar_one_or_none()
+        finally:
+            if close:
+                await session.close()
+
+    async def list_cases(self, *, limit: int = 100, offset: int = 0) -> list[tuple[str, CaseExtraction]]:
+        session, close = self._session()
+        try:
+            stmt = (
+                select(CaseORM)
+                .order_by(CaseORM.case_id)
+                .offset(offset)
+                .limit(limit)
+                .options(selectinload(CaseORM.timelines), selectinload(CaseORM.evidences))
+                .execution_options(populate_existing=True)
+            )
+            with span("db.case.list", **{"db.limit": limit, "db.offset": offset}) as sp:
+                rows = (await session.execute(stmt)).scalars().all()
+                sp.set_attribute("db.cases_read", len(rows))
+                return [(db_case.case_id, _to_extraction(db_case)) for db_case in rows]
+        finally:
+            if close:
+                await session.close()
+
+    async def list_case_summaries(self, *, limit: int = 100, offset: int = 0) -> list[tuple[str, str]]:
+        """Paginated ``(case_id, resume)`` pairs: one narrow query, no child rows or snapshot."""
+        session, close = self._session()
+        try:
+            stmt = select(CaseORM.case_id, CaseORM.resume).order_by(CaseORM.case_id).offset(offset).limit(limit)
+            with span("db.case.list", **{"db.limit": limit, "db.offset": offset}) as sp:
+                rows = (await session.execute(stmt)).all()
+                sp.set_attribute("db.cases_read", len(rows))
+                return [(case_id, resume) for case_id, resume in rows]
+        finally:
+            if close:
+                await session.close()
+
+
+def get_async_case_repository() -> AsyncCaseRepository:
+    """FastAPI dependency provider (override in tests)."""
+    return AsyncCaseRepository()
+
+
+__all__ = ["CaseRepository", "AsyncCaseRepository", "get_async_case_repository"]
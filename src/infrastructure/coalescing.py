@@ -0,0 +1,239 @@
+"""Single-flight coalescing of identical extractions, in process and across nodes.
+
+Two layers, both keyed on ``case_id`` (optionally plus the PDF URL):
+
+- ``SingleFlight``: concurrent calls on one worker with the same key share
+  one in-flight future, so only the first runs the pipeline.
+- ``PgAdvisoryLock``: across workers and hosts, the caller that runs the
+  pipeline holds a Postgres advisory lock (keyed on a 64-bit hash of the key)
+  until its result is saved. A caller that finds the lock taken reads the
+  stored case once, polls until the lock is released, then reuses the stored
+  case instead of extracting again. It extracts itself only if the stored case
+  did not change while it waited. ``ExtractService`` saves a case only after a
+  successful model call, so an unchanged case means the first extraction
+  failed (or could not be saved). The uncontended path never reads the case.
+
+On databases other than Postgres, or when the database is unreachable, the
+lock degrades to a no-op and only in-process coalescing applies.
+"""
+from __future__ import annotations
+
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import hashlib
+import logging
+
+from sqlalchemy import text
+
+from .metrics import COALESCED
+from .resilience import DeadlineExceeded, check_deadline, remaining, remaining_or
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+MODES = {"off", "local", "cluster"}
+KEY_MODES = {"case", "case_url"}
+
+
+def coalesce_key(case_id: str, pdf_url: str | None = None, mode: str = "case") -> str:
+    if mode not in KEY_MODES:
+        raise ValueError(f"Invalid coalescing key mode {mode!r}; expected one of {sorted(KEY_MODES)}")
+    return f"{case_id}\x00{pdf_url}" if mode == "case_url" and pdf_url else case_id
+
+
+def lock_id(key: str) -> int:
+    """Signed 64-bit advisory lock id for ``key``."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class SingleFlight:
+    """Concurrent ``do(key, fn)`` calls on one event loop share the first call's outcome."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            COALESCED.inc("local")
+            left = remaining()
+            try:
+                # shield: a waiter timing out must not cancel the shared call
+                return await asyncio.wait_for(asyncio.shield(future), timeout=left)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded("coalesce") from None
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved: there may be no waiters
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+
+class PgAdvisoryLock:
+    """Session-level ``pg_try_advisory_lock`` held on a dedicated connection."""
+
+    def __init__(self, engine_factory: Callable[[], Any] | None = None):
+        self._engine_factory = engine_factory
+
+    def _engine(self):
+        if self._engine_factory is not None:
+            return self._engine_factory()
+        from .db import get_async_engine
+
+        return get_async_engine()
+
+    @asynccontextmanager
+    async def acquire(self, key: str) -> AsyncIterator[bool]:
+        """Yield True when this caller holds the lock (or locking is unavailable), False when taken."""
+        conn = None
+        try:
+            engine = self._engine()
+            if engine.dialect.name != "postgresql":
+                yield True
+                return
+            conn = await engine.connect()
+            got = bool((await conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": lock_id(key)})).scalar())
+        except Exception as exc:  # no database: in-process coalescing only
+            if conn is not None:
+                await conn.close()
+            logger.debug("advisory lock unavailable: %s", exc)
+            COALESCED.inc("lock_unavailable")
+            yield True
+            return
+        try:
+            yield got
+        finally:
+            try:
+                if got:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": lock_id(key)})
+                    await conn.commit()
+            finally:
+                await conn.close()
+
+
+class ExtractionCoalescer:
+    """Run ``fn`` once per key across concurrent callers, locally and (optionally) cluster-wide.
+
+    ``load`` reads the currently stored result for the key (None when absent);
+    followers on other nodes reuse it once the leader releases the lock.
+    ``gate`` (e.g. a scheduler slot) is entered by the local leader before it
+    tries the advisory lock. A lock connection is then only held by callers
+    that can run right away, never by callers still waiting in a queue.
+    """
+
+    def __init__(
+        self,
+        *,
+        lock: PgAdvisoryLock | None = None,
+        poll_interval: float = 0.25,
+        key_mode: str = "case",
+    ):
+        self._flight = SingleFlight()
+        self._lock = lock
+        self.poll_interval = poll_interval
+        self.key_mode = key_mode
+
+    def key(self, case_id: str, pdf_url: str | None = None) -> str:
+        return coalesce_key(case_id, pdf_url, self.key_mode)
+
+    def in_flight(self, key: str) -> bool:
+        return self._flight.in_flight(key)
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        load: Callable[[], Awaitable[Optional[Any]]],
+        reuse: Callable[[Any], T],
+        gate: Callable[[], AsyncContextManager[Any]] | None = None,
+    ) -> T:
+        if self._lock is None and gate is None:
+            return await self._flight.do(key, fn)
+        return await self._flight.do(key, lambda: self._lead(key, fn, load, reuse, gate))
+
+    async def _lead(self, key, fn, load, reuse, gate):
+        async with gate() if gate is not None else nullcontext():
+            if self._lock is None:
+                return await fn()
+            return await self._run_locked(key, fn, load, reuse)
+
+    async def _run_locked(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        load: Callable[[], Awaitable[Optional[Any]]],
+        reuse: Callable[[Any], T],
+    ) -> T:
+        assert self._lock is not None
+        before: Optional[Any] = None
+        contended = False
+        while True:
+            async with self._lock.acquire(key) as held:
+                if held:
+                    if contended:
+                        after = await _safe_load(load)
+                        if after is not None and after != before:
+                            COALESCED.inc("remote")
+                            return reuse(after)
+                    return await fn()
+            if not contended:
+                # Only followers read the stored case. If the leader saves before this
+                # read, the result looks unchanged and we extract again (never stale).
+                before = await _safe_load(load)
+                contended = True
+            check_deadline("coalesce")
+            await asyncio.sleep(min(self.poll_interval, remaining_or(self.poll_interval)))
+
+
+async def _safe_load(load: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+    try:
+        return await load()
+    except Exception:
+        return None
+
+
+_coalescer_singleton: Optional[ExtractionCoalescer] = None
+
+
+def get_coalescer() -> Optional[ExtractionCoalescer]:
+    """Process-wide coalescer per ``COALESCE_MODE`` (off | local | cluster); None when off."""
+    global _coalescer_singleton
+    from .settings import get_settings
+
+    settings = get_settings()
+    if settings.coalesce_mode not in MODES:
+        raise ValueError(f"Invalid coalescing mode {settings.coalesce_mode!r}; expected one of {sorted(MODES)}")
+    if settings.coalesce_mode == "off":
+        return None
+    if _coalescer_singleton is None:
+        lock = PgAdvisoryLock() if settings.coalesce_mode == "cluster" else None
+        _coalescer_singleton = ExtractionCoalescer(lock=lock, key_mode=settings.coalesce_key)
+    return _coalescer_singleton
+
+
+__all__ = [
+    "SingleFlight",
+    "PgAdvisoryLock",
+    "ExtractionCoalescer",
+    "coalesce_key",
+    "lock_id",
+    "get_coalescer",
+]
@@ -0,0 +1,194 @@
+"""Gemini context caching for the static extraction prompt.
+
+The extraction instructions are identical for every request of a prompt
+version, so they are uploaded once per (model, prompt) as Gemini cached
+content. Generations then send only the document plus
+``CACHED_PROMPT_REFERENCE``. Cached prompt tokens are billed at the reduced
+rate and reported as ``cached_content_token_count``.
+
+Each cache lives ``GEMINI_CONTEXT_CACHE_TTL_S``. When a lookup falls within
+``GEMINI_CONTEXT_CACHE_REFRESH_S`` of expiry, the TTL is extended, so a busy
+process keeps one cache alive indefinitely. An expired cache, or one that
+failed to refresh, is created again. If creation fails (SDK without caching,
+or a model that does not support it), the failure is remembered for one TTL.
+Requests in that time send the full prompt, so a missing cache never fails
+an extraction.
+
+Gemini rejects cached content below a per-model minimum (32,768 tokens on
+1.5 models, ``GEMINI_CONTEXT_CACHE_MIN_TOKENS``). A prompt whose estimated
+size is below it is never sent to ``create``: it is bypassed for the life of
+the process. The v1 prompt is far below that minimum, which is why caching is
+off by default (``GEMINI_CONTEXT_CACHE=0``). It pays off only for much
+longer prompts, e.g. with few-shot examples.
+
+All SDK calls go through a backend object and time comes from ``clock``, so
+tests can run the cache with a fake backend and a fake clock.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+import logging
+import math
+import threading
+import time
+
+from .metrics import CONTEXT_CACHE
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token, to size prompts without a count_tokens round trip
+CHARS_PER_TOKEN = 4
+# Sent instead of the full prompt when the instructions come from the cache
+CACHED_PROMPT_REFERENCE = "Apply the cached instructions to the document above. Return ONLY the JSON object."
+
+
+class CacheBackend(Protocol):
+    def create(self, model: str, prompt: str, ttl: float) -> Any: ...
+
+    def refresh(self, handle: Any, ttl: float) -> None: ...
+
+    def bind(self, handle: Any) -> Any: ...
+
+
+class SdkCacheBackend:
+    """google-generativeai ``caching.CachedContent`` (imported lazily, like the client)."""
+
+    def __init__(self, sdk: Callable[[], Any] | None = None):
+        if sdk is None:
+            from .gemini_client import _sdk
+
+            sdk = _sdk
+        self._sdk = sdk
+
+    def _module(self) -> Any:
+        sdk = self._sdk()
+        if sdk is None or not hasattr(sdk, "caching"):
+            raise RuntimeError("google-generativeai context caching not available")
+        return sdk
+
+    def create(self, model: str, prompt: str, ttl: float) -> Any:
+        name = model if model.startswith("models/") else f"models/{model}"
+        return self._module().caching.CachedContent.create(
+            model=name,
+            display_name="intj-extraction-prompt",
+            system_instruction=prompt,
+            ttl=timedelta(seconds=ttl),
+        )
+
+    def refresh(self, handle: Any, ttl: float) -> None:
+        handle.update(ttl=timedelta(seconds=ttl))
+
+    def bind(self, handle: Any) -> Any:
+        return self._module().GenerativeModel.from_cached_content(cached_content=handle)
+
+
+@dataclass
+class _Entry:
+    handle: Any  # None: creation failed, do not retry before expires_at
+    model: Any
+    expires_at: float
+
+
+class PromptContextCache:
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        ttl: float = 3600.0,
+        refresh_margin: float = 300.0,
+        min_tokens: int = 32_768,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._backend = backend if backend is not None else SdkCacheBackend()
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl / 2)
+        self.min_tokens = min_tokens
+        self._clock = clock
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        # One lock: creates / refreshes are rare (once per TTL) and callers of the
+        # same key would wait for them anyway.
+        self._lock = threading.Lock()
+
+    def model_for(self, model: str, prompt: str) -> Optional[Any]:
+        """A model bound to the cached ``prompt``, or None to send the full prompt."""
+        key = (model, prompt)  # str hashes are memoised; the prompt object is built once
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                if entry.handle is None:
+                    CONTEXT_CACHE.inc(model, "bypass")
+                    return None
+                if now < entry.expires_at - self.refresh_margin:
+                    CONTEXT_CACHE.inc(model, "hit")
+                    return entry.model
+                if self._refresh(model, entry, now):
+                    return entry.model
+            return self._create(key, now)
+
+    def _refresh(self, model: str, entry: _Entry, now: float) -> bool:
+        try:
+            with span("gemini.context_cache.refresh", **{"gemini.model": model}):
+                self._backend.refresh(entry.handle, self.ttl)
+        except Exception as exc:
+            logger.warning("context cache refresh failed for %s: %s", model, exc)
+            return False
+        entry.expires_at = now + self.ttl
+        CONTEXT_CACHE.inc(model, "refreshed")
+        return True
+
+    def _create(self, key: Tuple[str, str], now: float) -> Optional[Any]:
+        model, prompt = key
+        if len(prompt) // CHARS_PER_TOKEN < self.min_tokens:
+            # Below the model's minimum: creation would always fail, so never try
+            self._entries[key] = _Entry(handle=None, model=None, expires_at=math.inf)
+            CONTEXT_CACHE.inc(model, "too_small")
+            return None
+        try:
+            with span("gemini.context_cache.create", **{"gemini.model": model}):
+                handle = self._backend.create(model, prompt, self.ttl)
+                bound = self._backend.bind(handle)
+        except Exception as exc:
+            logger.info("context cache unavailable for %s (full prompt sent): %s", model, exc)
+            self._entries[key] = _Entry(handle=None, model=None, expires_at=now + self.ttl)
+            CONTEXT_CACHE.inc(model, "failed")
+            return None
+        self._entries[key] = _Entry(handle=handle, model=bound, expires_at=now + self.ttl)
+        CONTEXT_CACHE.inc(model, "created")
+        return bound
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_context_cache_singleton: Optional[PromptContextCache] = None
+
+
+def get_context_cache() -> Optional[PromptContextCache]:
+    """Process-wide cache per ``GEMINI_CONTEXT_CACHE*`` settings; None when disabled."""
+    global _context_cache_singleton
+    from .settings import get_settings
+
+    settings = get_settings()
+    if not settings.gemini_context_cache:
+        return None
+    if _context_cache_singleton is None:
+        _context_cache_singleton = PromptContextCache(
+            ttl=settings.gemini_context_cache_ttl_s,
+            refresh_margin=settings.gemini_context_cache_refresh_s,
+            min_tokens=settings.gemini_context_cache_min_tokens,
+        )
+    return _context_cache_singleton
+
+
+__all__ = [
+    "CACHED_PROMPT_REFERENCE",
+    "CacheBackend",
+    "PromptContextCache",
+    "SdkCacheBackend",
+    "get_context_cache",
+]
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine, text
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import create_engine, event, text
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, NullPool, AsyncAdaptedQueuePool
 from .settings import get_settings
 
 
@@ -10,13 +16,145 @@ class Base(DeclarativeBase):
 
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
 _db_checked = False
 
+
+# ---------------------------------------------------------------------------
+# Pool instrumentation
+# ---------------------------------------------------------------------------
+class PoolStats:
+    """Counters for one engine's pool (label: 'sync' or 'async').
+
+    Checkout wait is timed around ``Pool._do_get`` so it includes queueing for
+    a free slot (QueuePool) or opening a new connection (NullPool).
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.mode = "unconfigured"
+        self.engine: Any = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checked_out = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def on_checkout(self, *_args) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def on_checkin(self, *_args) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        size = overflow = None
+        if isinstance(pool, QueuePool):
+            size = pool.size()
+            overflow = max(0, pool.overflow())
+        return {
+            "engine": self.label,
+            "mode": self.mode,
+            "pool_size": size,
+            "overflow": overflow,
+            "checked_out": self.checked_out,
+            "checkouts_total": self.checkouts,
+            "checkout_timeouts_total": self.timeouts,
+            "checkout_wait_seconds": {
+                "count": self.wait_count,
+                "sum": self.wait_sum,
+                "max": self.wait_max,
+            },
+        }
+
+
+_POOL_STATS: Dict[str, PoolStats] = {"sync": PoolStats("sync"), "async": PoolStats("async")}
+
+
+class _TimedCheckoutMixin:
+    _stats_label = "sync"
+
+    def _do_get(self):  # type: ignore[override]
+        stats = _POOL_STATS[self._stats_label]
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except sa_exc.TimeoutError:
+            with stats._lock:
+                stats.timeouts += 1
+            raise
+        finally:
+            stats.observe_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    _stats_label = "sync"
+
+
+class InstrumentedNullPool(_TimedCheckoutMixin, NullPool):
+    _stats_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    _stats_label = "async"
+
+
+class InstrumentedAsyncNullPool(_TimedCheckoutMixin, NullPool):
+    _stats_label = "async"
+
+
+_POOL_CLASSES = {
+    ("sync", "queue"): InstrumentedQueuePool,
+    ("sync", "null"): InstrumentedNullPool,
+    ("async", "queue"): InstrumentedAsyncQueuePool,
+    ("async", "null"): InstrumentedAsyncNullPool,
+}
+
+
+def engine_pool_kwargs(label: str) -> Dict[str, Any]:
+    """Translate the settings pool profile into create_engine kwargs."""
+    config = dict(get_settings().pool_config())
+    mode = config.pop("mode")
+    return {"poolclass": _POOL_CLASSES[(label, mode)], **config}
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Attach checkout/checkin listeners and register the pool for metrics."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    stats = _POOL_STATS[label]
+    stats.engine = sync_engine
+    stats.mode = "null" if isinstance(sync_engine.pool, NullPool) else "queue"
+    event.listen(sync_engine, "checkout", stats.on_checkout)
+    event.listen(sync_engine, "checkin", stats.on_checkin)
+
+
+def pool_metrics() -> list[Dict[str, Any]]:
+    """Snapshot of pool usage for every engine created so far."""
+    return [stats.snapshot() for stats in _POOL_STATS.values() if stats.engine is not None]
+
+
 def get_engine():
     global _engine
     if _engine is None:
         settings = get_settings()
-        _engine = create_engine(settings.database_url(), future=True)
+        _engine = create_engine(settings.database_url(), future=True, **engine_pool_kwargs("sync"))
+        instrument_engine(_engine, "sync")
     return _engine
 
 def get_session_factory():
@@ -26,6 +164,48 @@ def get_session_factory():
     return _SessionLocal
 
 
+def get_async_engine():
+    """Async engine used by request handlers (psycopg async driver).
+
+    The sync engine above stays available for scripts and Alembic.
+    """
+    global _async_engine
+    if _async_engine is None:
+        settings = get_settings()
+        _async_engine = create_async_engine(settings.async_database_url(), **engine_pool_kwargs("async"))
+        instrument_engine(_async_engine, "async")
+    return _async_engine
+
+
+def get_async_session_factory():
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+
+def dispose_engine() -> None:
+    """Close the sync engine so the next call rebuilds it from settings."""
+    global _engine, _SessionLocal
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _POOL_STATS["sync"].engine = None
+    _POOL_STATS["sync"].reset()
+    _SessionLocal = None
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (called on application shutdown)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _POOL_STATS["async"].engine = None
+    _POOL_STATS["async"].reset()
+    _AsyncSessionLocal = None
+
+
 def ensure_database_exists() -> None:
     """Ensure the target Postgres database exists.
 
@@ -58,4 +238,17 @@ def ensure_database_exists() -> None:
     finally:
         _db_checked = True
 
-__all__ = ["Base", "get_engine", "get_session_factory", "ensure_database_exists"]
+__all__ = [
+    "Base",
+    "get_engine",
+    "get_session_factory",
+    "get_async_engine",
+    "get_async_session_factory",
+    "dispose_engine",
+    "dispose_async_engine",
+    "ensure_database_exists",
+    "PoolStats",
+    "engine_pool_kwargs",
+    "instrument_engine",
+    "pool_metrics",
+]
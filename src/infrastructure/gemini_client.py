@@ -1,38 +1,179 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-import json
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List
 import time
-import re
 import logging
-import os
-
-try:  # Import guarded so tests without dependency or key still pass
-    import google.generativeai as google_genai  # correct SDK
-    genai = google_genai  # backward compat alias for tests mocking 'genai'
-except Exception:  # pragma: no cover - soft import
-    google_genai = None  # type: ignore
-    genai = None  # type: ignore
+import threading
 
 from .settings import get_settings
-from ..application.extraction_models import CaseExtraction
+from .metrics import STAGE_SECONDS, FALLBACKS, JSON_SCANS, LLM_FIRST_ITEM_SECONDS, LLM_RETRIES, LLM_STREAMED_ITEMS, LLM_TOKENS
+from .json_scan import scan_json
+from .context_cache import CACHED_PROMPT_REFERENCE, PromptContextCache, get_context_cache
+from .gemini_structured import IncrementalExtractionParser, generation_config
+from .resilience import (
+    DeadlineExceeded,
+    RetryPolicy,
+    call_with_retry,
+    check_deadline,
+    deadline_expired,
+    hedged_call,
+    latency_window,
+    remaining,
+    remaining_or,
+)
+from .tracing import span
+from ..application.extraction_models import Event, Evidence, validate_items
+
+# The SDK is imported on first use (see _sdk): it pulls in grpc/protobuf and
+# IPython helpers, which dominates Lambda init time for requests that never
+# touch Gemini. Tests patch the 'genai' alias directly.
+google_genai = None  # type: ignore
+genai = None  # type: ignore
+_sdk_import_attempted = False
+
+
+def _sdk():
+    """Return the google-generativeai module (or a patched stand-in), importing lazily."""
+    global google_genai, genai, _sdk_import_attempted
+    # Order matters: prefer alias 'genai' so tests patching it override real module
+    if genai is not None:
+        return genai
+    if not _sdk_import_attempted:
+        _sdk_import_attempted = True
+        try:  # Import guarded so tests without dependency or key still pass
+            import google.generativeai as sdk_module  # correct SDK
+
+            google_genai = sdk_module
+            genai = sdk_module  # backward compat alias for tests mocking 'genai'
+        except Exception:  # pragma: no cover - soft import
+            pass
+    return genai or google_genai
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[Any]:
+    """Time a pipeline stage in metrics and as a child span."""
+    with STAGE_SECONDS.time(name), span(f"gemini.{name}") as sp:
+        yield sp
+
+
+# usage_metadata fields kept with each extraction (see record_usage)
+USAGE_FIELDS = ("prompt_token_count", "candidates_token_count", "total_token_count", "cached_content_token_count")
+# Usage of the generation running on this thread. Module level rather than
+# per-instance: replay / recording subclasses share it without extra state.
+_call_state = threading.local()
+
+
+def usage_from(result: Any) -> Dict[str, int] | None:
+    """Integer token counts from a response's ``usage_metadata`` (None when absent)."""
+    meta = getattr(result, "usage_metadata", None)
+    if meta is None:
+        return None
+    usage = {}
+    for field in USAGE_FIELDS:
+        value = getattr(meta, field, None)
+        if isinstance(value, int) and not isinstance(value, bool):
+            usage[field] = value
+    return usage or None
+
+
+def record_usage(usage: Dict[str, int] | None) -> None:
+    """Remember token usage for the ``analyze_pdf`` call running on this thread."""
+    if usage:
+        _call_state.usage = dict(usage)
+
+
+def last_usage() -> Dict[str, int] | None:
+    return getattr(_call_state, "usage", None)
+
+
+RESPONSE_MODES = {"text", "json", "stream"}
+
+
+@dataclass(frozen=True)
+class InlineText:
+    """Document sent as its extracted text (see ``pdf_preflight``) instead of an uploaded file."""
+
+    text: str
+
+
+# Called with ("timeline" | "evidence", validated item) as streamed items complete
+ItemCallback = Callable[[str, Any], None]
+
+
+def count_streamed_item(kind: str, item: Any) -> None:
+    """Default ``on_item`` for clients built from settings: live item counts per kind."""
+    LLM_STREAMED_ITEMS.inc(kind)
 
 
 class GeminiClient:
-    def __init__(self, api_key: str, model: str):
+    """Gemini PDF extraction client.
+
+    ``response_mode``: ``text`` (prompt-only JSON, salvaged by ``scan_json``),
+    ``json`` (native structured output: JSON mime type plus a response schema
+    derived from CaseExtraction) or ``stream`` (structured output streamed and
+    validated item by item; ``on_item`` sees each event as it arrives).
+
+    Upload, processing wait and generation honour the current request
+    deadline (see ``resilience``); transient errors are retried and slow
+    generations optionally hedged per ``retry_policy``.
+
+    With a ``context_cache`` the prompt is sent once as Gemini cached content
+    and each generation carries only the document plus a short reference
+    (see ``context_cache``); without one, or when caching is unavailable,
+    the full prompt goes with every request.
+
+    ``analyze_pdf(..., document_text=...)`` sends the PDF's text layer
+    inline and skips the upload (born-digital documents, see
+    ``pdf_preflight``).
+    """
+
+    # ExtractService passes document_text only to clients that accept it
+    supports_text_input = True
+
+    # None: built from settings on first use (LLM_RETRY_* / LLM_HEDGE_*)
+    retry_policy: RetryPolicy | None = None
+    _sleep = staticmethod(time.sleep)
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        response_mode: str = "text",
+        on_item: ItemCallback | None = None,
+        context_cache: PromptContextCache | None = None,
+    ):
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"Invalid response_mode {response_mode!r}; expected one of {sorted(RESPONSE_MODES)}")
         self.api_key = api_key
         self.model_name = model
-        # Order matters: prefer alias 'genai' so tests patching it override real module
-        active_sdk = genai or google_genai
+        self.response_mode = response_mode
+        self.on_item = on_item
+        self.context_cache = context_cache
+        self._configure_sdk()
+        self._model = None
+
+    def _configure_sdk(self) -> None:
+        active_sdk = _sdk()
         if active_sdk:
             try:
-                active_sdk.configure(api_key=api_key)
+                active_sdk.configure(api_key=self.api_key)
             except Exception:  # pragma: no cover
                 pass
-        self._model = None
+
+    def _active_sdk(self):
+        return _sdk()
+
+    def _policy(self) -> RetryPolicy:
+        if self.retry_policy is None:
+            self.retry_policy = RetryPolicy.from_settings(get_settings())
+        return self.retry_policy
 
     def _get_model(self):  # Lazy load
-        sdk = genai or google_genai
+        sdk = _sdk()
         if not sdk:
             raise RuntimeError(
                 "google-generativeai package not available. Install with 'pip install google-generativeai' (avoid installing the similarly named 'genai' package)."
@@ -41,13 +182,33 @@ class GeminiClient:
             self._model = sdk.GenerativeModel(self.model_name)
         return self._model
 
-    def analyze_pdf(self, file_path: str, prompt: str) -> Dict[str, Any]:
-        """Upload PDF and run Gemini model.
+    def analyze_pdf(self, file_path: str, prompt: str, *, document_text: str | None = None) -> Dict[str, Any]:
+        """Upload PDF (or send ``document_text`` inline) and run Gemini model.
 
         Returns structured dict with resume, timeline, evidence.
         Falls back to stub if SDK not available.
         """
-        active_sdk = genai or google_genai
+        attrs = {"gemini.model": self.model_name, "gemini.input": "file" if document_text is None else "text"}
+        with span("gemini.analyze_pdf", **attrs) as sp:
+            _call_state.usage = None
+            out = self._analyze_pdf(file_path, prompt, document_text=document_text)
+            usage = last_usage()
+            if usage:
+                out["usage"] = usage
+                LLM_TOKENS.inc(self.model_name, "prompt", amount=usage.get("prompt_token_count", 0))
+                LLM_TOKENS.inc(self.model_name, "output", amount=usage.get("candidates_token_count", 0))
+                if usage.get("cached_content_token_count"):
+                    LLM_TOKENS.inc(self.model_name, "cached", amount=usage["cached_content_token_count"])
+                sp.set_attributes(**{f"gemini.{k}": v for k, v in usage.items()})
+            sp.set_attributes(**{
+                "timeline.count": len(out.get("timeline") or []),
+                "evidence.count": len(out.get("evidence") or []),
+                "validation_error": bool(out.get("validation_error")),
+            })
+            return out
+
+    def _analyze_pdf(self, file_path: str, prompt: str, *, document_text: str | None = None) -> Dict[str, Any]:
+        active_sdk = self._active_sdk()
 
         # If SDK missing -> attempt LangChain fallback
         if not active_sdk:
@@ -55,23 +216,28 @@ class GeminiClient:
                 from langchain_google_genai import ChatGoogleGenerativeAI  # type: ignore
                 from pypdf import PdfReader  # type: ignore
             except Exception:
+                FALLBACKS.inc("stub")
                 return {
                     "resume": "(gemini sdk indisponível) Instale 'langchain-google-genai' para fallback.",
                     "timeline": [],
                     "evidence": [],
                     "validation_error": True,
                 }
+            FALLBACKS.inc("langchain")
             extracted = []
-            try:
-                reader = PdfReader(file_path)
-                for i, page in enumerate(reader.pages[:20]):
-                    try:
-                        txt = page.extract_text() or ""
-                    except Exception:
-                        txt = ""
-                    extracted.append(f"\n--- PAGE {i+1} ---\n{txt.strip()}")
-            except Exception:
-                extracted.append("(Falha ao extrair texto)")
+            if document_text is not None:  # text layer already extracted by the pre-flight
+                extracted.append(document_text)
+            else:
+                try:
+                    reader = PdfReader(file_path)
+                    for i, page in enumerate(reader.pages[:20]):
+                        try:
+                            txt = page.extract_text() or ""
+                        except Exception:
+                            txt = ""
+                        extracted.append(f"\n--- PAGE {i+1} ---\n{txt.strip()}")
+                except Exception:
+                    extracted.append("(Falha ao extrair texto)")
             lc_prompt = (
                 prompt
                 + "\n\nCONTEÚDO EXTRAÍDO (parcial):\n"
@@ -95,47 +261,197 @@ class GeminiClient:
             return self._finalize_parsed(parsed, raw_text=str(content))
 
         model = self._get_model()
+        try:
+            file_obj = self._document(active_sdk, file_path, document_text)
+        except DeadlineExceeded as exc:
+            return self._deadline_result(exc)
+        except Exception as exc:  # pragma: no cover
+            if deadline_expired():  # the SDK call itself ran out of time
+                return self._deadline_result(DeadlineExceeded("upload"))
+            return self._error_result("upload error", exc)
+        if self.response_mode == "stream":
+            return self._generate_streaming(model, file_obj, prompt)
+        try:
+            with _stage("generation"):
+                raw_text = self._call_generate(model, file_obj, prompt)
+        except DeadlineExceeded as exc:
+            return self._deadline_result(exc)
+        except Exception as exc:
+            if deadline_expired():
+                return self._deadline_result(DeadlineExceeded("generation"))
+            return self._error_result("generation error", exc)
+        return self._parse_raw(raw_text)
+
+    def _document(self, active_sdk: Any, file_path: str, document_text: str | None) -> Any:
+        """What generations reference: the inline text layer, or the uploaded file."""
+        if document_text is not None:
+            return InlineText(document_text)
+        return self._upload(active_sdk, file_path)
+
+    def _upload(self, active_sdk: Any, file_path: str) -> Any:
+        """Upload the PDF and wait while Gemini is still processing it."""
         # Upload file (skip if mocked)
         is_mock_sdk = active_sdk.__class__.__module__.startswith("unittest.mock") if hasattr(active_sdk, "__class__") else False
         if is_mock_sdk:
-            file_obj = type("_F", (), {"uri": "mock://uri", "mime_type": "application/pdf", "name": "mock_file"})()
-        else:
-            try:
-                file_obj = active_sdk.upload_file(file_path)
-            except Exception as exc:  # pragma: no cover
-                return {
-                    "resume": f"(upload error) {exc}",
-                    "timeline": [],
-                    "evidence": [],
-                    "validation_error": True,
-                }
+            return type("_F", (), {"uri": "mock://uri", "mime_type": "application/pdf", "name": "mock_file"})()
+        with _stage("upload"):
+            # Explicit MIME type: blob-store paths carry no .pdf extension to infer it from
+            file_obj = call_with_retry(
+                lambda: active_sdk.upload_file(file_path, mime_type="application/pdf"),
+                self._policy(),
+                stage="upload",
+                sleep=self._sleep,
+            )
+        with _stage("processing_wait"):
             for _ in range(30):
                 state = getattr(getattr(file_obj, "state", None), "name", None)
                 if state == "PROCESSING":
-                    time.sleep(1)
+                    check_deadline("processing_wait")
+                    time.sleep(min(1.0, remaining_or(1.0)))
                     try:
                         file_obj = active_sdk.get_file(file_obj.name)
                     except Exception:
                         break
                     continue
                 break
-        try:
-            result = model.generate_content([
-                {"file_data": {"file_uri": getattr(file_obj, "uri", ""), "mime_type": getattr(file_obj, "mime_type", "application/pdf")}},
-                {"text": prompt},
-            ])
-        except Exception as exc:  # pragma: no cover
-            return {
-                "resume": f"(generation error) {exc}",
-                "timeline": [],
-                "evidence": [],
-                "validation_error": True,
-            }
-        raw_text = self._extract_text_from_result(result)
-        parsed = self._parse_json_from_text(raw_text)
-        if not parsed:
-            parsed = self._attempt_brace_slice(raw_text)
-        return self._finalize_parsed(parsed, raw_text=raw_text)
+        return file_obj
+
+    @staticmethod
+    def _contents(file_obj: Any, prompt: str) -> List[Dict[str, Any]]:
+        if isinstance(file_obj, InlineText):
+            return [{"text": file_obj.text}, {"text": prompt}]
+        return [
+            {"file_data": {"file_uri": getattr(file_obj, "uri", ""), "mime_type": getattr(file_obj, "mime_type", "application/pdf")}},
+            {"text": prompt},
+        ]
+
+    def _request(self, model: Any, file_obj: Any, prompt: str) -> tuple[Any, List[Dict[str, Any]]]:
+        """Model and contents for one generation, using the cached prompt when available."""
+        if self.context_cache is not None:
+            cached_model = self.context_cache.model_for(self.model_name, prompt)
+            if cached_model is not None:
+                return cached_model, self._contents(file_obj, CACHED_PROMPT_REFERENCE)
+        return model, self._contents(file_obj, prompt)
+
+    @staticmethod
+    def _request_options() -> Dict[str, Any]:
+        """Per-call SDK timeout bounded by the remaining request deadline."""
+        left = remaining()
+        return {} if left is None else {"request_options": {"timeout": max(left, 0.001)}}
+
+    def _call_generate(self, model: Any, file_obj: Any, prompt: str) -> str:
+        """``_generate`` under the retry policy, hedged when enabled."""
+        policy = self._policy()
+        window = latency_window(self.model_name)
+
+        def attempt() -> tuple[str, Dict[str, int] | None]:
+            start = time.perf_counter()
+            text = self._generate(model, file_obj, prompt)
+            window.observe(time.perf_counter() - start)
+            return text, last_usage()  # hedged attempts run on their own thread
+
+        def once() -> tuple[str, Dict[str, int] | None]:
+            hedge_after = policy.hedge_delay(window)
+            return attempt() if hedge_after is None else hedged_call(attempt, hedge_after)
+
+        raw_text, usage = call_with_retry(once, policy, stage="generation", sleep=self._sleep)
+        record_usage(usage)
+        return raw_text
+
+    def _generate(self, model: Any, file_obj: Any, prompt: str) -> str:
+        """Run the generation and return the raw model text."""
+        model, contents = self._request(model, file_obj, prompt)
+        if self.response_mode == "text":
+            result = model.generate_content(contents, **self._request_options())
+        else:
+            result = model.generate_content(contents, generation_config=generation_config(), **self._request_options())
+        record_usage(usage_from(result))
+        return self._extract_text_from_result(result)
+
+    def _generate_stream(self, model: Any, file_obj: Any, prompt: str) -> Iterator[str]:
+        """Yield raw text chunks of a streamed structured generation."""
+        model, contents = self._request(model, file_obj, prompt)
+        response = model.generate_content(
+            contents, generation_config=generation_config(), stream=True, **self._request_options()
+        )
+        for chunk in response:
+            record_usage(usage_from(chunk))  # cumulative; the final chunk carries the totals
+            try:
+                text = self._extract_text_from_result(chunk)
+            except ValueError:  # chunk without text parts (e.g. finish / safety metadata)
+                continue
+            if text:
+                yield text
+
+    def _generate_streaming(self, model: Any, file_obj: Any, prompt: str) -> Dict[str, Any]:
+        """Stream the generation, validating timeline / evidence items as they complete."""
+        policy = self._policy()
+        attempt = 0
+        while True:
+            parser = IncrementalExtractionParser()
+            start = time.perf_counter()
+            first_item: float | None = None
+            received = False
+            try:
+                check_deadline("generation")
+                with _stage("generation") as sp:
+                    for chunk in self._generate_stream(model, file_obj, prompt):
+                        received = True
+                        for key, item in parser.feed(chunk):
+                            if first_item is None:
+                                first_item = time.perf_counter() - start
+                                LLM_FIRST_ITEM_SECONDS.observe(first_item)
+                                sp.set_attribute("first_item_ms", round(first_item * 1000, 3))
+                            if self.on_item is not None:
+                                self.on_item(key, item)
+                break
+            except DeadlineExceeded as exc:
+                return self._deadline_result(exc)
+            except Exception as exc:
+                attempt += 1
+                # Items already handed to on_item cannot be taken back: only retry before the first chunk
+                delay = None if received else policy.retry_delay(exc, attempt)
+                if delay is None:
+                    if deadline_expired():
+                        return self._deadline_result(DeadlineExceeded("generation"))
+                    return self._error_result("generation error", exc)
+                LLM_RETRIES.inc("generation")
+                self._sleep(delay)
+        raw_text = parser.text
+        with _stage("json_parsing") as sp:
+            parsed, status = parser.finish()
+            JSON_SCANS.inc(status)
+            sp.set_attributes(**{"output.chars": len(raw_text), "json.scan": status})
+        result = self._finalize_parsed(parsed, raw_text=raw_text)
+        if status != "stream" or parser.invalid_items:
+            result["validation_error"] = True
+        return result
+
+    def _parse_raw(self, raw_text: str) -> Dict[str, Any]:
+        with _stage("json_parsing") as sp:
+            scan = scan_json(raw_text)
+            JSON_SCANS.inc(scan.status)
+            sp.set_attributes(**{"output.chars": len(raw_text), "json.scan": scan.status})
+        result = self._finalize_parsed(scan.value, raw_text=raw_text)
+        if scan.status == "salvaged":
+            # Truncated output: keep the complete items but flag the result
+            result["validation_error"] = True
+        return result
+
+    @staticmethod
+    def _error_result(label: str, exc: Exception) -> Dict[str, Any]:
+        return {
+            "resume": f"({label}) {exc}",
+            "timeline": [],
+            "evidence": [],
+            "validation_error": True,
+        }
+
+    @staticmethod
+    def _deadline_result(exc: DeadlineExceeded) -> Dict[str, Any]:
+        result = GeminiClient._error_result("deadline", exc)
+        result["deadline_exceeded"] = exc.stage
+        return result
 
     # ---- helpers below ----
     def _extract_text_from_result(self, result: Any) -> str:
@@ -149,56 +465,45 @@ class GeminiClient:
                 parts.append(getattr(part, "text", ""))
         return "\n".join(parts)
 
-    def _attempt_brace_slice(self, raw: str) -> Dict[str, Any]:
-        cleaned = re.sub(r"```[a-zA-Z]*", "", raw).replace("```", "").strip()
-        first = cleaned.find("{")
-        last = cleaned.rfind("}")
-        if first != -1 and last != -1 and last > first:
-            snippet = cleaned[first:last + 1]
-            try:
-                return json.loads(snippet)
-            except Exception:
-                return {}
-        return {}
-
     def _finalize_parsed(self, parsed: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+        with _stage("validation"):
+            return self._validate_parsed(parsed, raw_text)
+
+    def _validate_parsed(self, parsed: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+        """Validate once into typed models.
+
+        ``timeline`` / ``evidence`` come back as ``Event`` / ``Evidence``
+        instances; callers treat them as trusted and do not re-validate.
+        Items failing validation are dropped and the result is flagged.
+        ``raw_text`` is always attached (by reference) for the extraction
+        archive; it never reaches API responses.
+        """
         if not parsed and "resume" in raw_text.lower():
             parsed = {"resume": "", "timeline": [], "evidence": []}
         original_timeline = parsed.get("timeline")
         original_evidence = parsed.get("evidence")
         parsed = self._normalize_ids(parsed)
-        try:
-            validated = CaseExtraction(**parsed)
-            data = validated.model_dump()
+        timeline, dropped_events = validate_items(parsed["timeline"], Event)
+        evidence, dropped_evidence = validate_items(parsed["evidence"], Evidence)
+        resume = parsed.get("resume")
+        if isinstance(resume, str) and not (dropped_events or dropped_evidence):
+            data: Dict[str, Any] = {"resume": resume, "timeline": timeline, "evidence": evidence}
             if not isinstance(original_timeline, list) or not isinstance(original_evidence, list):
                 data["validation_error"] = True
-            if os.getenv("INTJ_DEBUG"):
-                data["raw_text"] = raw_text
+            data["raw_text"] = raw_text
             return data
-        except Exception:
-            out = {
-                "resume": parsed.get("resume") or "(empty resume)",
-                "timeline": parsed.get("timeline") or [],
-                "evidence": parsed.get("evidence") or [],
-                "validation_error": True,
-            }
-            if os.getenv("INTJ_DEBUG"):
-                out["raw_text"] = raw_text[:5000]
-            return out
+        out = {
+            "resume": resume if isinstance(resume, str) and resume else "(empty resume)",
+            "timeline": timeline,
+            "evidence": evidence,
+            "validation_error": True,
+            "raw_text": raw_text,
+        }
+        return out
 
     def _parse_json_from_text(self, text: str) -> Dict[str, Any]:
-        try:
-            return json.loads(text)
-        except Exception:
-            pass
-        match = re.search(r"\{[\s\S]*\}\s*$", text.strip())
-        if match:
-            snippet = match.group(0)
-            try:
-                return json.loads(snippet)
-            except Exception:
-                return {}
-        return {}
+        """Outermost JSON object in ``text`` (fences, prose and truncation tolerated)."""
+        return scan_json(text).value
 
     def _normalize_ids(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Ensure event_id / evidence_id are sequential integers starting at 0.
@@ -208,12 +513,15 @@ class GeminiClient:
         timeline = parsed.get("timeline") or []
         evidence = parsed.get("evidence") or []
 
-        def seq(records: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+        def seq(records: List[Any], key: str) -> List[Any]:
             normalized = []
             for idx, rec in enumerate(records):
-                if not isinstance(rec, dict):
+                if isinstance(rec, dict):
+                    rec[key] = idx  # overwrite / assign sequential id
+                elif isinstance(rec, (Event, Evidence)):
+                    setattr(rec, key, idx)  # already validated (streamed items)
+                else:
                     continue
-                rec[key] = idx  # overwrite / assign sequential id
                 normalized.append(rec)
             return normalized
 
@@ -222,11 +530,73 @@ class GeminiClient:
         return parsed
 
 
+_replay_singleton: GeminiClient | None = None
+
+
 def get_gemini_client() -> GeminiClient | None:
+    global _replay_singleton
     settings = get_settings()
+    mode = settings.llm_client_mode
+    if mode == "replay":
+        # Cassette parsed once per process; no API key or SDK needed
+        if _replay_singleton is None:
+            from .replay_llm_client import ReplayGeminiClient
+
+            _replay_singleton = ReplayGeminiClient.from_cassette(
+                settings.llm_cassette_path,
+                model=settings.gemini_model,
+                latency=settings.replay_latency,
+                error_rate=settings.replay_error_rate,
+                rate_limit_rate=settings.replay_rate_limit_rate,
+                seed=settings.replay_seed,
+                response_mode=settings.gemini_response_mode,
+                on_item=count_streamed_item,
+            )
+        return _replay_singleton
     if not settings.gemini_api_key:
         return None
-    return GeminiClient(api_key=settings.gemini_api_key, model=settings.gemini_model)
+    if settings.llm_routing:
+        return _get_router(settings)
+    return _build_client(settings, settings.gemini_model)
+
+
+def _build_client(settings, model: str) -> GeminiClient:
+    context_cache = get_context_cache()
+    if settings.llm_client_mode == "record":
+        from .replay_llm_client import RecordingGeminiClient
+
+        return RecordingGeminiClient(
+            api_key=settings.gemini_api_key,
+            model=model,
+            cassette_path=settings.llm_cassette_path,
+            response_mode=settings.gemini_response_mode,
+            on_item=count_streamed_item,
+            context_cache=context_cache,
+        )
+    return GeminiClient(
+        api_key=settings.gemini_api_key,
+        model=model,
+        response_mode=settings.gemini_response_mode,
+        on_item=count_streamed_item,
+        context_cache=context_cache,
+    )
+
+
+_router_singleton = None
+
+
+def _get_router(settings):
+    """Process-wide ModelRouter (rules parsed once, one client per model)."""
+    global _router_singleton
+    if _router_singleton is None:
+        from .model_router import ModelRouter, load_rules
+
+        _router_singleton = ModelRouter(
+            lambda model: _build_client(settings, model),
+            load_rules(settings.llm_routing_rules),
+            default_model=settings.gemini_model,
+        )
+    return _router_singleton
 
 
-__all__ = ["GeminiClient", "get_gemini_client"]
\ No newline at end of file
+__all__ = ["GeminiClient", "InlineText", "count_streamed_item", "get_gemini_client", "RESPONSE_MODES"]
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Structured output helpers for Gemini: response schema and streamed parsing.
+
+``response_schema`` turns a Pydantic model into the OpenAPI subset accepted
+by ``GenerationConfig.response_schema``: refs inlined, no titles or defaults,
+and ``anyOf [X, null]`` mapped to ``nullable``.
+
+``IncrementalExtractionParser`` consumes streamed JSON text and emits each
+``timeline`` / ``evidence`` item, validated, as soon as its closing brace
+arrives, instead of waiting for the whole completion.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type
+import json
+import re
+
+from pydantic import BaseModel, ValidationError
+
+from ..application.extraction_models import CaseExtraction, Event, Evidence
+from .json_scan import scan_json
+
+_SCHEMA_KEYS = {"type", "format", "description", "enum", "items", "properties", "required", "nullable"}
+_GEMINI_FORMATS = {"enum", "date-time", "int32", "int64", "float", "double"}
+
+
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Gemini-compatible response schema for ``model``."""
+    return _response_schema_cached(model)
+
+
+@lru_cache(maxsize=8)
+def _response_schema_cached(model: Type[BaseModel]) -> Dict[str, Any]:
+    schema = model.model_json_schema()
+    return _convert(schema, schema.get("$defs", {}))
+
+
+def _convert(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in node:
+        return _convert(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in node:
+        options = [o for o in node["anyOf"] if o.get("type") != "null"]
+        converted = _convert(options[0], defs) if options else {"type": "string"}
+        if len(options) < len(node["anyOf"]):
+            converted["nullable"] = True
+        return converted
+    out: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key not in _SCHEMA_KEYS:
+            continue
+        if key == "properties":
+            out[key] = {name: _convert(prop, defs) for name, prop in value.items()}
+        elif key == "items":
+            out[key] = _convert(value, defs)
+        elif key == "format" and value not in _GEMINI_FORMATS:
+            continue
+        else:
+            out[key] = value
+    return out
+
+
+def generation_config() -> Dict[str, Any]:
+    """``generate_content`` config requesting JSON matching CaseExtraction."""
+    return {"response_mime_type": "application/json", "response_schema": response_schema(CaseExtraction)}
+
+
+_WS = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+# Consumed prefix kept in the buffer before it is trimmed (avoids O(n^2) slicing).
+_TRIM_AT = 1 << 16
+
+
+class IncrementalExtractionParser:
+    """Push-parser for a streamed ``{"resume": ..., "timeline": [...], ...}`` object.
+
+    ``feed`` returns ``(key, model)`` for every array item completed by the
+    chunk; items failing validation are counted in ``invalid_items`` and
+    dropped. ``finish`` returns the assembled dict, with the validated models
+    as array items, and a status (``stream`` when the object closed normally,
+    otherwise the ``scan_json`` fallback status for the full text).
+    """
+
+    ITEM_MODELS: Dict[str, Type[BaseModel]] = {"timeline": Event, "evidence": Evidence}
+
+    def __init__(self, item_models: Dict[str, Type[BaseModel]] | None = None):
+        self.item_models = self.ITEM_MODELS if item_models is None else item_models
+        self.result: Dict[str, Any] = {}
+        self.invalid_items = 0
+        self.items_emitted = 0
+        self._chunks: List[str] = []
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: str | None = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def complete(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, BaseModel]]:
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        if self._pos > _TRIM_AT:
+            self._buf, self._pos = self._buf[self._pos:], 0
+        self._buf += chunk
+        emitted: List[Tuple[str, BaseModel]] = []
+        while self._state != "done" and self._step(emitted):
+            pass
+        return emitted
+
+    def finish(self) -> Tuple[Dict[str, Any], str]:
+        if self.complete:
+            return self.result, "stream"
+        # Truncated or malformed stream: the full-text scanner salvages what it can
+        scan = scan_json(self.text)
+        merged = dict(scan.value)
+        for key in self.item_models:
+            if isinstance(merged.get(key), list):
+                models = [self._valid(key, item) for item in merged[key]]
+                valid = [model for model in models if model is not None]
+                self.invalid_items = len(models) - len(valid)
+                merged[key] = valid
+        return merged, scan.status
+
+    # ------------------------------------------------------------------
+    def _skip_ws(self) -> bool:
+        self._pos = _WS.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+        return self._pos < len(self._buf)
+
+    def _decode(self) -> Tuple[bool, Any]:
+        try:
+            value, end = _DECODER.raw_decode(self._buf, self._pos)
+        except ValueError:
+            return False, None  # incomplete (or invalid; resolved in finish)
+        if end >= len(self._buf) and not isinstance(value, (str, dict, list)):
+            return False, None  # "12" may still become "123"
+        self._pos = end
+        return True, value
+
+    def _valid(self, key: str, item: Any) -> BaseModel | None:
+        try:
+            return self.item_models[key].model_validate(item)
+        except ValidationError:
+            return None
+
+    def _step(self, emitted: List[Tuple[str, BaseModel]]) -> bool:
+        """Advance one token; False when more input is needed."""
+        if not self._skip_ws():
+            return False
+        ch = self._buf[self._pos]
+        state = self._state
+        if state == "start":
+            brace = self._buf.find("{", self._pos)
+            if brace < 0:
+                self._pos = len(self._buf)
+                return False
+            self._pos, self._state = brace + 1, "key"
+        elif state == "key":
+            if ch == "}":
+                self._pos, self._state = self._pos + 1, "done"
+                return True
+            ok, key = self._decode()
+            if not ok:
+                return False
+            self._key, self._state = key, "colon"
+        elif state == "colon":
+            self._pos, self._state = self._pos + 1, "value"
+        elif state == "value":
+            if ch == "[" and self._key in self.item_models:
+                self.result[self._key] = []
+                self._pos, self._state = self._pos + 1, "item"
+                return True
+            ok, value = self._decode()
+            if not ok:
+                return False
+            self.result[self._key] = value  # type: ignore[index]
+            self._state = "after_value"
+        elif state == "item":
+            if ch == "]":
+                self._pos, self._state = self._pos + 1, "after_value"
+                return True
+            ok, item = self._decode()
+            if not ok:
+                return False
+            model = self._valid(self._key, item)  # type: ignore[arg-type]
+            if model is None:
+                self.invalid_items += 1
+            else:
+                self.result[self._key].append(model)  # type: ignore[index]
+                self.items_emitted += 1
+                emitted.append((self._key, model))  # type: ignore[arg-type]
+            self._state = "after_item"
+        elif state == "after_item":
+            self._pos += 1
+            self._state = "item" if ch == "," else "after_value"
+        elif state == "after_value":
+            self._pos += 1
+            self._state = "key" if ch == "," else "done"
+        return True
+
+
+__all__ = ["response_schema", "generation_config", "IncrementalExtractionParser"]
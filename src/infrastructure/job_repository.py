@@ -1,8 +1,10 @@
 from __future__ import annotations
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from .db import get_session_factory
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import get_session_factory, get_async_session_factory
 from .models import ExtractionJobORM
+from .tracing import span
 from datetime import datetime
 
 class ExtractionJobRepository:
@@ -14,10 +16,20 @@ class ExtractionJobRepository:
         s = self._external_session or self._Session()
         return s, self._external_session is None
 
-    def create_job(self, job_id: str, case_id: str, callback_url: str | None) -> None:
+    def create_job(
+        self,
+        job_id: str,
+        case_id: str,
+        callback_url: str | None,
+        *,
+        lane: str = "async",
+        api_key_id: str | None = None,
+    ) -> None:
         s, close = self._session()
         try:
-            job = ExtractionJobORM(id=job_id, case_id=case_id, status="pending", callback_url=callback_url)
+            job = ExtractionJobORM(
+                id=job_id, case_id=case_id, status="pending", callback_url=callback_url, lane=lane, api_key_id=api_key_id
+            )
             s.add(job)
             s.commit()
         except Exception:
@@ -59,17 +71,110 @@ class ExtractionJobRepository:
             job = s.get(ExtractionJobORM, job_id)
             if not job:
                 return None
-            return {
-                "id": job.id,
-                "case_id": job.case_id,
-                "status": job.status,
-                "callback_url": job.callback_url,
-                "error": job.error,
-                "created_at": job.created_at,
-                "updated_at": job.updated_at,
-            }
+            return _job_dict(job)
         finally:
             if close:
                 s.close()
 
-__all__ = ["ExtractionJobRepository"]
+
+def _job_dict(job: ExtractionJobORM) -> dict:
+    return {
+        "id": job.id,
+        "case_id": job.case_id,
+        "status": job.status,
+        "lane": job.lane,
+        "api_key_id": job.api_key_id,
+        "callback_url": job.callback_url,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class AsyncExtractionJobRepository:
+    """Asyncio counterpart of ExtractionJobRepository used by the API routes."""
+
+    def __init__(self, session: AsyncSession | None = None):
+        self._external_session = session
+        self._Session = get_async_session_factory() if session is None else None
+
+    def _session(self) -> tuple[AsyncSession, bool]:
+        if self._external_session is not None:
+            return self._external_session, False
+        return self._Session(), True  # type: ignore[misc]
+
+    async def create_job(
+        self,
+        job_id: str,
+        case_id: str,
+        callback_url: str | None,
+        *,
+        lane: str = "async",
+        api_key_id: str | None = None,
+    ) -> None:
+        s, close = self._session()
+        try:
+            with span("db.job.create", **{"job.id": job_id, "job.lane": lane}):
+                s.add(
+                    ExtractionJobORM(
+                        id=job_id,
+                        case_id=case_id,
+                        status="pending",
+                        callback_url=callback_url,
+                        lane=lane,
+                        api_key_id=api_key_id,
+                    )
+                )
+                await s.commit()
+        except Exception:
+            await s.rollback()
+            raise
+        finally:
+            if close:
+                await s.close()
+
+    async def mark_running(self, job_id: str):
+        await self._update_status(job_id, "running")
+
+    async def mark_success(self, job_id: str):
+        await self._update_status(job_id, "completed")
+
+    async def mark_error(self, job_id: str, message: str):
+        await self._update_status(job_id, "failed", message)
+
+    async def _update_status(self, job_id: str, status: str, error: str | None = None):
+        s, close = self._session()
+        try:
+            with span("db.job.update", **{"job.id": job_id, "job.status": status}):
+                job = await s.get(ExtractionJobORM, job_id)
+                if not job:
+                    return
+                job.status = status
+                job.error = error
+                job.updated_at = datetime.utcnow()
+                await s.commit()
+        except Exception:
+            await s.rollback()
+            raise
+        finally:
+            if close:
+                await s.close()
+
+    async def get(self, job_id: str) -> dict | None:
+        s, close = self._session()
+        try:
+            job = await s.get(ExtractionJobORM, job_id, populate_existing=True)
+            if not job:
+                return None
+            return _job_dict(job)
+        finally:
+            if close:
+                await s.close()
+
+
+def get_async_job_repository() -> AsyncExtractionJobRepository:
+    """FastAPI dependency provider (override in tests)."""
+    return AsyncExtractionJobRepository()
+
+
+__all__ = ["ExtractionJobRepository", "AsyncExtractionJobRepository", "get_async_job_repository"]
@@ -0,0 +1,165 @@
+"""Linear-time extraction of a JSON object from free-form model output.
+
+Model responses wrap the JSON in markdown fences, add prose before or after
+it, or stop mid-object when ``max_output_tokens`` is reached. ``scan_json``
+handles all three in a single left-to-right pass:
+
+1. ``json.loads`` on the whole text (the common, clean case).
+2. Otherwise each plausible object start (``{`` followed by a key or ``}``)
+   is handed to ``JSONDecoder.raw_decode``. The C decoder tracks strings,
+   escapes and nesting, so braces inside strings never confuse it. When a
+   candidate fails at offset ``e``, scanning resumes at ``e``: any object
+   starting inside the failed span would be nested, not outermost. Each byte
+   is therefore decoded at most once.
+3. If no object closes, ``salvage_object`` re-walks the first failed
+   candidates member by member. Top-level arrays such as ``timeline`` and
+   ``evidence`` keep every complete item, and the first incomplete value
+   stops the walk.
+
+This replaces the previous greedy regex / ``find``-``rfind`` slicing, which
+backtracked on brace-heavy output and gave up on truncated responses.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+import json
+import re
+
+# '{' that can open a JSON object: followed by a key string or '}'.
+_OBJECT_START = re.compile(r'\{\s*["}]')
+_WS = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+# Failed candidates re-walked for truncated output (bounds adversarial input).
+_MAX_SALVAGE_CANDIDATES = 8
+
+
+@dataclass
+class JsonScan:
+    """Result of ``scan_json``.
+
+    ``status`` is ``exact`` (whole text was JSON), ``embedded`` (object found
+    inside fences / prose), ``salvaged`` (truncated object, complete members
+    kept) or ``none``.
+    """
+
+    value: Dict[str, Any] = field(default_factory=dict)
+    status: str = "none"
+    truncated_keys: list[str] = field(default_factory=list)
+
+    @property
+    def found(self) -> bool:
+        return self.status != "none"
+
+
+def scan_json(text: str) -> JsonScan:
+    """Locate and decode the outermost JSON object in ``text``."""
+    if not text:
+        return JsonScan()
+    try:
+        value = json.loads(text)
+    except ValueError:
+        pass
+    else:
+        if isinstance(value, dict):
+            return JsonScan(value=value, status="exact")
+
+    empty: JsonScan | None = None
+    failed: list[int] = []
+    pos = 0
+    search = _OBJECT_START.search
+    while True:
+        m = search(text, pos)
+        if m is None:
+            break
+        start = m.start()
+        try:
+            value, pos = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as exc:
+            if len(failed) < _MAX_SALVAGE_CANDIDATES:
+                failed.append(start)
+            pos = max(exc.pos, start + 1)
+            continue
+        if value:
+            return JsonScan(value=value, status="embedded")
+        empty = empty or JsonScan(value=value, status="embedded")
+    if empty is not None:
+        return empty
+    for start in failed:
+        salvaged = salvage_object(text, start)
+        if salvaged.found:
+            return salvaged
+    return JsonScan()
+
+
+def salvage_object(text: str, start: int) -> JsonScan:
+    """Decode a truncated object at ``start``, keeping complete members.
+
+    Top-level array members keep their complete items; a member whose value
+    is cut off is otherwise dropped. Returns status ``none`` when not even
+    one member could be recovered.
+    """
+    result: Dict[str, Any] = {}
+    truncated: list[str] = []
+    pos = _skip_ws(text, start + 1)
+    n = len(text)
+    while pos < n and text[pos] == '"':
+        try:
+            key, pos = _DECODER.raw_decode(text, pos)
+        except ValueError:
+            break
+        pos = _skip_ws(text, pos)
+        if pos >= n or text[pos] != ":":
+            break
+        pos = _skip_ws(text, pos + 1)
+        if pos < n and text[pos] == "[":
+            items, pos, complete = _salvage_array(text, pos)
+            result[key] = items
+            if not complete:
+                truncated.append(key)
+                break
+        else:
+            try:
+                result[key], pos = _DECODER.raw_decode(text, pos)
+            except ValueError:
+                truncated.append(key)
+                break
+        pos = _skip_ws(text, pos)
+        if pos < n and text[pos] == ",":
+            pos = _skip_ws(text, pos + 1)
+            continue
+        break
+    if not result:
+        return JsonScan()
+    return JsonScan(value=result, status="salvaged", truncated_keys=truncated)
+
+
+def _salvage_array(text: str, pos: int) -> tuple[list[Any], int, bool]:
+    """Decode array items from the '[' at ``pos`` until one is incomplete."""
+    items: list[Any] = []
+    n = len(text)
+    pos = _skip_ws(text, pos + 1)
+    if pos < n and text[pos] == "]":
+        return items, pos + 1, True
+    while pos < n:
+        try:
+            item, pos = _DECODER.raw_decode(text, pos)
+        except ValueError:
+            return items, pos, False
+        items.append(item)
+        pos = _skip_ws(text, pos)
+        if pos < n and text[pos] == ",":
+            pos = _skip_ws(text, pos + 1)
+        elif pos < n and text[pos] == "]":
+            return items, pos + 1, True
+        else:
+            break
+    return items, pos, False
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WS.match(text, pos).end()  # type: ignore[union-attr]
+
+
+__all__ = ["JsonScan", "scan_json", "salvage_object"]
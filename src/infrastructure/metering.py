@@ -0,0 +1,163 @@
+"""Buffered usage metering.
+
+``UsageMeter.record`` is called once per extraction. It never touches the
+database: records are added to an in-memory buffer of at most
+``USAGE_MAX_PENDING`` records. A full buffer drops new records and counts
+them in ``intj_usage_events_total{outcome="dropped"}``.
+
+The buffer is written by ``flush`` in batches of ``USAGE_BATCH_SIZE``, one
+transaction per batch (raw events plus rollup increments, see
+``usage_repository``). A flush runs when a batch fills up, every
+``USAGE_FLUSH_INTERVAL_S`` from the task started with the app, and once more
+on shutdown. A batch that fails to write goes back to the front of the buffer
+for the next flush.
+
+Without the periodic task (no lifespan, e.g. on Lambda where Mangum runs with
+``lifespan="off"``) nothing would flush a partial batch. Callers then flush
+at the end of each request (see ``running``).
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, List, Optional, Set
+import asyncio
+import logging
+import threading
+
+from .metrics import USAGE_EVENTS
+from .usage_repository import UsageRecord
+
+logger = logging.getLogger(__name__)
+
+
+class UsageMeter:
+    def __init__(
+        self,
+        repository: Any | None = None,
+        *,
+        batch_size: int = 200,
+        max_pending: int = 10_000,
+        flush_interval: float = 5.0,
+    ):
+        self._repository = repository
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.flush_interval = flush_interval
+        self._buffer: Deque[UsageRecord] = deque()
+        self._lock = threading.Lock()
+        self._flushing = False
+        self._task: Optional[asyncio.Task] = None
+        # Batch-full flushes in flight; referenced so they are not garbage-collected mid-write
+        self._flushes: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def running(self) -> bool:
+        """True while the periodic flush started by ``start`` is alive."""
+        return self._task is not None and not self._task.done()
+
+    def _repo(self):
+        if self._repository is None:
+            from .usage_repository import AsyncUsageRepository
+
+            self._repository = AsyncUsageRepository()
+        return self._repository
+
+    def record(self, record: UsageRecord) -> bool:
+        """Buffer ``record``; False when the buffer is full and it was dropped."""
+        with self._lock:
+            if len(self._buffer) >= self.max_pending:
+                USAGE_EVENTS.inc("dropped")
+                return False
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        USAGE_EVENTS.inc("recorded")
+        if full and not self._flushing:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:  # no loop (sync caller): the periodic flush picks it up
+                pass
+            else:
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+        return True
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of records written."""
+        if self._flushing:
+            return 0
+        self._flushing = True
+        written = 0
+        try:
+            while True:
+                with self._lock:
+                    batch: List[UsageRecord] = [
+                        self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))
+                    ]
+                if not batch:
+                    return written
+                try:
+                    await self._repo().write(batch)
+                except Exception as exc:
+                    logger.warning("usage flush failed (%d records kept): %s", len(batch), exc)
+                    USAGE_EVENTS.inc("failed", amount=len(batch))
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))
+                        while len(self._buffer) > self.max_pending:  # drop the newest beyond the bound
+                            self._buffer.pop()
+                            USAGE_EVENTS.inc("dropped")
+                    return written
+                written += len(batch)
+                USAGE_EVENTS.inc("written", amount=len(batch))
+        finally:
+            self._flushing = False
+
+    def start(self) -> asyncio.Task:
+        """Start the periodic flush on the running loop (app startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the periodic flush and write what is left (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._flushing:  # let an in-flight flush finish first
+            await asyncio.sleep(0.01)
+        await self.flush()
+
+
+_meter_singleton: Optional[UsageMeter] = None
+
+
+def get_usage_meter() -> Optional[UsageMeter]:
+    """Process-wide meter per ``USAGE_METERING`` settings; None when metering is off."""
+    global _meter_singleton
+    from .settings import get_settings
+
+    settings = get_settings()
+    if not settings.usage_metering:
+        return None
+    if _meter_singleton is None:
+        _meter_singleton = UsageMeter(
+            batch_size=settings.usage_batch_size,
+            max_pending=settings.usage_max_pending,
+            flush_interval=settings.usage_flush_interval_s,
+        )
+    return _meter_singleton
+
+
+__all__ = ["UsageMeter", "get_usage_meter"]
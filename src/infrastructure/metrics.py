@@ -0,0 +1,535 @@
+"""Minimal in-process Prometheus-style metrics (counters, histograms, gauges).
+
+Dependency-free on purpose: recording is a dict lookup plus a bisect under a
+lock, cheap enough for the request hot path. ``render()`` produces the
+Prometheus text exposition format served by ``GET /metrics``.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence, Tuple
+import math
+import threading
+import time
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets (seconds) spanning fast DB calls to multi-minute generations
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS: Tuple[float, ...] = tuple(float(2 ** p) for p in range(14, 29, 2))  # 16 KiB .. 256 MiB
+PAGE_BUCKETS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+RATIO_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1)
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence[str]) -> LabelValues:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labelvalues)}")
+        return tuple(str(v) for v in labelvalues)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:  # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, val in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(val)}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, list[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = self._key(labelvalues)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[idx] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        return sum(self._counts.get(self._key(labelvalues), ()))
+
+    def sum(self, *labelvalues: str) -> float:
+        return self._sums.get(self._key(labelvalues), 0.0)
+
+    def snapshot(self, *labelvalues: str) -> Tuple[Tuple[float, ...], list[int], float]:
+        """Return (bounds, per-bucket counts incl. +Inf, sum) for one label set."""
+        key = self._key(labelvalues)
+        with self._lock:
+            counts = list(self._counts.get(key, [0] * (len(self.buckets) + 1)))
+            total = self._sums.get(key, 0.0)
+        return self.buckets + (math.inf,), counts, total
+
+    def label_sets(self) -> list[LabelValues]:
+        with self._lock:
+            return list(self._counts)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(k, list(v), self._sums[k]) for k, v in self._counts.items()]
+        bounds = self.buckets + (math.inf,)
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, c in zip(bounds, counts):
+                cumulative += c
+                le = 'le="' + _fmt(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+
+class Gauge(_Metric):
+    """Gauge whose values are read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], Dict[LabelValues, float]] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterable[str]:
+        values = dict(self._values)
+        if self._callback is not None:
+            try:
+                values.update(self._callback())
+            except Exception:  # pragma: no cover - never fail a scrape
+                pass
+        for key, val in values.items():
+            if val is None:
+                continue
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(val)}"
+
+
+class Summary(_Metric):
+    """Summary (``_sum`` / ``_count``, no quantiles) read from a callback at scrape time.
+
+    For totals kept elsewhere, e.g. the pool's checkout wait: the callback
+    returns ``(sum, count)`` per label set.
+    """
+
+    kind = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], Dict[LabelValues, Tuple[float, float]]] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def samples(self) -> Iterable[str]:
+        if self._callback is None:
+            return
+        try:
+            values = self._callback()
+        except Exception:  # pragma: no cover - never fail a scrape
+            return
+        for key, (total, count) in values.items():
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(count)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], Dict[LabelValues, float]] | None = None,
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))  # type: ignore[return-value]
+
+    def summary(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], Dict[LabelValues, Tuple[float, float]]] | None = None,
+    ) -> Summary:
+        return self.register(Summary(name, documentation, labelnames, callback))  # type: ignore[return-value]
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Clear recorded values (tests / load-test runs)."""
+        for metric in self._metrics.values():
+            if hasattr(metric, "reset"):
+                metric.reset()  # type: ignore[attr-defined]
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+STAGE_SECONDS = REGISTRY.histogram(
+    "intj_extract_stage_seconds",
+    "Latency of each extraction pipeline stage.",
+    ("stage",),
+)
+VALIDATION_ERRORS = REGISTRY.counter(
+    "intj_validation_errors_total",
+    "Extractions whose model output failed CaseExtraction validation.",
+)
+FALLBACKS = REGISTRY.counter(
+    "intj_llm_fallback_total",
+    "Extractions served by a fallback path instead of the native Gemini upload.",
+    ("path",),
+)
+PERSISTENCE_ERRORS = REGISTRY.counter(
+    "intj_persistence_errors_total",
+    "Extractions whose result could not be saved.",
+)
+JSON_SCANS = REGISTRY.counter(
+    "intj_json_scan_total",
+    "Model outputs by JSON extraction outcome (exact / embedded / salvaged / none).",
+    ("status",),
+)
+LLM_FIRST_ITEM_SECONDS = REGISTRY.histogram(
+    "intj_llm_time_to_first_item_seconds",
+    "Time from streamed generation start to the first validated timeline/evidence item.",
+)
+LLM_STREAMED_ITEMS = REGISTRY.counter(
+    "intj_llm_streamed_items_total",
+    "Timeline/evidence items validated while the generation was still streaming.",
+    ("kind",),
+)
+CASE_SNAPSHOT_READS = REGISTRY.counter(
+    "intj_case_snapshot_reads_total",
+    "Case reads served from the cases.snapshot column (hit) or the normalized tables (miss).",
+    ("result",),
+)
+BLOB_STORE_EVENTS = REGISTRY.counter(
+    "intj_blob_store_events_total",
+    "Local blob store writes, deduplicated writes and LRU evictions.",
+    ("event",),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "intj_llm_tokens_total",
+    "Gemini tokens by model and kind (prompt / output / cached), from response usage metadata.",
+    ("model", "kind"),
+)
+ARTIFACTS = REGISTRY.counter(
+    "intj_extraction_artifacts_total",
+    "Raw model output archive writes by outcome (stored / error).",
+    ("outcome",),
+)
+MODEL_ROUTES = REGISTRY.counter(
+    "intj_model_route_total",
+    "Model routing decisions by rule, model and chunking (whole / pages).",
+    ("rule", "model", "chunking"),
+)
+LLM_ABANDONED_CALLS = REGISTRY.counter(
+    "intj_llm_abandoned_calls_total",
+    "Routed generations left running on their thread after a rule timeout.",
+    ("model",),
+)
+MODEL_LATENCY = REGISTRY.histogram(
+    "intj_model_latency_seconds",
+    "Routed generation latency per model and outcome (ok / invalid / timeout).",
+    ("model", "outcome"),
+)
+LLM_RETRIES = REGISTRY.counter(
+    "intj_llm_retries_total",
+    "Retries of transient Gemini failures (429 / 5xx / timeouts) by stage.",
+    ("stage",),
+)
+LLM_HEDGES = REGISTRY.counter(
+    "intj_llm_hedges_total",
+    "Hedged generation attempts launched, and how often the hedge finished first.",
+    ("outcome",),
+)
+DEADLINES_EXCEEDED = REGISTRY.counter(
+    "intj_deadline_exceeded_total",
+    "Extractions stopped by their request / job deadline, by the stage that hit it.",
+    ("stage",),
+)
+COALESCED = REGISTRY.counter(
+    "intj_extractions_coalesced_total",
+    "Extractions that reused a concurrent identical extraction (local | remote), plus lock_unavailable fallbacks.",
+    ("outcome",),
+)
+AUTH_REQUESTS = REGISTRY.counter(
+    "intj_auth_requests_total",
+    "API key checks by outcome (ok / invalid / rate_limited / unavailable).",
+    ("outcome",),
+)
+USAGE_EVENTS = REGISTRY.counter(
+    "intj_usage_events_total",
+    "Usage records by outcome (recorded / written / failed / dropped).",
+    ("outcome",),
+)
+CONTEXT_CACHE = REGISTRY.counter(
+    "intj_gemini_context_cache_total",
+    "Gemini context cache lookups for the extraction prompt by model and outcome (hit / created / refreshed / failed / bypass).",
+    ("model", "outcome"),
+)
+SCHEDULER_WAIT = REGISTRY.histogram(
+    "intj_scheduler_wait_seconds",
+    "Time an extraction waited for a slot, per priority lane.",
+    ("lane",),
+)
+SCHEDULER_QUEUED = REGISTRY.gauge("intj_scheduler_queued", "Extractions waiting for a slot, per lane.", ("lane",))
+SCHEDULER_RUNNING = REGISTRY.gauge("intj_scheduler_running", "Extractions holding a slot, per lane.", ("lane",))
+PDF_BYTES = REGISTRY.histogram("intj_pdf_bytes", "Size of downloaded PDFs.", buckets=BYTES_BUCKETS)
+PDF_PAGES = REGISTRY.histogram("intj_pdf_pages", "Page count of downloaded PDFs.", buckets=PAGE_BUCKETS)
+PDF_PREFLIGHT = REGISTRY.counter(
+    "intj_pdf_preflight_total",
+    "PDF pre-flight decisions by path sent to the model (text / file) and reason.",
+    ("mode", "reason"),
+)
+PAGE_RANGE_ITEMS = REGISTRY.counter(
+    "intj_page_range_items_total",
+    "Timeline / evidence page ranges checked against the document page count, by model.",
+    ("model",),
+)
+PAGE_RANGE_FLAGS = REGISTRY.counter(
+    "intj_page_range_flags_total",
+    "Bad page ranges returned by the model, by model and flag (missing / non_positive / inverted / beyond_document / blank_pages).",
+    ("model", "flag"),
+)
+PDF_TEXT_COVERAGE = REGISTRY.histogram(
+    "intj_pdf_text_coverage",
+    "Share of PDF pages with a usable text layer (pre-flight).",
+    buckets=RATIO_BUCKETS,
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "intj_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+
+STARTUP_PHASE_MS = REGISTRY.gauge("intj_startup_phase_milliseconds", "Duration of each startup phase.", ("phase",))
+BLOB_STORE_BYTES = REGISTRY.gauge("intj_blob_store_bytes", "Bytes held by the local blob store (last measured).")
+
+
+def _pool_values(field: str) -> Dict[LabelValues, Any]:
+    from .db import pool_metrics
+
+    return {(p["engine"],): p[field] for p in pool_metrics()}
+
+
+def _pool_checkout_wait() -> Dict[LabelValues, Tuple[float, float]]:
+    return {k: (v["sum"], v["count"]) for k, v in _pool_values("checkout_wait_seconds").items()}
+
+
+REGISTRY.gauge("intj_db_pool_checked_out", "Connections currently checked out.", ("engine",), lambda: _pool_values("checked_out"))
+REGISTRY.gauge("intj_db_pool_overflow", "Overflow connections currently open.", ("engine",), lambda: _pool_values("overflow"))
+REGISTRY.gauge("intj_db_pool_size", "Configured pool size.", ("engine",), lambda: _pool_values("pool_size"))
+REGISTRY.summary(
+    "intj_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("engine",),
+    _pool_checkout_wait,
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template.
+
+    The route template (``/cases/{case_id}``) keeps label cardinality bounded;
+    requests that match no route are recorded as ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        state = {"code": 500, "done": False}
+
+        def record() -> None:
+            if state["done"]:
+                return
+            state["done"] = True
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - start, scope.get("method", ""), template, str(state["code"]))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["code"] = message["status"]
+            await send(message)
+            # Record once the body is sent: background tasks run afterwards
+            # inside the same ASGI call and must not count as request latency.
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Gauge",
+    "Summary",
+    "Registry",
+    "REGISTRY",
+    "CONTENT_TYPE",
+    "STAGE_SECONDS",
+    "VALIDATION_ERRORS",
+    "FALLBACKS",
+    "PERSISTENCE_ERRORS",
+    "JSON_SCANS",
+    "LLM_FIRST_ITEM_SECONDS",
+    "LLM_STREAMED_ITEMS",
+    "CASE_SNAPSHOT_READS",
+    "BLOB_STORE_EVENTS",
+    "LLM_TOKENS",
+    "ARTIFACTS",
+    "MODEL_ROUTES",
+    "MODEL_LATENCY",
+    "LLM_ABANDONED_CALLS",
+    "LLM_RETRIES",
+    "LLM_HEDGES",
+    "DEADLINES_EXCEEDED",
+    "COALESCED",
+    "AUTH_REQUESTS",
+    "USAGE_EVENTS",
+    "CONTEXT_CACHE",
+    "SCHEDULER_WAIT",
+    "SCHEDULER_QUEUED",
+    "SCHEDULER_RUNNING",
+    "PDF_BYTES",
+    "PDF_PAGES",
+    "PDF_PREFLIGHT",
+    "PDF_TEXT_COVERAGE",
+    "PAGE_RANGE_ITEMS",
+    "PAGE_RANGE_FLAGS",
+    "HTTP_SECONDS",
+    "STARTUP_PHASE_MS",
+    "BLOB_STORE_BYTES",
+    "MetricsMiddleware",
+]
@@ -0,0 +1,176 @@
+"""In-process schema check and (opt-in) locked migrations for app startup.
+
+The fast path reads the head revision(s) straight from ``alembic/versions``
+(no Alembic import) and compares them with the ``alembic_version`` row, so a
+worker whose schema is current pays one small query. Migrations only run when
+``DB_MIGRATE_ON_STARTUP`` is set, serialized across workers with a Postgres
+advisory lock.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator
+import ast
+import logging
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = PROJECT_ROOT / "alembic.ini"
+VERSIONS_DIR = PROJECT_ROOT / "alembic" / "versions"
+# Arbitrary constant shared by every worker; pg advisory locks take a bigint key.
+MIGRATION_LOCK_KEY = 0x494E544A  # "INTJ"
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Wall-clock timings per startup phase (milliseconds) plus the outcome."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.outcome: str | None = None
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "outcome": self.outcome,
+            "phases_ms": dict(self.phases),
+            "total_ms": round(sum(self.phases.values()), 3),
+        }
+
+    def log(self) -> None:
+        timings = " ".join(f"{k}={v:.1f}ms" for k, v in self.phases.items())
+        logger.info("startup outcome=%s %s", self.outcome, timings)
+
+
+def _literal_assignments(path: Path) -> Dict[str, Any]:
+    values: Dict[str, Any] = {}
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in {"revision", "down_revision"}:
+                values[name] = ast.literal_eval(node.value)
+    return values
+
+
+@lru_cache(maxsize=1)
+def head_revisions(versions_dir: Path = VERSIONS_DIR) -> frozenset[str]:
+    """Head revision ids computed from the migration scripts without importing Alembic."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        values = _literal_assignments(path)
+        rev = values.get("revision")
+        if not rev:
+            continue
+        revisions.add(rev)
+        down = values.get("down_revision")
+        if isinstance(down, (tuple, list)):
+            parents.update(d for d in down if d)
+        elif down:
+            parents.add(down)
+    return frozenset(revisions - parents)
+
+
+def current_revisions(conn: Connection) -> frozenset[str]:
+    if not inspect(conn).has_table("alembic_version"):
+        return frozenset()
+    rows = conn.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+    return frozenset(rows)
+
+
+def run_migrations(conn: Connection) -> None:
+    """Run ``alembic upgrade head`` in-process on the given connection."""
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    cfg.attributes["connection"] = conn
+    if conn.in_transaction():
+        # End the autobegun transaction (revision check, lock) so alembic owns its own and
+        # data migrations can commit per batch (see 0003_case_snapshot)
+        conn.commit()
+    command.upgrade(cfg, "head")
+
+
+@contextmanager
+def _migration_lock(conn: Connection) -> Iterator[None]:
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+    conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": MIGRATION_LOCK_KEY})
+    try:
+        yield
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATION_LOCK_KEY})
+        conn.commit()
+
+
+def check_and_migrate(engine: Engine, *, migrate: bool, report: StartupReport) -> str:
+    """Compare the DB revision with the scripts' head and optionally upgrade.
+
+    Returns the outcome: ``current``, ``outdated`` (behind, migrations not
+    enabled), ``migrated`` or ``unavailable`` (database unreachable).
+    """
+    with report.phase("head_revision"):
+        heads = head_revisions()
+    try:
+        with report.phase("schema_check"):
+            with engine.connect() as conn:
+                current = current_revisions(conn)
+    except Exception as exc:
+        if not migrate:
+            logger.warning("Schema check skipped, database unavailable: %s", exc)
+            report.outcome = "unavailable"
+            return report.outcome
+        from .db import ensure_database_exists
+
+        with report.phase("ensure_database"):
+            ensure_database_exists()
+        current = None
+    if current == heads:
+        report.outcome = "current"
+        return report.outcome
+    if not migrate:
+        logger.warning(
+            "Database schema at %s, expected %s; set DB_MIGRATE_ON_STARTUP=1 or run 'alembic upgrade head'",
+            sorted(current or []),
+            sorted(heads),
+        )
+        report.outcome = "outdated"
+        return report.outcome
+    with report.phase("migrate"):
+        with engine.connect() as conn:
+            with _migration_lock(conn):
+                # Another worker may have upgraded while we waited for the lock
+                if current_revisions(conn) != heads:
+                    run_migrations(conn)
+                    conn.commit()
+    report.outcome = "migrated"
+    return report.outcome
+
+
+__all__ = [
+    "StartupReport",
+    "head_revisions",
+    "current_revisions",
+    "run_migrations",
+    "check_and_migrate",
+    "ALEMBIC_INI",
+    "MIGRATION_LOCK_KEY",
+]
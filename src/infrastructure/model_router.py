@@ -0,0 +1,406 @@
+"""Route each PDF to a model tier and chunking strategy from its profile.
+
+``ModelRouter`` sits in front of ``GeminiClient`` (same ``analyze_pdf``
+interface). For every document it:
+
+1. profiles the PDF: size, page count and text-layer density (average
+   extracted characters per page; scanned documents have almost none). The
+   pre-flight ``PdfProfile`` is reused when the caller passes it; otherwise a
+   few evenly spread pages are sampled,
+2. picks the first matching ``RouteRule`` (model, optional page chunking,
+   timeout, fallback model),
+3. runs the generation with the rule's timeout and, when it expires, retries
+   once on the rule's faster ``fallback_model``.
+
+A result that still timed out carries ``generation_timeout`` (the model);
+``ExtractService`` treats it as a failed extraction and does not save it. A
+timed-out call cannot be interrupted: it keeps running on its own thread,
+outside the scheduler slot, and its quota and token usage are not metered.
+Each one is counted in ``intj_llm_abandoned_calls_total``.
+
+Decisions are counted in ``intj_model_route_total`` and per-model latency in
+``intj_model_latency_seconds``; the decision is also returned under the
+``routing`` key so it reaches the debug payload and the extraction archive.
+Enable with ``MODEL_ROUTING=1``; rules come from ``MODEL_ROUTING_RULES``.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextvars import copy_context
+from dataclasses import asdict, dataclass, fields
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import tempfile
+import time
+
+from .gemini_client import GeminiClient
+from .metrics import FALLBACKS, LLM_ABANDONED_CALLS, MODEL_LATENCY, MODEL_ROUTES
+from .pdf_downloader import estimate_page_count
+from .pdf_preflight import PdfProfile
+from .resilience import deadline_expired, remaining
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Pages sampled (evenly spread) to estimate text-layer density
+SAMPLE_PAGES = 3
+
+
+@dataclass(frozen=True)
+class DocumentProfile:
+    bytes: int
+    pages: int
+    # Average extracted characters per sampled page (None: no text extraction available)
+    chars_per_page: Optional[float] = None
+
+    @property
+    def bytes_per_page(self) -> float:
+        return self.bytes / self.pages if self.pages else float(self.bytes)
+
+    @classmethod
+    def from_preflight(cls, profile: PdfProfile) -> "DocumentProfile":
+        """Reuse the pre-flight measurements: density over every page instead of a sample."""
+        density = profile.text_chars / len(profile.page_chars) if profile.page_chars else None
+        return cls(bytes=profile.bytes, pages=profile.pages, chars_per_page=density)
+
+
+def profile_pdf(path: str | Path, *, sample_pages: int = SAMPLE_PAGES) -> DocumentProfile:
+    """Size, page count and text density of the PDF at ``path``.
+
+    Uses pypdf when installed (exact page count, sampled text extraction);
+    otherwise falls back to the raw ``/Type /Page`` scan with unknown density.
+    """
+    size = os.path.getsize(path)
+    try:
+        from pypdf import PdfReader  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return DocumentProfile(bytes=size, pages=estimate_page_count(path))
+    try:
+        reader = PdfReader(str(path))
+        pages = len(reader.pages)
+    except Exception:
+        return DocumentProfile(bytes=size, pages=estimate_page_count(path))
+    if not pages or sample_pages <= 0:
+        return DocumentProfile(bytes=size, pages=pages)
+    count = min(sample_pages, pages)
+    indices = sorted({round(i * (pages - 1) / max(count - 1, 1)) for i in range(count)})
+    chars = 0
+    for idx in indices:
+        try:
+            chars += len((reader.pages[idx].extract_text() or "").strip())
+        except Exception:
+            pass
+    return DocumentProfile(bytes=size, pages=pages, chars_per_page=chars / len(indices))
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    """First matching rule wins; unset bounds always match.
+
+    ``model=None`` means the configured ``GEMINI_MODEL``. ``chunk_pages``
+    splits documents longer than that into page ranges analyzed in parallel.
+    """
+
+    name: str
+    model: Optional[str] = None
+    min_pages: Optional[int] = None
+    max_pages: Optional[int] = None
+    max_bytes: Optional[int] = None
+    min_chars_per_page: Optional[float] = None
+    max_chars_per_page: Optional[float] = None
+    chunk_pages: Optional[int] = None
+    timeout_s: Optional[float] = None
+    fallback_model: Optional[str] = None
+
+    def matches(self, profile: DocumentProfile) -> bool:
+        if self.min_pages is not None and profile.pages < self.min_pages:
+            return False
+        if self.max_pages is not None and profile.pages > self.max_pages:
+            return False
+        if self.max_bytes is not None and profile.bytes > self.max_bytes:
+            return False
+        density = profile.chars_per_page
+        if self.min_chars_per_page is not None and (density is None or density < self.min_chars_per_page):
+            return False
+        if self.max_chars_per_page is not None and (density is None or density > self.max_chars_per_page):
+            return False
+        return True
+
+
+# Small documents go to the fast tier; scanned (no text layer) and long
+# documents to the stronger model, long ones split into 150-page chunks.
+DEFAULT_RULES: Tuple[RouteRule, ...] = (
+    RouteRule(name="short", max_pages=40, model="gemini-1.5-flash", timeout_s=90, fallback_model="gemini-1.5-flash-8b"),
+    RouteRule(name="scanned", max_chars_per_page=200, model="gemini-1.5-pro", timeout_s=240, fallback_model="gemini-1.5-flash"),
+    RouteRule(name="long", min_pages=300, model="gemini-1.5-pro", chunk_pages=150, timeout_s=240, fallback_model="gemini-1.5-flash"),
+    RouteRule(name="default", model=None, timeout_s=180, fallback_model="gemini-1.5-flash"),
+)
+
+
+def load_rules(spec: str | None) -> List[RouteRule]:
+    """Parse ``MODEL_ROUTING_RULES``: a JSON list, or a path to a JSON file (default rules when empty)."""
+    if not spec or not spec.strip():
+        return list(DEFAULT_RULES)
+    text = spec if spec.lstrip().startswith("[") else Path(spec).read_text(encoding="utf-8")
+    allowed = {f.name for f in fields(RouteRule)}
+    rules = []
+    for entry in json.loads(text):
+        unknown = set(entry) - allowed
+        if unknown or "name" not in entry:
+            raise ValueError(f"Invalid MODEL_ROUTING_RULES entry {entry!r}; allowed keys: {sorted(allowed)}")
+        rules.append(RouteRule(**entry))
+    return rules
+
+
+def split_pdf(path: str | Path, chunk_pages: int, out_dir: str | Path) -> List[Tuple[int, Path]]:
+    """Write ``chunk_pages``-page parts of the PDF to ``out_dir``; returns (first page, path) pairs."""
+    from pypdf import PdfReader, PdfWriter  # type: ignore
+
+    reader = PdfReader(str(path))
+    parts = []
+    for start in range(0, len(reader.pages), chunk_pages):
+        writer = PdfWriter()
+        for page in reader.pages[start:start + chunk_pages]:
+            writer.add_page(page)
+        part = Path(out_dir) / f"pages-{start + 1}.pdf"
+        with open(part, "wb") as fh:
+            writer.write(fh)
+        parts.append((start + 1, part))
+    return parts
+
+
+def _shift_pages(items: Sequence[Any], offset: int, prefix: str) -> List[Any]:
+    init, end = f"{prefix}_page_init", f"{prefix}_page_end"
+    shifted = []
+    for item in items:
+        if isinstance(item, dict):
+            item = {**item, init: (item.get(init) or 0) + offset, end: (item.get(end) or 0) + offset}
+        else:
+            item = item.model_copy(update={init: getattr(item, init) + offset, end: getattr(item, end) + offset})
+        shifted.append(item)
+    return shifted
+
+
+def _renumber(items: List[Any], key: str) -> List[Any]:
+    for idx, item in enumerate(items):
+        if isinstance(item, dict):
+            item[key] = idx
+        else:
+            setattr(item, key, idx)
+    return items
+
+
+def merge_chunk_results(results: Sequence[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Combine per-chunk outputs: page numbers shifted to the full document, ids renumbered."""
+    timeline: List[Any] = []
+    evidence: List[Any] = []
+    resumes, raw_parts = [], []
+    usage: Dict[str, int] = {}
+    validation_error = False
+    deadline_stage = None
+    timed_out = None
+    for first_page, out in results:
+        offset = first_page - 1
+        timeline.extend(_shift_pages(out.get("timeline") or [], offset, "event"))
+        evidence.extend(_shift_pages(out.get("evidence") or [], offset, "evidence"))
+        if out.get("resume"):
+            resumes.append(out["resume"])
+        if isinstance(out.get("raw_text"), str):
+            raw_parts.append(f"--- pages from {first_page} ---\n{out['raw_text']}")
+        for k, v in (out.get("usage") or {}).items():
+            usage[k] = usage.get(k, 0) + v
+        validation_error = validation_error or bool(out.get("validation_error"))
+        deadline_stage = deadline_stage or out.get("deadline_exceeded")
+        timed_out = timed_out or out.get("generation_timeout")
+    merged: Dict[str, Any] = {
+        "resume": "\n\n".join(resumes),
+        "timeline": _renumber(timeline, "event_id"),
+        "evidence": _renumber(evidence, "evidence_id"),
+        "raw_text": "\n".join(raw_parts),
+    }
+    if usage:
+        merged["usage"] = usage
+    if validation_error:
+        merged["validation_error"] = True
+    if deadline_stage:
+        merged["deadline_exceeded"] = deadline_stage
+    if timed_out:  # one missing chunk fails the whole document
+        merged["generation_timeout"] = timed_out
+    return merged
+
+
+ClientFactory = Callable[[str], GeminiClient]
+
+
+class ModelRouter:
+    """``analyze_pdf`` front end choosing model and chunking per document.
+
+    ``document_text`` (pre-flight text layer) is passed to the chosen client
+    for whole documents; chunked documents are always uploaded part by part.
+    ``pdf_profile`` (the pre-flight profile) saves opening the PDF again.
+    """
+
+    supports_text_input = True
+    supports_pdf_profile = True
+
+    def __init__(
+        self,
+        client_factory: ClientFactory,
+        rules: Sequence[RouteRule],
+        *,
+        default_model: str,
+        max_workers: int = 4,
+        sample_pages: int = SAMPLE_PAGES,
+    ):
+        self._factory = client_factory
+        self._clients: Dict[str, GeminiClient] = {}
+        self.rules = list(rules)
+        self.model_name = default_model
+        self.sample_pages = sample_pages
+        self.max_workers = max_workers
+
+    @property
+    def response_mode(self) -> str:
+        return self._client(self.model_name).response_mode
+
+    def _client(self, model: str) -> GeminiClient:
+        client = self._clients.get(model)
+        if client is None:
+            client = self._clients[model] = self._factory(model)
+        return client
+
+    def _profile(self, file_path: str, pdf_profile: PdfProfile | None) -> DocumentProfile:
+        # Pre-flight skips text extraction past PDF_TEXT_MAX_PAGES or with the text
+        # path off; sample those here (a few pages) so density rules still apply
+        if pdf_profile is not None and (pdf_profile.page_chars or pdf_profile.reason == "unreadable"):
+            return DocumentProfile.from_preflight(pdf_profile)
+        return profile_pdf(file_path, sample_pages=self.sample_pages)
+
+    def route(self, profile: DocumentProfile) -> RouteRule:
+        for rule in self.rules:
+            if rule.matches(profile):
+                return rule
+        return RouteRule(name="unmatched")
+
+    def analyze_pdf(
+        self,
+        file_path: str,
+        prompt: str,
+        *,
+        document_text: str | None = None,
+        pdf_profile: PdfProfile | None = None,
+    ) -> Dict[str, Any]:
+        with span("llm.route") as sp:
+            profile = self._profile(file_path, pdf_profile)
+            rule = self.route(profile)
+            model = rule.model or self.model_name
+            chunked = bool(rule.chunk_pages and profile.pages > rule.chunk_pages)
+            MODEL_ROUTES.inc(rule.name, model, "pages" if chunked else "whole")
+            sp.set_attributes(**{
+                "route.rule": rule.name,
+                "route.model": model,
+                "route.chunked": chunked,
+                "pdf.pages": profile.pages,
+                "pdf.chars_per_page": profile.chars_per_page,
+            })
+            logger.info(
+                "route rule=%s model=%s chunked=%s pages=%s bytes=%s chars_per_page=%s",
+                rule.name, model, chunked, profile.pages, profile.bytes, profile.chars_per_page,
+            )
+        if chunked:
+            with tempfile.TemporaryDirectory(prefix="intj-chunks-") as tmp:
+                parts = split_pdf(file_path, rule.chunk_pages, tmp)  # type: ignore[arg-type]
+                # Each _attempt enforces its own timeouts; chunk files stay until every part returns
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(parts)), thread_name_prefix="llm-chunk") as pool:
+                    futures = [
+                        (first, pool.submit(copy_context().run, self._attempt, rule, model, str(part), prompt))
+                        for first, part in parts
+                    ]
+                    results = [(first, future.result()) for first, future in futures]
+            out = merge_chunk_results([(first, res) for first, (res, _) in results])
+            models_used = sorted({used for _, (_, used) in results})
+        else:
+            out, used = self._attempt(rule, model, file_path, prompt, document_text)
+            models_used = [used]
+        out["routing"] = {
+            "rule": rule.name,
+            "model": model,
+            "models_used": models_used,
+            "fallback": any(m != model for m in models_used),
+            "chunks": len(parts) if chunked else 1,
+            "profile": {**asdict(profile), "bytes_per_page": round(profile.bytes_per_page, 1)},
+        }
+        return out
+
+    def _attempt(
+        self, rule: RouteRule, model: str, file_path: str, prompt: str, document_text: str | None = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """Run on ``model`` within the rule's timeout, then once on its fallback model."""
+        try:
+            return self._timed(model, file_path, prompt, rule.timeout_s, document_text), model
+        except FutureTimeout:
+            if not rule.fallback_model or rule.fallback_model == model or deadline_expired():
+                return _timeout_result(model, rule.timeout_s), model
+        FALLBACKS.inc("timeout")
+        try:
+            return self._timed(rule.fallback_model, file_path, prompt, rule.timeout_s, document_text), rule.fallback_model
+        except FutureTimeout:
+            return _timeout_result(rule.fallback_model, rule.timeout_s), rule.fallback_model
+
+    def _timed(
+        self, model: str, file_path: str, prompt: str, timeout: float | None, document_text: str | None = None
+    ) -> Dict[str, Any]:
+        client = self._client(model)
+        # Only pass the keyword when set: test doubles and older clients take (file_path, prompt)
+        call = partial(client.analyze_pdf, file_path, prompt)
+        if document_text is not None:
+            call = partial(call, document_text=document_text)
+        start = time.perf_counter()
+        left = remaining()
+        if left is not None:  # the request deadline caps the rule timeout
+            timeout = left if timeout is None else min(timeout, left)
+        if timeout is None:
+            out = call()
+        else:
+            # One thread per call: a timed-out call cannot be interrupted, so it is
+            # abandoned (shutdown without waiting) and finishes in the background
+            single = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-call")
+            try:
+                out = single.submit(copy_context().run, call).result(timeout=timeout)
+            except FutureTimeout:
+                MODEL_LATENCY.observe(time.perf_counter() - start, model, "timeout")
+                LLM_ABANDONED_CALLS.inc(model)
+                raise
+            finally:
+                single.shutdown(wait=False)
+        MODEL_LATENCY.observe(time.perf_counter() - start, model, "invalid" if out.get("validation_error") else "ok")
+        return out
+
+
+def _timeout_result(model: str, timeout: float | None) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "resume": f"(generation timeout) {model} exceeded {timeout}s",
+        "timeline": [],
+        "evidence": [],
+        "validation_error": True,
+        "generation_timeout": model,  # a failure: never saved over the stored case
+    }
+    if deadline_expired():
+        result["deadline_exceeded"] = "generation"
+    return result
+
+
+__all__ = [
+    "DocumentProfile",
+    "RouteRule",
+    "ModelRouter",
+    "DEFAULT_RULES",
+    "profile_pdf",
+    "load_rules",
+    "split_pdf",
+    "merge_chunk_results",
+]
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
-from sqlalchemy import String, Text, Integer, ForeignKey, DateTime
-from datetime import datetime
+from typing import Any
+from sqlalchemy import JSON, String, Text, Integer, BigInteger, ForeignKey, Date, DateTime, LargeBinary, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import date, datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
 
+# JSONB on Postgres, JSON text elsewhere (SQLite in tests); None is stored as SQL NULL
+SNAPSHOT_TYPE = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 
 class CaseORM(Base):
     __tablename__ = "cases"
     case_id: Mapped[str] = mapped_column(String(100), primary_key=True)
     resume: Mapped[str] = mapped_column(Text)
+    # Denormalized CaseExtraction ({"resume", "timeline", "evidence"}) for single-row reads.
+    # Deferred so list queries do not fetch it; NULL until written or backfilled.
+    snapshot: Mapped[dict[str, Any] | None] = mapped_column(SNAPSHOT_TYPE, nullable=True, deferred=True)
+    # Pre-flight profile of the last extracted PDF (pdf_preflight.PdfProfile.as_dict)
+    pdf_profile: Mapped[dict[str, Any] | None] = mapped_column(SNAPSHOT_TYPE, nullable=True, deferred=True)
     timelines: Mapped[list[TimelineEventORM]] = relationship(back_populates="case", cascade="all, delete-orphan")  # type: ignore
     evidences: Mapped[list[EvidenceORM]] = relationship(back_populates="case", cascade="all, delete-orphan")  # type: ignore
 
@@ -46,7 +56,82 @@ class ExtractionJobORM(Base):
     status: Mapped[str] = mapped_column(String(20), index=True)
     callback_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Scheduler lane (async | bulk) and the submitting API key's id (auth.key_id, never the key)
+    lane: Mapped[str] = mapped_column(String(20), default="async", server_default="async")
+    api_key_id: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
-__all__ = ["CaseORM", "TimelineEventORM", "EvidenceORM", "ExtractionJobORM"]
+
+class ExtractionArtifactORM(Base):
+    """Compressed raw model output, prompt hash and usage for one extraction."""
+
+    __tablename__ = "extraction_artifacts"
+    id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    case_id: Mapped[str] = mapped_column(String(100), index=True)
+    job_id: Mapped[str | None] = mapped_column(String(50), index=True, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    prompt_sha256: Mapped[str] = mapped_column(String(64))
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    validation_error: Mapped[bool] = mapped_column(Boolean, default=False)
+    encoding: Mapped[str] = mapped_column(String(10))  # zstd | gzip
+    raw_bytes: Mapped[int] = mapped_column(Integer)  # uncompressed payload size
+    payload: Mapped[bytes] = mapped_column(LargeBinary, deferred=True)
+
+__all__ = ["CaseORM", "TimelineEventORM", "EvidenceORM", "ExtractionJobORM", "ExtractionArtifactORM"]
+
+
+class ApiKeyORM(Base):
+    """API key stored as its SHA-256 digest; ``active=False`` revokes it."""
+
+    __tablename__ = "api_keys"
+    key_id: Mapped[str] = mapped_column(String(16), primary_key=True)
+    key_sha256: Mapped[str] = mapped_column(String(64), unique=True)
+    name: Mapped[str] = mapped_column(String(100))
+    # Requests per minute for this key (NULL: API_RATE_LIMIT_PER_MIN)
+    rate_limit_per_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class UsageEventORM(Base):
+    """One metered extraction (raw event; billing reads ``usage_daily``)."""
+
+    __tablename__ = "usage_events"
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    api_key_id: Mapped[str] = mapped_column(String(16), index=True)
+    case_id: Mapped[str] = mapped_column(String(100))
+    job_id: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    lane: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    outcome: Mapped[str] = mapped_column(String(20))  # ok | error | deadline
+    coalesced: Mapped[str | None] = mapped_column(String(10), nullable=True)  # local | remote
+    pdf_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    pdf_pages: Mapped[int] = mapped_column(Integer, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    total_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cached_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    stage_ms: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+
+
+class UsageDailyORM(Base):
+    """Per API key and UTC day totals, incremented by each flushed batch of usage events."""
+
+    __tablename__ = "usage_daily"
+    api_key_id: Mapped[str] = mapped_column(String(16), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    extractions: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    coalesced: Mapped[int] = mapped_column(Integer, default=0)
+    pdf_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    pdf_pages: Mapped[int] = mapped_column(BigInteger, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    output_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    total_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    cached_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    llm_ms: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -0,0 +1,153 @@
+"""Pre-flight profile of a downloaded PDF, and a text-only extraction path.
+
+``preflight_pdf`` opens the document once with pypdf. It records the page
+count and the length of each page's text layer. A page counts as covered
+when its text has at least ``PDF_TEXT_MIN_PAGE_CHARS`` characters.
+
+When at least ``PDF_TEXT_MIN_COVERAGE`` of the pages are covered, the
+document is born-digital. Its text, with ``--- PAGE n ---`` markers, is sent
+to Gemini instead of the file. That skips ``upload_file``, the processing
+wait and the multimodal generation.
+
+Scanned documents keep the upload path, and so do documents that are
+unreadable, over ``PDF_TEXT_MAX_PAGES``, or processed with ``PDF_TEXT_PATH=0``.
+Without pypdf the page count falls back to ``estimate_page_count``. Text
+extraction checks the request deadline before every page
+(``DeadlineExceeded("preflight")``), so a long document cannot hold a
+scheduler slot past it.
+
+The profile is stored with the case (``cases.pdf_profile``), added to the
+debug payload, and counted in ``intj_pdf_preflight_total`` and
+``intj_pdf_text_coverage``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import os
+import time
+
+from .metrics import PDF_PREFLIGHT, PDF_TEXT_COVERAGE
+from .pdf_downloader import estimate_page_count
+from .resilience import check_deadline
+
+PAGE_MARKER = "\n--- PAGE {page} ---\n"
+
+
+@dataclass(frozen=True)
+class PdfProfile:
+    bytes: int
+    pages: int
+    mode: str  # text | file: what is sent to the model
+    reason: str  # text_layer | low_coverage | too_many_pages | unreadable | disabled
+    text_pages: int = 0  # pages with at least min_page_chars of text
+    text_chars: int = 0
+    # Text-layer characters per page, in page order (empty when not extracted)
+    page_chars: Tuple[int, ...] = ()
+    elapsed_ms: int = 0
+
+    @property
+    def coverage(self) -> Optional[float]:
+        """Share of pages with a usable text layer (None when text was not extracted)."""
+        if not self.page_chars:
+            return None
+        return self.text_pages / len(self.page_chars)
+
+    def as_dict(self) -> Dict[str, Any]:
+        coverage = self.coverage
+        return {
+            "bytes": self.bytes,
+            "pages": self.pages,
+            "mode": self.mode,
+            "reason": self.reason,
+            "coverage": None if coverage is None else round(coverage, 4),
+            "text_pages": self.text_pages,
+            "text_chars": self.text_chars,
+            "page_chars": list(self.page_chars),
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+@dataclass(frozen=True)
+class Preflight:
+    profile: PdfProfile
+    # Page-marked text layer; set only when profile.mode == "text"
+    text: Optional[str] = None
+
+
+def preflight_pdf(
+    path: str | Path,
+    *,
+    text_path: bool = True,
+    min_coverage: float = 0.9,
+    min_page_chars: int = 100,
+    max_pages: int = 500,
+) -> Preflight:
+    """Profile the PDF at ``path`` and decide between the text and file paths."""
+    started = time.perf_counter()
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+
+    def done(pages: int, mode: str, reason: str, page_chars: Tuple[int, ...] = (), text: str | None = None) -> Preflight:
+        text_pages = sum(1 for c in page_chars if c >= min_page_chars)
+        profile = PdfProfile(
+            bytes=size,
+            pages=pages,
+            mode=mode,
+            reason=reason,
+            text_pages=text_pages,
+            text_chars=sum(page_chars),
+            page_chars=page_chars,
+            elapsed_ms=int((time.perf_counter() - started) * 1000),
+        )
+        PDF_PREFLIGHT.inc(mode, reason)
+        if profile.coverage is not None:
+            PDF_TEXT_COVERAGE.observe(profile.coverage)
+        return Preflight(profile=profile, text=text)
+
+    try:
+        from pypdf import PdfReader  # type: ignore
+
+        reader = PdfReader(str(path))
+        pages = len(reader.pages)
+    except Exception:  # pypdf missing, or not a readable PDF
+        return done(estimate_page_count(path), "file", "unreadable")
+    if not pages:
+        return done(0, "file", "unreadable")
+    if not text_path:
+        return done(pages, "file", "disabled")
+    if pages > max_pages:
+        return done(pages, "file", "too_many_pages")
+
+    texts = []
+    for page in reader.pages:
+        check_deadline("preflight")
+        try:
+            texts.append((page.extract_text() or "").strip())
+        except Exception:  # one broken page must not sink the profile
+            texts.append("")
+    page_chars = tuple(len(t) for t in texts)
+    covered = sum(1 for c in page_chars if c >= min_page_chars)
+    if covered < min_coverage * pages:
+        return done(pages, "file", "low_coverage", page_chars)
+    text = "".join(PAGE_MARKER.format(page=i) + t for i, t in enumerate(texts, start=1))
+    return done(pages, "text", "text_layer", page_chars, text)
+
+
+def preflight_from_settings(path: str | Path) -> Preflight:
+    from .settings import get_settings
+
+    settings = get_settings()
+    return preflight_pdf(
+        path,
+        text_path=settings.pdf_text_path,
+        min_coverage=settings.pdf_text_min_coverage,
+        min_page_chars=settings.pdf_text_min_page_chars,
+        max_pages=settings.pdf_text_max_pages,
+    )
+
+
+__all__ = ["PAGE_MARKER", "PdfProfile", "Preflight", "preflight_pdf", "preflight_from_settings"]
@@ -0,0 +1,285 @@
+"""Record / replay Gemini clients for deterministic offline load testing.
+
+``RecordingGeminiClient`` behaves like ``GeminiClient`` and appends every raw
+``analyze_pdf`` generation to a JSONL cassette. ``ReplayGeminiClient`` serves
+those raw outputs back without the SDK or network, through the same parsing
+and validation path, with a configurable latency distribution plus injected
+errors and 429s. Select with ``LLM_CLIENT_MODE=record|replay``.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+from .context_cache import PromptContextCache
+from .gemini_client import RESPONSE_MODES, GeminiClient, ItemCallback, last_usage, record_usage
+from .resilience import remaining
+
+
+class ReplayError(RuntimeError):
+    """Injected generation failure (replay mode)."""
+
+
+class RateLimitError(ReplayError):
+    """Injected quota error; mirrors the SDK's 429 ResourceExhausted."""
+
+    status_code = 429
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Cassette IO
+# ---------------------------------------------------------------------------
+def load_cassette(path: str | Path) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    p = Path(path)
+    if not p.exists():
+        return entries
+    with p.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict) and isinstance(entry.get("raw_text"), str):
+                entries.append(entry)
+    return entries
+
+
+_append_lock = threading.Lock()
+
+
+def append_cassette(path: str | Path, entry: Dict[str, Any]) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _append_lock:
+        with p.open("a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+def parse_latency(spec: str, rng: random.Random) -> Callable[[Optional[float]], float]:
+    """Build a sampler returning seconds from a spec string (values in ms).
+
+    ``recorded[:scale]`` replays the cassette latency (times ``scale``),
+    ``fixed:ms``, ``uniform:lo,hi``, ``normal:mean,std`` and
+    ``lognormal:median,sigma`` sample synthetic latencies.
+    """
+    kind, _, args = (spec or "recorded").strip().partition(":")
+    kind = kind.lower()
+    nums = [float(a) for a in args.split(",") if a.strip()] if args else []
+
+    if kind == "recorded":
+        scale = nums[0] if nums else 1.0
+        return lambda recorded_ms: max(0.0, (recorded_ms or 0.0) * scale / 1000)
+    if kind == "fixed" and len(nums) == 1:
+        return lambda _r: nums[0] / 1000
+    if kind == "uniform" and len(nums) == 2:
+        return lambda _r: rng.uniform(nums[0], nums[1]) / 1000
+    if kind == "normal" and len(nums) == 2:
+        return lambda _r: max(0.0, rng.gauss(nums[0], nums[1])) / 1000
+    if kind == "lognormal" and len(nums) == 2:
+        mu = math.log(max(nums[0], 1e-9))
+        return lambda _r: rng.lognormvariate(mu, nums[1]) / 1000
+    raise ValueError(f"Invalid replay latency spec {spec!r}")
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+class RecordingGeminiClient(GeminiClient):
+    """GeminiClient that appends each raw generation to a cassette."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        cassette_path: str | Path,
+        *,
+        response_mode: str = "text",
+        on_item: ItemCallback | None = None,
+        context_cache: PromptContextCache | None = None,
+    ):
+        super().__init__(
+            api_key=api_key, model=model, response_mode=response_mode, on_item=on_item, context_cache=context_cache
+        )
+        self.cassette_path = Path(cassette_path)
+        self._local = threading.local()
+
+    def _analyze_pdf(self, file_path: str, prompt: str, *, document_text: str | None = None) -> Dict[str, Any]:
+        self._local.file_path = file_path
+        try:
+            return super()._analyze_pdf(file_path, prompt, document_text=document_text)
+        finally:
+            self._local.file_path = None
+
+    def _generate(self, model: Any, file_obj: Any, prompt: str) -> str:
+        start = time.perf_counter()
+        raw_text = super()._generate(model, file_obj, prompt)
+        self._record(prompt, raw_text, (time.perf_counter() - start) * 1000)
+        return raw_text
+
+    def _generate_stream(self, model: Any, file_obj: Any, prompt: str) -> Iterator[str]:
+        start = time.perf_counter()
+        chunks: List[str] = []
+        for chunk in super()._generate_stream(model, file_obj, prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._record(prompt, "".join(chunks), (time.perf_counter() - start) * 1000)
+
+    def _record(self, prompt: str, raw_text: str, latency_ms: float) -> None:
+        file_path = getattr(self._local, "file_path", None)
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "model": self.model_name,
+            "prompt_sha256": sha256_text(prompt),
+            "pdf_sha256": sha256_file(file_path) if file_path else None,
+            "pdf_bytes": Path(file_path).stat().st_size if file_path else None,
+            "latency_ms": round(latency_ms, 3),
+            "usage": last_usage(),
+            "raw_text": raw_text,
+        }
+        try:
+            append_cassette(self.cassette_path, entry)
+        except Exception:  # pragma: no cover - recording must not break extraction
+            pass
+
+
+class ReplayGeminiClient(GeminiClient):
+    """Serve recorded raw outputs with simulated latency, errors and 429s.
+
+    Entries recorded for the same PDF (sha256) are preferred; otherwise one
+    is drawn at random. The SDK is never imported. Cassettes are keyed by
+    PDF, so documents always take the file path (text input is ignored).
+    """
+
+    supports_text_input = False
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        *,
+        model: str = "replay",
+        latency: str = "recorded",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        response_mode: str = "text",
+        stream_chunk_chars: int = 512,
+        on_item: ItemCallback | None = None,
+    ):
+        if not entries:
+            raise ValueError("Replay cassette is empty; record one with LLM_CLIENT_MODE=record")
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"Invalid response_mode {response_mode!r}; expected one of {sorted(RESPONSE_MODES)}")
+        self.api_key = ""
+        self.model_name = model
+        self.response_mode = response_mode
+        self.on_item = on_item
+        self.stream_chunk_chars = stream_chunk_chars
+        self._model = None
+        self._entries = entries
+        self._by_pdf: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            if entry.get("pdf_sha256"):
+                self._by_pdf.setdefault(entry["pdf_sha256"], []).append(entry)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._latency = parse_latency(latency, self._rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._sleep = sleep
+
+    @classmethod
+    def from_cassette(cls, path: str | Path, **kwargs: Any) -> "ReplayGeminiClient":
+        return cls(load_cassette(path), **kwargs)
+
+    def _configure_sdk(self) -> None:  # pragma: no cover - never called
+        pass
+
+    def _active_sdk(self):
+        return self  # truthy: skip the LangChain fallback branch
+
+    def _get_model(self):
+        return None
+
+    def _document(self, active_sdk: Any, file_path: str, document_text: str | None) -> Any:
+        return self._upload(active_sdk, file_path)
+
+    def _upload(self, active_sdk: Any, file_path: str) -> Any:
+        candidates = self._by_pdf.get(sha256_file(file_path), []) if self._by_pdf else []
+        with self._rng_lock:
+            return self._rng.choice(candidates or self._entries)
+
+    def _sample(self, entry: Dict[str, Any]) -> tuple[float, float]:
+        with self._rng_lock:
+            return self._rng.random(), self._latency(entry.get("latency_ms"))
+
+    def _inject_failure(self, roll: float) -> None:
+        if roll < self.rate_limit_rate:
+            raise RateLimitError("429 Resource has been exhausted (e.g. check quota). [replay]")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise ReplayError("503 The service is currently unavailable. [replay]")
+
+    def _wait(self, delay: float) -> None:
+        """Sleep ``delay``; like the SDK request timeout, give up when the deadline comes first."""
+        left = remaining()
+        if left is not None and delay > left:
+            self._sleep(left)
+            raise TimeoutError("504 Deadline Exceeded [replay]")
+        self._sleep(delay)
+
+    def _generate(self, model: Any, file_obj: Any, prompt: str) -> str:
+        entry: Dict[str, Any] = file_obj
+        roll, delay = self._sample(entry)
+        self._wait(delay)
+        self._inject_failure(roll)
+        record_usage(entry.get("usage"))
+        return entry["raw_text"]
+
+    def _generate_stream(self, model: Any, file_obj: Any, prompt: str) -> Iterator[str]:
+        """Yield the recorded text in chunks, spreading the latency across them."""
+        entry: Dict[str, Any] = file_obj
+        roll, delay = self._sample(entry)
+        raw = entry["raw_text"]
+        size = max(1, self.stream_chunk_chars)
+        chunks = [raw[i:i + size] for i in range(0, len(raw), size)] or [""]
+        for i, chunk in enumerate(chunks):
+            self._wait(delay / len(chunks))
+            if i == 0:
+                self._inject_failure(roll)
+                record_usage(entry.get("usage"))
+            yield chunk
+
+
+__all__ = [
+    "RecordingGeminiClient",
+    "ReplayGeminiClient",
+    "ReplayError",
+    "RateLimitError",
+    "load_cassette",
+    "append_cassette",
+    "parse_latency",
+]
@@ -0,0 +1,272 @@
+"""Per-request deadlines, retries with backoff and hedged calls.
+
+A ``Deadline`` is set once per extraction (``deadline_scope``) from the API
+request or the job settings and read through a context variable by every
+stage: the PDF download, the Gemini upload and processing wait, and the
+generation request timeout. Stages call ``check_deadline`` before starting
+and size their own timeouts with ``remaining()``. The context does not follow
+work onto plain threads, so code that submits to an executor uses
+``contextvars.copy_context().run``.
+
+``call_with_retry`` retries transient failures (429, 5xx, connection resets
+and request timeouts) with exponential backoff and full jitter, and never
+sleeps past the deadline. ``hedged_call`` starts a second attempt when the
+first one is slower than a latency percentile, taken from a rolling
+per-model ``LatencyWindow``, and returns whichever attempt succeeds first.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+import random
+import threading
+import time
+
+from .metrics import LLM_HEDGES, LLM_RETRIES
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# google.api_core exception class names for the same conditions
+_RETRYABLE_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "DeadlineExceeded",
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's overall deadline expired before ``stage`` could run or finish."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"deadline exceeded before {stage}")
+        self.stage = stage
+
+
+@dataclass(frozen=True)
+class Deadline:
+    expires_at: float  # time.monotonic() based
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("intj_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[Optional[Deadline]]:
+    """Set a deadline ``seconds`` from now; a nested scope can only shorten it."""
+    parent = _current.get()
+    if not seconds or seconds <= 0:
+        yield parent
+        return
+    deadline = Deadline.after(seconds)
+    if parent is not None and parent.expires_at < deadline.expires_at:
+        deadline = parent
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining(default: float | None = None) -> float | None:
+    """Seconds left on the current deadline (``default`` when none is set)."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else default
+
+
+def remaining_or(default: float) -> float:
+    """Seconds left on the current deadline, or ``default`` when none is set."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else default
+
+
+def check_deadline(stage: str) -> None:
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def deadline_expired() -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.expired
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and value in RETRYABLE_STATUS:
+            return True
+    if type(exc).__name__ in _RETRYABLE_NAMES:
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # SDK / replay errors that only carry the status in the message ("503 The service ...")
+    head = str(exc)[:3]
+    return head.isdigit() and int(head) in RETRYABLE_STATUS
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    # Hedge a call once it runs longer than this percentile of recent latencies (None: off)
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "RetryPolicy":
+        return cls(
+            attempts=max(1, settings.llm_retry_attempts),
+            backoff_base=settings.llm_retry_backoff_s,
+            hedge_percentile=settings.llm_hedge_percentile or None,
+            hedge_min_samples=settings.llm_hedge_min_samples,
+        )
+
+    def retry_delay(self, exc: BaseException, attempt: int) -> float | None:
+        """Backoff before attempt ``attempt + 1``, or None to give up."""
+        if attempt >= self.attempts or not is_retryable(exc):
+            return None
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        left = remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+    def hedge_delay(self, window: "LatencyWindow") -> float | None:
+        if not self.hedge_percentile:
+            return None
+        return window.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    *,
+    stage: str,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call ``fn``, retrying transient errors per ``policy`` within the current deadline."""
+    attempt = 0
+    while True:
+        check_deadline(stage)
+        try:
+            return fn()
+        except Exception as exc:
+            attempt += 1
+            delay = policy.retry_delay(exc, attempt)
+            if delay is None:
+                raise
+            LLM_RETRIES.inc(stage)
+            sleep(delay)
+
+
+class LatencyWindow:
+    """Rolling window of recent successful call latencies (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> float | None:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_windows: Dict[str, LatencyWindow] = {}
+_windows_lock = threading.Lock()
+
+
+def latency_window(key: str) -> LatencyWindow:
+    with _windows_lock:
+        window = _windows.get(key)
+        if window is None:
+            window = _windows[key] = LatencyWindow()
+        return window
+
+
+def hedged_call(fn: Callable[[], T], hedge_after: float) -> T:
+    """Run ``fn``; if it has not finished after ``hedge_after`` s, race a second call.
+
+    The first successful result wins. The slower call cannot be cancelled and
+    is abandoned.
+    """
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-hedge")
+    try:
+        primary = pool.submit(copy_context().run, fn)
+        done, _ = wait([primary], timeout=min(hedge_after, remaining_or(hedge_after)))
+        if done:
+            return primary.result()
+        check_deadline("hedge")
+        LLM_HEDGES.inc("launched")
+        hedge = pool.submit(copy_context().run, fn)
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                check_deadline("generation")
+                continue
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        LLM_HEDGES.inc("won")
+                    return future.result()
+                error = future.exception()
+        raise error  # type: ignore[misc]
+    finally:
+        pool.shutdown(wait=False)
+
+
+__all__ = [
+    "Deadline",
+    "DeadlineExceeded",
+    "RetryPolicy",
+    "LatencyWindow",
+    "deadline_scope",
+    "current_deadline",
+    "remaining",
+    "remaining_or",
+    "check_deadline",
+    "deadline_expired",
+    "is_retryable",
+    "call_with_retry",
+    "hedged_call",
+    "latency_window",
+]
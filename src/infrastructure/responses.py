@@ -0,0 +1,115 @@
+"""Pre-serialized JSON responses with negotiated compression.
+
+FastAPI's default path for a returned model is ``model_dump`` to dicts,
+re-validation against ``response_model``, ``jsonable_encoder`` and finally
+``json.dumps``. ``json_response`` replaces all of that with a single call to
+the model's Rust serializer, which writes bytes directly, and then optionally
+compresses the body:
+
+- ``br`` when the client accepts it and the optional ``brotli`` package is
+  installed,
+- otherwise ``gzip`` when accepted,
+- otherwise the body is sent as is.
+
+Bodies smaller than ``RESPONSE_COMPRESSION_MIN_BYTES`` are never compressed.
+Large bodies are compressed in a worker thread (zlib / brotli release the
+GIL) so a multi-MB case does not stall the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import zlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .settings import get_settings
+from .tracing import span
+
+try:  # optional: pip install brotli
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None  # type: ignore
+
+JSON_MEDIA_TYPE = "application/json"
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+# Above this size compression runs in a worker thread
+_THREAD_THRESHOLD = 256 * 1024
+
+
+def serialize(model: BaseModel) -> bytes:
+    """Serialize ``model`` to JSON bytes without intermediate dicts or validation."""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def parse_accept_encoding(header: str | None) -> Dict[str, float]:
+    """Map content-coding -> q-value from an ``Accept-Encoding`` header."""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str | None) -> Optional[str]:
+    """Preferred supported coding for ``header`` (``br``, ``gzip`` or None)."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)  # type: ignore[union-attr]
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+async def json_response(model: BaseModel, request: Request | None = None, *, status_code: int = 200) -> Response:
+    """Serialize ``model`` and return it, compressed when the client allows it."""
+    settings = get_settings()
+    with span("response.serialize") as sp:
+        body = serialize(model)
+        headers = {"Vary": "Accept-Encoding"}
+        encoding = None
+        if request is not None and settings.response_compression and len(body) >= settings.response_compression_min_bytes:
+            encoding = choose_encoding(request.headers.get("accept-encoding"))
+        sp.set_attributes(**{"response.bytes": len(body), "response.encoding": encoding or "identity"})
+        if encoding is not None:
+            if len(body) > _THREAD_THRESHOLD:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            sp.set_attribute("response.compressed_bytes", len(body))
+    return Response(content=body, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+__all__ = [
+    "JSON_MEDIA_TYPE",
+    "serialize",
+    "parse_accept_encoding",
+    "choose_encoding",
+    "compress",
+    "json_response",
+]
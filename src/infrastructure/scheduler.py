@@ -0,0 +1,179 @@
+"""Priority lanes with per-API-key fair sharing for extraction slots.
+
+Every extraction holds one of ``capacity`` slots while it runs (download,
+upload and generation). Waiters queue per lane:
+
+- ``interactive``: ``/extract``
+- ``async``: ``/extract/async`` jobs
+- ``bulk``: ``/extract/async`` jobs submitted with ``lane="bulk"`` (backfills)
+
+An interactive request's deadline includes its wait for a slot. A job's
+deadline starts when the job gets its slot, so a long backlog does not time
+out queued jobs.
+
+When a slot frees up, the highest-priority lane that has waiters and is below
+its own capacity gets it. Within a lane, the slot goes to the API key with the
+fewest running extractions, with ties broken round-robin. So one tenant's
+10k-document backfill runs at most one extraction ahead of any other tenant
+waiting in the same lane. A lane capacity below the total, for example
+``bulk=2`` out of 4, keeps slots free for higher lanes.
+
+Slots are per process; each worker schedules its own share of the Gemini
+quota.
+"""
+from __future__ import annotations
+
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Mapping, Optional
+import asyncio
+import time
+
+from .metrics import SCHEDULER_QUEUED, SCHEDULER_RUNNING, SCHEDULER_WAIT
+from .resilience import DeadlineExceeded, remaining
+
+LANES = ("interactive", "async", "bulk")  # highest priority first
+# Lanes whose request deadline starts once the slot is granted (job timeouts bound the run, not the queue)
+JOB_LANES = frozenset({"async", "bulk"})
+
+
+def parse_lane_capacity(spec: str | None) -> Dict[str, int]:
+    """Parse ``"interactive=4,async=3,bulk=2"``; lanes left out are capped by the total only."""
+    capacity: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        lane, _, value = part.partition("=")
+        lane = lane.strip().lower()
+        if lane not in LANES or not value.strip().isdigit():
+            raise ValueError(f"Invalid lane capacity {part.strip()!r}; expected <lane>=<slots> with lane in {list(LANES)}")
+        capacity[lane] = int(value)
+    return capacity
+
+
+@dataclass(eq=False)
+class _Waiter:
+    lane: str
+    key: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class LaneScheduler:
+    def __init__(self, capacity: int = 4, lane_capacity: Mapping[str, int] | None = None):
+        if capacity < 1:
+            raise ValueError("Scheduler capacity must be at least 1")
+        self.capacity = capacity
+        limits = dict(lane_capacity or {})
+        self.lane_capacity = {lane: min(capacity, limits.get(lane, capacity)) for lane in LANES}
+        self._running = 0
+        self._running_lane: Counter[str] = Counter()
+        self._running_key: Counter[str] = Counter()
+        # lane -> key -> FIFO of waiters; key order is the round-robin order
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {lane: OrderedDict() for lane in LANES}
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "running": self._running,
+            "lanes": {
+                lane: {
+                    "capacity": self.lane_capacity[lane],
+                    "running": self._running_lane[lane],
+                    "queued": sum(len(q) for q in self._queues[lane].values()),
+                    "keys_waiting": len(self._queues[lane]),
+                }
+                for lane in LANES
+            },
+        }
+
+    @asynccontextmanager
+    async def slot(self, lane: str, key: str) -> AsyncIterator[None]:
+        """Hold an extraction slot; waits at most until the current deadline (``DeadlineExceeded("queue")``)."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane {lane!r}; expected one of {list(LANES)}")
+        waiter = _Waiter(lane, key, asyncio.get_running_loop().create_future())
+        self._queues[lane].setdefault(key, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=remaining())
+        except BaseException as exc:
+            if waiter.future.done():  # granted just as we gave up
+                self._release(waiter)
+            else:
+                waiter.future.cancel()
+                self._discard(waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise DeadlineExceeded("queue") from None
+            raise
+        SCHEDULER_WAIT.observe(time.perf_counter() - waiter.enqueued_at, lane)
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    # ------------------------------------------------------------------
+    def _dispatch(self) -> None:
+        while self._running < self.capacity:
+            waiter = self._next()
+            if waiter is None:
+                break
+            self._running += 1
+            self._running_lane[waiter.lane] += 1
+            self._running_key[waiter.key] += 1
+            waiter.future.set_result(None)
+        self._observe()
+
+    def _next(self) -> Optional[_Waiter]:
+        for lane in LANES:
+            queues = self._queues[lane]
+            if not queues or self._running_lane[lane] >= self.lane_capacity[lane]:
+                continue
+            # min() keeps the first of equals, i.e. round-robin order among the least-served keys
+            key = min(queues, key=lambda k: self._running_key[k])
+            queue = queues.pop(key)
+            waiter = queue.popleft()
+            if queue:
+                queues[key] = queue  # back of the round-robin
+            return waiter
+        return None
+
+    def _release(self, waiter: _Waiter) -> None:
+        self._running -= 1
+        self._running_lane[waiter.lane] -= 1
+        self._running_key[waiter.key] -= 1
+        if not self._running_key[waiter.key]:
+            del self._running_key[waiter.key]
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        queues = self._queues[waiter.lane]
+        queue = queues.get(waiter.key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del queues[waiter.key]
+        self._observe()
+
+    def _observe(self) -> None:
+        for lane in LANES:
+            SCHEDULER_QUEUED.set(sum(len(q) for q in self._queues[lane].values()), lane)
+            SCHEDULER_RUNNING.set(self._running_lane[lane], lane)
+
+
+_scheduler_singleton: Optional[LaneScheduler] = None
+
+
+def get_scheduler() -> LaneScheduler:
+    """Process-wide scheduler sized by ``SCHEDULER_CAPACITY`` / ``SCHEDULER_LANES``."""
+    global _scheduler_singleton
+    if _scheduler_singleton is None:
+        from .settings import get_settings
+
+        settings = get_settings()
+        _scheduler_singleton = LaneScheduler(settings.scheduler_capacity, parse_lane_capacity(settings.scheduler_lanes))
+    return _scheduler_singleton
+
+
+__all__ = ["LANES", "JOB_LANES", "LaneScheduler", "parse_lane_capacity", "get_scheduler"]
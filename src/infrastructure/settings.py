@@ -21,12 +21,66 @@ LLM_MODEL_ENV = "LLM_MODEL"
 APP_NAME_ENV = "APP_NAME"
 GEMINI_API_KEY_ENV = "GEMINI_API_KEY"
 GEMINI_MODEL_ENV = "GEMINI_MODEL"
+GEMINI_RESPONSE_MODE_ENV = "GEMINI_RESPONSE_MODE"  # text | json | stream
+GEMINI_CONTEXT_CACHE_ENV = "GEMINI_CONTEXT_CACHE"  # keep the static prompt in Gemini cached content
+GEMINI_CONTEXT_CACHE_TTL_ENV = "GEMINI_CONTEXT_CACHE_TTL_S"  # lifetime of a cached prompt
+GEMINI_CONTEXT_CACHE_REFRESH_ENV = "GEMINI_CONTEXT_CACHE_REFRESH_S"  # extend the TTL when this close to expiry
+GEMINI_CONTEXT_CACHE_MIN_TOKENS_ENV = "GEMINI_CONTEXT_CACHE_MIN_TOKENS"  # model minimum for cached content
 DB_HOST_ENV = "POSTGRES_HOST"
 DB_PORT_ENV = "POSTGRES_PORT"
 DB_USER_ENV = "POSTGRES_USER"
 DB_PASSWORD_ENV = "POSTGRES_PASSWORD"
 DB_NAME_ENV = "POSTGRES_DB"
+DATABASE_URL_ENV = "DATABASE_URL"  # Optional full SQLAlchemy URL; overrides POSTGRES_* (e.g. sqlite:///load.db)
 API_KEYS_ENV = "API_KEYS"  # Comma-separated list of allowed API keys
+DB_POOL_MODE_ENV = "DB_POOL_MODE"  # auto | queue | null
+DB_POOL_SIZE_ENV = "DB_POOL_SIZE"
+DB_MAX_OVERFLOW_ENV = "DB_MAX_OVERFLOW"
+DB_POOL_TIMEOUT_ENV = "DB_POOL_TIMEOUT"
+DB_POOL_RECYCLE_ENV = "DB_POOL_RECYCLE"
+DB_POOL_PRE_PING_ENV = "DB_POOL_PRE_PING"
+LAMBDA_FUNCTION_ENV = "AWS_LAMBDA_FUNCTION_NAME"  # set by the Lambda runtime
+DB_STARTUP_MODE_ENV = "DB_STARTUP_MODE"  # check | legacy | off
+DB_MIGRATE_ON_STARTUP_ENV = "DB_MIGRATE_ON_STARTUP"
+LLM_CLIENT_MODE_ENV = "LLM_CLIENT_MODE"  # gemini | record | replay
+LLM_CASSETTE_PATH_ENV = "LLM_CASSETTE_PATH"
+REPLAY_LATENCY_ENV = "REPLAY_LATENCY"  # recorded[:scale] | fixed:ms | uniform:lo,hi | normal:mean,std | lognormal:median,sigma
+REPLAY_ERROR_RATE_ENV = "REPLAY_ERROR_RATE"
+REPLAY_RATE_LIMIT_RATE_ENV = "REPLAY_RATE_LIMIT_RATE"
+REPLAY_SEED_ENV = "REPLAY_SEED"
+RESPONSE_COMPRESSION_ENV = "RESPONSE_COMPRESSION"  # gzip / br negotiation for case and extraction responses
+RESPONSE_COMPRESSION_MIN_BYTES_ENV = "RESPONSE_COMPRESSION_MIN_BYTES"
+BLOB_STORE_DIR_ENV = "BLOB_STORE_DIR"  # content-addressed store for PDFs / raw outputs (default: <tmp>/intj-blobs)
+BLOB_STORE_MAX_BYTES_ENV = "BLOB_STORE_MAX_BYTES"  # disk quota, LRU eviction above it; 0 = unbounded
+EXTRACTION_ARCHIVE_ENV = "EXTRACTION_ARCHIVE"  # keep compressed raw outputs in extraction_artifacts
+MODEL_ROUTING_ENV = "MODEL_ROUTING"  # route per document profile instead of always GEMINI_MODEL
+EXTRACT_TIMEOUT_ENV = "EXTRACT_TIMEOUT_S"  # default deadline of synchronous /extract requests
+JOB_TIMEOUT_ENV = "JOB_TIMEOUT_S"  # default deadline of async extraction jobs
+LLM_RETRY_ATTEMPTS_ENV = "LLM_RETRY_ATTEMPTS"  # attempts per upload / generation (1 = no retry)
+LLM_RETRY_BACKOFF_ENV = "LLM_RETRY_BACKOFF_S"  # exponential backoff base, full jitter
+LLM_HEDGE_PERCENTILE_ENV = "LLM_HEDGE_PERCENTILE"  # e.g. 0.95; 0 disables hedging
+LLM_HEDGE_MIN_SAMPLES_ENV = "LLM_HEDGE_MIN_SAMPLES"  # latencies observed before hedging starts
+COALESCE_MODE_ENV = "COALESCE_MODE"  # off | local | cluster (Postgres advisory lock across nodes)
+COALESCE_KEY_ENV = "COALESCE_KEY"  # case | case_url
+SCHEDULER_CAPACITY_ENV = "SCHEDULER_CAPACITY"  # concurrent extractions per process
+SCHEDULER_LANES_ENV = "SCHEDULER_LANES"  # per-lane caps, e.g. interactive=4,async=3,bulk=2
+API_KEYS_DB_ENV = "API_KEYS_DB"  # also accept keys from the api_keys table
+API_KEY_CACHE_TTL_ENV = "API_KEY_CACHE_TTL_S"  # how long DB key lookups (hits and misses) are cached
+API_RATE_LIMIT_ENV = "API_RATE_LIMIT_PER_MIN"  # per-key request rate; 0 disables
+API_RATE_LIMIT_BURST_ENV = "API_RATE_LIMIT_BURST"  # token bucket size
+USAGE_METERING_ENV = "USAGE_METERING"  # record per-key usage (usage_events / usage_daily)
+USAGE_BATCH_SIZE_ENV = "USAGE_BATCH_SIZE"  # records per insert batch
+USAGE_FLUSH_INTERVAL_ENV = "USAGE_FLUSH_INTERVAL_S"  # periodic flush of the buffer
+USAGE_MAX_PENDING_ENV = "USAGE_MAX_PENDING"  # buffer bound; newer records are dropped beyond it
+PDF_TEXT_PATH_ENV = "PDF_TEXT_PATH"  # send the text layer instead of the file for born-digital PDFs
+PDF_TEXT_MIN_COVERAGE_ENV = "PDF_TEXT_MIN_COVERAGE"  # share of pages that must have a text layer
+PDF_TEXT_MIN_PAGE_CHARS_ENV = "PDF_TEXT_MIN_PAGE_CHARS"  # characters for a page to count as covered
+PDF_TEXT_MAX_PAGES_ENV = "PDF_TEXT_MAX_PAGES"  # longer documents always take the upload path
+PAGE_RANGE_POLICY_ENV = "PAGE_RANGE_POLICY"  # clamp | flag: model page ranges outside the document
+MODEL_ROUTING_RULES_ENV = "MODEL_ROUTING_RULES"  # JSON list of rules or path to a JSON file (default rules when unset)
+
+POOL_MODES = {"auto", "queue", "null"}
+_TRUTHY = {"1", "true", "yes", "on"}
 
 
 class Settings(BaseModel):
@@ -43,13 +97,68 @@ class Settings(BaseModel):
     llm_model: str = Field(default="dummy-model", validation_alias=LLM_MODEL_ENV)
     gemini_api_key: str | None = Field(default=None, validation_alias=GEMINI_API_KEY_ENV)
     gemini_model: str = Field(default="gemini-1.5-flash", validation_alias=GEMINI_MODEL_ENV)
+    gemini_response_mode: str = Field(default="text", validation_alias=GEMINI_RESPONSE_MODE_ENV)
+    gemini_context_cache: bool = Field(default=False, validation_alias=GEMINI_CONTEXT_CACHE_ENV)
+    gemini_context_cache_ttl_s: float = Field(default=3600.0, validation_alias=GEMINI_CONTEXT_CACHE_TTL_ENV)
+    gemini_context_cache_refresh_s: float = Field(default=300.0, validation_alias=GEMINI_CONTEXT_CACHE_REFRESH_ENV)
+    gemini_context_cache_min_tokens: int = Field(default=32768, ge=0, validation_alias=GEMINI_CONTEXT_CACHE_MIN_TOKENS_ENV)
     # Database
     db_host: str = Field(default="localhost", validation_alias=DB_HOST_ENV)
     db_port: int = Field(default=5432, validation_alias=DB_PORT_ENV)
     db_user: str = Field(default="postgres", validation_alias=DB_USER_ENV)
     db_password: str = Field(default="postgres", validation_alias=DB_PASSWORD_ENV)
     db_name: str = Field(default="inteligencia_juridica", validation_alias=DB_NAME_ENV)
+    database_url_override: str | None = Field(default=None, validation_alias=DATABASE_URL_ENV)
     api_keys_raw: str | None = Field(default=None, validation_alias=API_KEYS_ENV)
+    # Connection pooling ("auto" -> null on Lambda, queue elsewhere)
+    db_pool_mode: str = Field(default="auto", validation_alias=DB_POOL_MODE_ENV)
+    db_pool_size: int = Field(default=10, validation_alias=DB_POOL_SIZE_ENV)
+    db_max_overflow: int = Field(default=20, validation_alias=DB_MAX_OVERFLOW_ENV)
+    db_pool_timeout: float = Field(default=30.0, validation_alias=DB_POOL_TIMEOUT_ENV)
+    db_pool_recycle: int = Field(default=1800, validation_alias=DB_POOL_RECYCLE_ENV)
+    db_pool_pre_ping: bool = Field(default=True, validation_alias=DB_POOL_PRE_PING_ENV)
+    # Startup schema handling
+    db_startup_mode: str = Field(default="check", validation_alias=DB_STARTUP_MODE_ENV)
+    db_migrate_on_startup: bool = Field(default=False, validation_alias=DB_MIGRATE_ON_STARTUP_ENV)
+    # LLM record / replay (offline load testing)
+    llm_client_mode: str = Field(default="gemini", validation_alias=LLM_CLIENT_MODE_ENV)
+    llm_cassette_path: str = Field(default="cassettes/gemini.jsonl", validation_alias=LLM_CASSETTE_PATH_ENV)
+    replay_latency: str = Field(default="recorded", validation_alias=REPLAY_LATENCY_ENV)
+    replay_error_rate: float = Field(default=0.0, validation_alias=REPLAY_ERROR_RATE_ENV)
+    replay_rate_limit_rate: float = Field(default=0.0, validation_alias=REPLAY_RATE_LIMIT_RATE_ENV)
+    replay_seed: int | None = Field(default=None, validation_alias=REPLAY_SEED_ENV)
+    # Response serialization
+    response_compression: bool = Field(default=True, validation_alias=RESPONSE_COMPRESSION_ENV)
+    response_compression_min_bytes: int = Field(default=1024, validation_alias=RESPONSE_COMPRESSION_MIN_BYTES_ENV)
+    # Local blob store
+    blob_store_dir: str | None = Field(default=None, validation_alias=BLOB_STORE_DIR_ENV)
+    blob_store_max_bytes: int = Field(default=2 * 1024**3, validation_alias=BLOB_STORE_MAX_BYTES_ENV)
+    extraction_archive: bool = Field(default=True, validation_alias=EXTRACTION_ARCHIVE_ENV)
+    llm_routing: bool = Field(default=False, validation_alias=MODEL_ROUTING_ENV)
+    llm_routing_rules: str | None = Field(default=None, validation_alias=MODEL_ROUTING_RULES_ENV)
+    extract_timeout_s: float = Field(default=120.0, validation_alias=EXTRACT_TIMEOUT_ENV)
+    job_timeout_s: float = Field(default=900.0, validation_alias=JOB_TIMEOUT_ENV)
+    llm_retry_attempts: int = Field(default=3, validation_alias=LLM_RETRY_ATTEMPTS_ENV)
+    llm_retry_backoff_s: float = Field(default=0.5, validation_alias=LLM_RETRY_BACKOFF_ENV)
+    llm_hedge_percentile: float = Field(default=0.0, validation_alias=LLM_HEDGE_PERCENTILE_ENV)
+    llm_hedge_min_samples: int = Field(default=20, validation_alias=LLM_HEDGE_MIN_SAMPLES_ENV)
+    coalesce_mode: str = Field(default="cluster", validation_alias=COALESCE_MODE_ENV)
+    coalesce_key: str = Field(default="case", validation_alias=COALESCE_KEY_ENV)
+    scheduler_capacity: int = Field(default=4, validation_alias=SCHEDULER_CAPACITY_ENV)
+    scheduler_lanes: str = Field(default="interactive=4,async=3,bulk=2", validation_alias=SCHEDULER_LANES_ENV)
+    api_keys_db: bool = Field(default=False, validation_alias=API_KEYS_DB_ENV)
+    api_key_cache_ttl_s: float = Field(default=60.0, validation_alias=API_KEY_CACHE_TTL_ENV)
+    api_rate_limit_per_min: int = Field(default=600, validation_alias=API_RATE_LIMIT_ENV)
+    api_rate_limit_burst: int = Field(default=100, validation_alias=API_RATE_LIMIT_BURST_ENV)
+    usage_metering: bool = Field(default=True, validation_alias=USAGE_METERING_ENV)
+    usage_batch_size: int = Field(default=200, validation_alias=USAGE_BATCH_SIZE_ENV)
+    usage_flush_interval_s: float = Field(default=5.0, validation_alias=USAGE_FLUSH_INTERVAL_ENV)
+    usage_max_pending: int = Field(default=10_000, validation_alias=USAGE_MAX_PENDING_ENV)
+    pdf_text_path: bool = Field(default=True, validation_alias=PDF_TEXT_PATH_ENV)
+    pdf_text_min_coverage: float = Field(default=0.9, validation_alias=PDF_TEXT_MIN_COVERAGE_ENV)
+    pdf_text_min_page_chars: int = Field(default=100, validation_alias=PDF_TEXT_MIN_PAGE_CHARS_ENV)
+    pdf_text_max_pages: int = Field(default=500, validation_alias=PDF_TEXT_MAX_PAGES_ENV)
+    page_range_policy: str = Field(default="clamp", validation_alias=PAGE_RANGE_POLICY_ENV)
 
     model_config = {"extra": "ignore", "populate_by_name": True}
 
@@ -70,6 +179,8 @@ class Settings(BaseModel):
         }
 
     def database_url(self) -> str:
+        if self.database_url_override:
+            return self.database_url_override
         # Prefer modern psycopg (v3); fall back to psycopg2 if only that is installed
         driver = "psycopg"
         try:  # pragma: no cover - import check
@@ -78,6 +189,40 @@ class Settings(BaseModel):
             driver = "psycopg2"
         return f"postgresql+{driver}://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    def async_database_url(self) -> str:
+        if self.database_url_override:
+            scheme, sep, rest = self.database_url_override.partition("://")
+            if scheme.split("+")[0] == "sqlite":
+                return f"sqlite+aiosqlite{sep}{rest}"
+            return f"postgresql+psycopg{sep}{rest}"
+        # psycopg (v3) ships a native asyncio driver under the same dialect name
+        return f"postgresql+psycopg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+
+    def pool_mode(self) -> str:
+        """Resolve the effective pool mode ('queue' or 'null').
+
+        'null' suits Lambda and external poolers (PgBouncer / RDS Proxy) where
+        holding idle connections per container only leaks server slots.
+        """
+        mode = (self.db_pool_mode or "auto").strip().lower()
+        if mode not in POOL_MODES:
+            raise ValueError(f"Invalid {DB_POOL_MODE_ENV}={self.db_pool_mode!r}; expected one of {sorted(POOL_MODES)}")
+        if mode == "auto":
+            return "null" if os.getenv(LAMBDA_FUNCTION_ENV) else "queue"
+        return mode
+
+    def pool_config(self) -> Dict[str, Any]:
+        if self.pool_mode() == "null":
+            return {"mode": "null"}
+        return {
+            "mode": "queue",
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
+
     def meta(self) -> Dict[str, str]:  # General metadata aggregator
         return {
             "app": self.app_name,
@@ -103,12 +248,62 @@ def get_settings() -> Settings:
         llm_model=os.getenv(LLM_MODEL_ENV, "dummy-model"),
         gemini_api_key=os.getenv(GEMINI_API_KEY_ENV),
         gemini_model=os.getenv(GEMINI_MODEL_ENV, "gemini-1.5-flash"),
+        gemini_response_mode=os.getenv(GEMINI_RESPONSE_MODE_ENV, "text").strip().lower(),
+        gemini_context_cache=os.getenv(GEMINI_CONTEXT_CACHE_ENV, "0").lower() in _TRUTHY,
+        gemini_context_cache_ttl_s=float(os.getenv(GEMINI_CONTEXT_CACHE_TTL_ENV, "3600")),
+        gemini_context_cache_refresh_s=float(os.getenv(GEMINI_CONTEXT_CACHE_REFRESH_ENV, "300")),
+        gemini_context_cache_min_tokens=int(os.getenv(GEMINI_CONTEXT_CACHE_MIN_TOKENS_ENV, "32768")),
     db_host=os.getenv(DB_HOST_ENV, "localhost"),
     db_port=int(os.getenv(DB_PORT_ENV, "5432")),
     db_user=os.getenv(DB_USER_ENV, "postgres"),
     db_password=os.getenv(DB_PASSWORD_ENV, "postgres"),
     db_name=os.getenv(DB_NAME_ENV, "inteligencia_juridica"),
+    database_url_override=os.getenv(DATABASE_URL_ENV) or None,
     api_keys_raw=os.getenv(API_KEYS_ENV),
+        db_pool_mode=os.getenv(DB_POOL_MODE_ENV, "auto"),
+        db_pool_size=int(os.getenv(DB_POOL_SIZE_ENV, "10")),
+        db_max_overflow=int(os.getenv(DB_MAX_OVERFLOW_ENV, "20")),
+        db_pool_timeout=float(os.getenv(DB_POOL_TIMEOUT_ENV, "30")),
+        db_pool_recycle=int(os.getenv(DB_POOL_RECYCLE_ENV, "1800")),
+        db_pool_pre_ping=os.getenv(DB_POOL_PRE_PING_ENV, "1").lower() in _TRUTHY,
+        db_startup_mode=os.getenv(DB_STARTUP_MODE_ENV, "check").strip().lower(),
+        db_migrate_on_startup=os.getenv(DB_MIGRATE_ON_STARTUP_ENV, "0").lower() in _TRUTHY,
+        llm_client_mode=os.getenv(LLM_CLIENT_MODE_ENV, "gemini").strip().lower(),
+        llm_cassette_path=os.getenv(LLM_CASSETTE_PATH_ENV, "cassettes/gemini.jsonl"),
+        replay_latency=os.getenv(REPLAY_LATENCY_ENV, "recorded"),
+        replay_error_rate=float(os.getenv(REPLAY_ERROR_RATE_ENV, "0")),
+        replay_rate_limit_rate=float(os.getenv(REPLAY_RATE_LIMIT_RATE_ENV, "0")),
+        replay_seed=int(os.environ[REPLAY_SEED_ENV]) if os.getenv(REPLAY_SEED_ENV) else None,
+        response_compression=os.getenv(RESPONSE_COMPRESSION_ENV, "1").lower() in _TRUTHY,
+        response_compression_min_bytes=int(os.getenv(RESPONSE_COMPRESSION_MIN_BYTES_ENV, "1024")),
+        blob_store_dir=os.getenv(BLOB_STORE_DIR_ENV) or None,
+        blob_store_max_bytes=int(os.getenv(BLOB_STORE_MAX_BYTES_ENV, str(2 * 1024**3))),
+        extraction_archive=os.getenv(EXTRACTION_ARCHIVE_ENV, "1").lower() in _TRUTHY,
+        llm_routing=os.getenv(MODEL_ROUTING_ENV, "0").lower() in _TRUTHY,
+        llm_routing_rules=os.getenv(MODEL_ROUTING_RULES_ENV) or None,
+        extract_timeout_s=float(os.getenv(EXTRACT_TIMEOUT_ENV, "120")),
+        job_timeout_s=float(os.getenv(JOB_TIMEOUT_ENV, "900")),
+        llm_retry_attempts=int(os.getenv(LLM_RETRY_ATTEMPTS_ENV, "3")),
+        llm_retry_backoff_s=float(os.getenv(LLM_RETRY_BACKOFF_ENV, "0.5")),
+        llm_hedge_percentile=float(os.getenv(LLM_HEDGE_PERCENTILE_ENV, "0")),
+        llm_hedge_min_samples=int(os.getenv(LLM_HEDGE_MIN_SAMPLES_ENV, "20")),
+        coalesce_mode=os.getenv(COALESCE_MODE_ENV, "cluster").strip().lower(),
+        coalesce_key=os.getenv(COALESCE_KEY_ENV, "case").strip().lower(),
+        scheduler_capacity=int(os.getenv(SCHEDULER_CAPACITY_ENV, "4")),
+        scheduler_lanes=os.getenv(SCHEDULER_LANES_ENV, "interactive=4,async=3,bulk=2"),
+        api_keys_db=os.getenv(API_KEYS_DB_ENV, "0").lower() in _TRUTHY,
+        api_key_cache_ttl_s=float(os.getenv(API_KEY_CACHE_TTL_ENV, "60")),
+        api_rate_limit_per_min=int(os.getenv(API_RATE_LIMIT_ENV, "600")),
+        api_rate_limit_burst=int(os.getenv(API_RATE_LIMIT_BURST_ENV, "100")),
+        usage_metering=os.getenv(USAGE_METERING_ENV, "1").lower() in _TRUTHY,
+        usage_batch_size=int(os.getenv(USAGE_BATCH_SIZE_ENV, "200")),
+        usage_flush_interval_s=float(os.getenv(USAGE_FLUSH_INTERVAL_ENV, "5")),
+        usage_max_pending=int(os.getenv(USAGE_MAX_PENDING_ENV, "10000")),
+        pdf_text_path=os.getenv(PDF_TEXT_PATH_ENV, "1").lower() in _TRUTHY,
+        pdf_text_min_coverage=float(os.getenv(PDF_TEXT_MIN_COVERAGE_ENV, "0.9")),
+        pdf_text_min_page_chars=int(os.getenv(PDF_TEXT_MIN_PAGE_CHARS_ENV, "100")),
+        pdf_text_max_pages=int(os.getenv(PDF_TEXT_MAX_PAGES_ENV, "500")),
+        page_range_policy=os.getenv(PAGE_RANGE_POLICY_ENV, "clamp").strip().lower(),
     )
 
 
@@ -121,10 +316,61 @@ __all__ = [
     "APP_NAME_ENV",
     "GEMINI_API_KEY_ENV",
     "GEMINI_MODEL_ENV",
+    "GEMINI_RESPONSE_MODE_ENV",
+    "GEMINI_CONTEXT_CACHE_ENV",
+    "GEMINI_CONTEXT_CACHE_TTL_ENV",
+    "GEMINI_CONTEXT_CACHE_REFRESH_ENV",
+    "GEMINI_CONTEXT_CACHE_MIN_TOKENS_ENV",
     "DB_HOST_ENV",
     "DB_PORT_ENV",
     "DB_USER_ENV",
     "DB_PASSWORD_ENV",
     "DB_NAME_ENV",
+    "DATABASE_URL_ENV",
     "API_KEYS_ENV",
+    "DB_POOL_MODE_ENV",
+    "DB_POOL_SIZE_ENV",
+    "DB_MAX_OVERFLOW_ENV",
+    "DB_POOL_TIMEOUT_ENV",
+    "DB_POOL_RECYCLE_ENV",
+    "DB_POOL_PRE_PING_ENV",
+    "LAMBDA_FUNCTION_ENV",
+    "DB_STARTUP_MODE_ENV",
+    "DB_MIGRATE_ON_STARTUP_ENV",
+    "LLM_CLIENT_MODE_ENV",
+    "LLM_CASSETTE_PATH_ENV",
+    "REPLAY_LATENCY_ENV",
+    "REPLAY_ERROR_RATE_ENV",
+    "REPLAY_RATE_LIMIT_RATE_ENV",
+    "REPLAY_SEED_ENV",
+    "RESPONSE_COMPRESSION_ENV",
+    "RESPONSE_COMPRESSION_MIN_BYTES_ENV",
+    "BLOB_STORE_DIR_ENV",
+    "BLOB_STORE_MAX_BYTES_ENV",
+    "EXTRACTION_ARCHIVE_ENV",
+    "MODEL_ROUTING_ENV",
+    "MODEL_ROUTING_RULES_ENV",
+    "EXTRACT_TIMEOUT_ENV",
+    "JOB_TIMEOUT_ENV",
+    "LLM_RETRY_ATTEMPTS_ENV",
+    "LLM_RETRY_BACKOFF_ENV",
+    "LLM_HEDGE_PERCENTILE_ENV",
+    "LLM_HEDGE_MIN_SAMPLES_ENV",
+    "COALESCE_MODE_ENV",
+    "COALESCE_KEY_ENV",
+    "SCHEDULER_CAPACITY_ENV",
+    "SCHEDULER_LANES_ENV",
+    "API_KEYS_DB_ENV",
+    "API_KEY_CACHE_TTL_ENV",
+    "API_RATE_LIMIT_ENV",
+    "API_RATE_LIMIT_BURST_ENV",
+    "USAGE_METERING_ENV",
+    "USAGE_BATCH_SIZE_ENV",
+    "USAGE_FLUSH_INTERVAL_ENV",
+    "USAGE_MAX_PENDING_ENV",
+    "PDF_TEXT_PATH_ENV",
+    "PDF_TEXT_MIN_COVERAGE_ENV",
+    "PDF_TEXT_MIN_PAGE_CHARS_ENV",
+    "PDF_TEXT_MAX_PAGES_ENV",
+    "PAGE_RANGE_POLICY_ENV",
 ]
@@ -0,0 +1,295 @@
+"""Lightweight distributed tracing with W3C ``traceparent`` propagation.
+
+Spans are plain objects tracked through a ``contextvars`` variable, so they
+follow ``await`` chains and can be re-attached in background jobs with
+``use_context``. Finished spans go to an exporter selected by
+``TRACING_EXPORTER``: ``none`` (default, near-zero overhead), ``console``
+(one JSON line per span on the ``intj.trace`` logger) or ``file`` (JSONL at
+``TRACING_FILE``), so traces work fully offline.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+TRACING_EXPORTER_ENV = "TRACING_EXPORTER"  # none | console | file
+TRACING_FILE_ENV = "TRACING_FILE"
+TRACEPARENT_HEADER = "traceparent"
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: str | None) -> Optional["SpanContext"]:
+        if not value:
+            return None
+        parts = value.strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+            return None
+        return cls(parts[1].lower(), parts[2].lower())
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_id", "attributes", "status", "error", "_start_wall", "_start", "duration_ms")
+
+    def __init__(self, name: str, parent: Optional[SpanContext], attributes: Dict[str, Any]):
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.context = SpanContext(trace_id, secrets.token_hex(8))
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error: str | None = None
+        self._start_wall = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: float | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": datetime.fromtimestamp(self._start_wall, tz=timezone.utc).isoformat(),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled; accepts and drops everything."""
+
+    context = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+class ConsoleExporter:
+    def __init__(self, logger_name: str = "intj.trace"):
+        self._logger = logging.getLogger(logger_name)
+
+    def export(self, span: Span) -> None:
+        self._logger.info(json.dumps(span.to_dict(), default=str))
+
+
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+
+
+class InMemoryExporter:
+    """Collects finished spans (tests and the load-test harness)."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def by_name(self, name: str) -> List[Span]:
+        return [s for s in self.spans if s.name == name]
+
+
+_exporter: Any = None
+_configured = False
+_current: ContextVar[Optional[SpanContext]] = ContextVar("intj_current_span", default=None)
+
+
+def configure_tracing(exporter: Any = None) -> None:
+    """Set the exporter explicitly (``None`` disables tracing)."""
+    global _exporter, _configured
+    _exporter = exporter
+    _configured = True
+
+
+def _get_exporter():
+    global _exporter, _configured
+    if not _configured:
+        kind = os.getenv(TRACING_EXPORTER_ENV, "none").strip().lower()
+        if kind == "console":
+            _exporter = ConsoleExporter()
+        elif kind == "file":
+            _exporter = FileExporter(os.getenv(TRACING_FILE_ENV, "traces.jsonl"))
+        else:
+            _exporter = None
+        _configured = True
+    return _exporter
+
+
+def tracing_enabled() -> bool:
+    return _get_exporter() is not None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Open a child span of the current context (or a new trace)."""
+    exporter = _get_exporter()
+    if exporter is None:
+        yield NOOP_SPAN
+        return
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current.context)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_error(exc)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+        try:
+            exporter.export(current)
+        except Exception:  # pragma: no cover - exporting must never break requests
+            logging.getLogger(__name__).debug("span export failed", exc_info=True)
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+@contextmanager
+def use_context(ctx: Optional[SpanContext]) -> Iterator[None]:
+    """Make ``ctx`` the parent for spans opened inside (background jobs)."""
+    token = _current.set(ctx)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add a ``traceparent`` header for the current span (webhooks, outbound calls)."""
+    headers = dict(headers or {})
+    ctx = _current.get()
+    if ctx is not None:
+        headers[TRACEPARENT_HEADER] = ctx.traceparent()
+    return headers
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening a server span per HTTP request.
+
+    Honours an incoming ``traceparent`` header and ends the span once the
+    response body is complete, so background tasks are not counted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _get_exporter() is None:
+            await self.app(scope, receive, send)
+            return
+        parent = None
+        for key, value in scope.get("headers") or []:
+            if key == b"traceparent":
+                parent = SpanContext.from_traceparent(value.decode("latin-1"))
+                break
+        exporter = _get_exporter()
+        server_span = Span(f"{scope.get('method', '')} {scope.get('path', '')}", parent, {"http.method": scope.get("method")})
+        token = _current.set(server_span.context)
+        finished = False
+
+        def finish(status: int | None = None) -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            route = scope.get("route")
+            server_span.set_attributes(**{"http.route": getattr(route, "path", None), "http.status_code": status})
+            if status is not None and status >= 500:
+                server_span.status = "error"
+            server_span.end()
+            exporter.export(server_span)
+
+        state: Dict[str, int] = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish(state.get("status"))
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            server_span.record_error(exc)
+            raise
+        finally:
+            finish(state.get("status", 500))
+            _current.reset(token)
+
+
+__all__ = [
+    "Span",
+    "SpanContext",
+    "span",
+    "current_context",
+    "use_context",
+    "inject_headers",
+    "configure_tracing",
+    "tracing_enabled",
+    "ConsoleExporter",
+    "FileExporter",
+    "InMemoryExporter",
+    "TracingMiddleware",
+    "TRACING_EXPORTER_ENV",
+    "TRACING_FILE_ENV",
+    "TRACEPARENT_HEADER",
+]
@@ -0,0 +1,185 @@
+"""Usage events and their per-key, per-day rollup.
+
+``write`` stores a batch of ``UsageRecord`` rows in ``usage_events`` and, in
+the same transaction, adds the batch's totals to ``usage_daily``. It upserts
+with ``ON CONFLICT ... DO UPDATE SET x = x + excluded.x`` on Postgres and
+SQLite. ``daily`` reads only the rollup, so usage queries never scan raw
+events.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import get_async_session_factory
+from .models import UsageDailyORM, UsageEventORM
+from .tracing import span
+
+ROLLUP_COUNTERS = (
+    "extractions",
+    "failed",
+    "coalesced",
+    "pdf_bytes",
+    "pdf_pages",
+    "prompt_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cached_tokens",
+    "llm_ms",
+)
+
+
+@dataclass
+class UsageRecord:
+    """What one extraction consumed, attributed to the calling API key."""
+
+    api_key_id: str
+    case_id: str
+    job_id: Optional[str] = None
+    lane: Optional[str] = None
+    model: Optional[str] = None
+    outcome: str = "ok"  # ok | error | deadline
+    coalesced: Optional[str] = None  # local | remote: served by another extraction
+    pdf_bytes: int = 0
+    pdf_pages: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+    stage_ms: Dict[str, int] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def add_usage(self, usage: Dict[str, int] | None) -> None:
+        """Add Gemini ``usage_metadata`` counts (see ``gemini_client.USAGE_FIELDS``)."""
+        usage = usage or {}
+        self.prompt_tokens += usage.get("prompt_token_count", 0)
+        self.output_tokens += usage.get("candidates_token_count", 0)
+        self.total_tokens += usage.get("total_token_count", 0)
+        self.cached_tokens += usage.get("cached_content_token_count", 0)
+
+    def row(self) -> Dict[str, Any]:
+        return {
+            "created_at": self.created_at,
+            "api_key_id": self.api_key_id,
+            "case_id": self.case_id,
+            "job_id": self.job_id,
+            "lane": self.lane,
+            "model": self.model,
+            "outcome": self.outcome,
+            "coalesced": self.coalesced,
+            "pdf_bytes": self.pdf_bytes,
+            "pdf_pages": self.pdf_pages,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "stage_ms": self.stage_ms or None,
+        }
+
+
+def rollup(records: Iterable[UsageRecord]) -> List[Dict[str, Any]]:
+    """Sum records per (api_key_id, UTC day) into ``usage_daily`` increments."""
+    totals: Dict[tuple, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+    for r in records:
+        t = totals[(r.api_key_id, r.created_at.astimezone(timezone.utc).date())]
+        t["extractions"] += 1
+        t["failed"] += r.outcome != "ok"
+        t["coalesced"] += r.coalesced is not None
+        t["pdf_bytes"] += r.pdf_bytes
+        t["pdf_pages"] += r.pdf_pages
+        t["prompt_tokens"] += r.prompt_tokens
+        t["output_tokens"] += r.output_tokens
+        t["total_tokens"] += r.total_tokens
+        t["cached_tokens"] += r.cached_tokens
+        t["llm_ms"] += r.stage_ms.get("llm", 0)
+    return [{"api_key_id": key, "day": day, **counts} for (key, day), counts in totals.items()]
+
+
+class AsyncUsageRepository:
+    def __init__(self, session: AsyncSession | None = None):
+        self._external_session = session
+        self._Session = get_async_session_factory() if session is None else None
+
+    def _session(self) -> tuple[AsyncSession, bool]:
+        if self._external_session is not None:
+            return self._external_session, False
+        return self._Session(), True  # type: ignore[misc]
+
+    async def write(self, records: List[UsageRecord]) -> None:
+        if not records:
+            return
+        s, close = self._session()
+        try:
+            with span("db.usage.write", **{"db.rows_written": len(records)}):
+                await s.execute(insert(UsageEventORM), [r.row() for r in records])
+                await self._upsert_rollup(s, rollup(records))
+                await s.commit()
+        except Exception:
+            await s.rollback()
+            raise
+        finally:
+            if close:
+                await s.close()
+
+    @staticmethod
+    async def _upsert_rollup(s: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        dialect = s.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert: Callable[..., Any] = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = dialect_insert(UsageDailyORM).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UsageDailyORM.api_key_id, UsageDailyORM.day],
+                set_={c: getattr(UsageDailyORM, c) + stmt.excluded[c] for c in ROLLUP_COUNTERS},
+            )
+            await s.execute(stmt)
+            return
+        for row in rows:  # other dialects: read-modify-write under the transaction
+            current = await s.get(UsageDailyORM, (row["api_key_id"], row["day"]), with_for_update=True)
+            if current is None:
+                s.add(UsageDailyORM(**row))
+            else:
+                for c in ROLLUP_COUNTERS:
+                    setattr(current, c, getattr(current, c) + row[c])
+
+    async def daily(
+        self,
+        *,
+        api_key_id: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """Rollup rows (newest day first), optionally for one key and an inclusive day range."""
+        s, close = self._session()
+        try:
+            with span("db.usage.daily"):
+                stmt = select(UsageDailyORM)
+                if api_key_id is not None:
+                    stmt = stmt.where(UsageDailyORM.api_key_id == api_key_id)
+                if start is not None:
+                    stmt = stmt.where(UsageDailyORM.day >= start)
+                if end is not None:
+                    stmt = stmt.where(UsageDailyORM.day <= end)
+                stmt = stmt.order_by(UsageDailyORM.day.desc(), UsageDailyORM.api_key_id).limit(limit)
+                rows = (await s.execute(stmt)).scalars().all()
+            return [
+                {"api_key_id": r.api_key_id, "day": r.day.isoformat(), **{c: getattr(r, c) for c in ROLLUP_COUNTERS}}
+                for r in rows
+            ]
+        finally:
+            if close:
+                await s.close()
+
+
+def get_async_usage_repository() -> AsyncUsageRepository:
+    return AsyncUsageRepository()
+
+
+__all__ = ["UsageRecord", "AsyncUsageRepository", "get_async_usage_repository", "rollup", "ROLLUP_COUNTERS"]
@@ -3,57 +3,89 @@ from fastapi.openapi.utils import get_openapi
 from contextlib import asynccontextmanager
 import asyncio
 import logging
+import os
 import subprocess
-import pathlib
+import sys
 from .routes.api_router import api_router
-from .infrastructure.db import Base, get_engine, ensure_database_exists
+from .infrastructure.db import Base, get_engine, ensure_database_exists, dispose_async_engine
+from .infrastructure.migrations import ALEMBIC_INI, StartupReport, check_and_migrate
+from .infrastructure.settings import get_settings, LAMBDA_FUNCTION_ENV
+from .infrastructure.auth import get_authenticator
+from .infrastructure.metering import get_usage_meter
+from .infrastructure.metrics import MetricsMiddleware, STARTUP_PHASE_MS
+from .infrastructure.tracing import TracingMiddleware
+
+
+def _legacy_schema_startup(report: StartupReport) -> None:
+    """Previous behaviour: create the database and spawn `alembic upgrade head`."""
+    with report.phase("ensure_database"):
+        ensure_database_exists()
+    with report.phase("migrate"):
+        if ALEMBIC_INI.exists():
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "alembic", "-c", str(ALEMBIC_INI), "upgrade", "head"],
+                    check=True,
+                    cwd=str(ALEMBIC_INI.parent),
+                    capture_output=True,
+                    text=True,
+                )
+                logging.info("Alembic migrations applied")
+            except subprocess.CalledProcessError as exc:  # pragma: no cover - defensive
+                logging.error("Alembic upgrade failed: %s", exc.stderr)
+        else:  # fallback (dev only)
+            try:
+                Base.metadata.create_all(bind=get_engine())
+            except Exception:
+                pass
+    report.outcome = "legacy"
+
+
+def run_schema_startup(report: StartupReport) -> None:
+    settings = get_settings()
+    mode = settings.db_startup_mode
+    if mode == "off":
+        report.outcome = "skipped"
+    elif mode == "legacy":
+        _legacy_schema_startup(report)
+    else:
+        try:
+            check_and_migrate(get_engine(), migrate=settings.db_migrate_on_startup, report=report)
+        except Exception:  # pragma: no cover - never block startup on schema handling
+            logging.exception("Schema check failed")
+            report.outcome = "error"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # pragma: no cover - simple setup
     """Lifespan context to perform startup/shutdown tasks.
 
-    Creates database tables on startup for development convenience. In
-    production prefer managed migrations (Alembic) and remove this.
+    By default (DB_STARTUP_MODE=check) compares the alembic_version row with
+    the head revision in-process and only migrates when DB_MIGRATE_ON_STARTUP
+    is set. Per-phase timings are logged and kept on ``app.state.startup_report``.
     """
+    report = StartupReport()
     # Ensure ORM models are imported so metadata is populated
-    try:  # noqa: F401
-        from .infrastructure import models  # type: ignore
-    except Exception:
-        logging.exception("Failed to import models module; tables may not be created")
-
-    ensure_database_exists()
-    # Run Alembic migrations to ensure schema is up to date
-    project_root = pathlib.Path(__file__).resolve().parent.parent
-    alembic_ini = project_root.parent / "alembic.ini"
-    if alembic_ini.exists():
-        try:
-            subprocess.run(
-                [
-                    "python",
-                    "-m",
-                    "alembic",
-                    "-c",
-                    str(alembic_ini),
-                    "upgrade",
-                    "head",
-                ],
-                check=True,
-                cwd=str(project_root.parent),
-                capture_output=True,
-                text=True,
-            )
-            logging.info("Alembic migrations applied")
-        except subprocess.CalledProcessError as exc:  # pragma: no cover - defensive
-            logging.error("Alembic upgrade failed: %s", exc.stderr)
-    else:  # fallback (dev only)
-        engine = get_engine()
-        try:
-            Base.metadata.create_all(bind=engine)
+    with report.phase("import_models"):
+        try:  # noqa: F401
+            from .infrastructure import models  # type: ignore
         except Exception:
-            pass
+            logging.exception("Failed to import models module; tables may not be created")
+
+    await asyncio.to_thread(run_schema_startup, report)
+    with report.phase("auth"):
+        get_authenticator()  # hash the configured API keys once, before the first request
+    report.log()
+    for phase, ms in report.phases.items():
+        STARTUP_PHASE_MS.set(ms, phase)
+    app.state.startup_report = report
+    meter = get_usage_meter()
+    if meter is not None:
+        meter.start()
     yield
-    # (No teardown actions needed yet.)
+    if meter is not None:
+        await meter.close()  # flush buffered usage before the engine goes away
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -97,9 +129,30 @@ def custom_openapi():  # pragma: no cover - doc generation
 
 app.openapi = custom_openapi  # type: ignore
 app.include_router(api_router)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)  # outermost: server span covers the metrics middleware
+
+
+_lambda_adapter = None
+
+
+def _get_lambda_adapter():
+    """Module-level Mangum singleton, reused across warm invocations.
+
+    lifespan="off": Mangum would otherwise run startup/shutdown (schema check,
+    engine disposal) on every invocation. Run migrations out-of-band on deploy.
+    """
+    global _lambda_adapter
+    if _lambda_adapter is None:
+        from mangum import Mangum
+
+        _lambda_adapter = Mangum(app, lifespan="off")
+    return _lambda_adapter
+
+
+if os.getenv(LAMBDA_FUNCTION_ENV):  # build during the Lambda init phase, not the first request
+    _get_lambda_adapter()
 
 
-def lambda_handler(event, context):  
-    from mangum import Mangum
-    handler = Mangum(app)
-    return handler(event, context)
+def lambda_handler(event, context):
+    return _get_lambda_adapter()(event, context)
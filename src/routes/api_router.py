@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Request
+from datetime import date, datetime, timedelta, timezone
+from fastapi.responses import PlainTextResponse, Response
 import uuid
-import httpx
 from ..application.extract_service import (
 	ExtractRequest,
 	ExtractResponse,
@@ -9,10 +10,21 @@ from ..application.extract_service import (
 )
 from ..infrastructure.pdf_downloader import get_pdf_downloader
 from ..infrastructure.gemini_client import get_gemini_client
-from ..infrastructure.auth import require_api_key
-from ..infrastructure.job_repository import ExtractionJobRepository
-from ..infrastructure.case_repository import CaseRepository
+from ..infrastructure.auth import ApiKeyIdentity, require_api_key, require_operator_key
+from ..infrastructure.db import pool_metrics
+from ..infrastructure.metrics import REGISTRY, CONTENT_TYPE
+from ..infrastructure.tracing import span, current_context, use_context, inject_headers
+from ..infrastructure.job_repository import AsyncExtractionJobRepository, get_async_job_repository
+from ..infrastructure.case_repository import AsyncCaseRepository, get_async_case_repository
+from ..infrastructure.artifact_repository import AsyncExtractionArtifactRepository, get_async_artifact_repository
+from ..infrastructure.usage_repository import ROLLUP_COUNTERS, AsyncUsageRepository, get_async_usage_repository
+from ..infrastructure.responses import json_response
+from ..infrastructure.resilience import DeadlineExceeded
+from ..infrastructure.scheduler import get_scheduler
+from ..infrastructure.settings import get_settings
+from ..application.extraction_models import Event, Evidence
 from pydantic import BaseModel
+from typing import Literal
 
 api_router = APIRouter(
 	tags=["extraction"],
@@ -28,20 +40,31 @@ class CaseSummary(BaseModel):
 	resume: str
 
 
+class CaseList(BaseModel):
+	items: list[CaseSummary]
+	count: int
+	limit: int
+	offset: int
+
+
 class CaseDetail(BaseModel):
 	case_id: str
 	resume: str
-	timeline: list[dict]
-	evidence: list[dict]
+	timeline: list[Event]
+	evidence: list[Evidence]
 
 
 @api_router.post(
 	"/extract",
 	response_model=ExtractResponse,
-	dependencies=[Depends(require_api_key)],
 	summary="Synchronous extraction",
-	description="Download the PDF, run structured extraction and return the result in a single response.",
+	description=(
+		"Download the PDF, run structured extraction and return the result in a single response. "
+		"Runs in the highest-priority (interactive) scheduler lane. The whole pipeline, including the "
+		"wait for a slot, runs within `timeout_s` (default `EXTRACT_TIMEOUT_S`); 504 when it expires."
+	),
 	responses={
+		504: {"description": "Deadline exceeded"},
 		200: {
 			"description": "Successful extraction",
 			"content": {
@@ -75,28 +98,43 @@ class CaseDetail(BaseModel):
 )
 async def extract_endpoint(
 	payload: ExtractRequest,
+	request: Request,
 	pdf_downloader=Depends(get_pdf_downloader),
 	gemini_client=Depends(get_gemini_client),
-) -> ExtractResponse:
+	api_key: ApiKeyIdentity = Depends(require_api_key),
+) -> Response:
 	service = get_extract_service(pdf_downloader=pdf_downloader, gemini_client=gemini_client)
-	return await service.extract(payload)
+	try:
+		result = await service.extract(
+			payload,
+			timeout=get_settings().extract_timeout_s,
+			lane="interactive",
+			api_key_id=api_key.key_id,
+		)
+	except DeadlineExceeded as exc:
+		raise HTTPException(status_code=504, detail=str(exc))
+	# Items are validated by the service; serialize straight to bytes (response_model documents the shape)
+	return await json_response(result, request)
 
 
 class AsyncExtractRequest(ExtractRequest):
 	"""Request body for asynchronous extraction.
 
 	callback_url (optional): Public URL to receive a POST webhook when the job finishes.
+	lane (optional): scheduler lane; "bulk" for backfills, which yield to interactive and async work.
 	"""
 	callback_url: str | None = None
+	lane: Literal["async", "bulk"] = "async"
 
 
 @api_router.post(
 	"/extract/async",
-	dependencies=[Depends(require_api_key)],
 	summary="Asynchronous extraction (fire-and-poll / webhook)",
 	description=(
 		"Enqueue an extraction job. Returns a job identifier immediately. "
-		"Use the job status endpoint to poll or provide a callback_url to receive a webhook when completed."
+		"Use the job status endpoint to poll or provide a callback_url to receive a webhook when completed. "
+		"Jobs stay `pending` while they wait for a slot in their lane (`async` or `bulk`); "
+		"slots are shared fairly between API keys."
 	),
 	responses={
 		200: {
@@ -110,56 +148,76 @@ async def extract_async_endpoint(
 	background_tasks: BackgroundTasks,
 	pdf_downloader=Depends(get_pdf_downloader),
 	gemini_client=Depends(get_gemini_client),
+	repo: AsyncExtractionJobRepository = Depends(get_async_job_repository),
+	api_key: ApiKeyIdentity = Depends(require_api_key),
 ):
 	job_id = str(uuid.uuid4())
-	repo = ExtractionJobRepository()
-	repo.create_job(job_id, payload.case_id, payload.callback_url)
+	api_key_id = api_key.key_id
+	await repo.create_job(job_id, payload.case_id, payload.callback_url, lane=payload.lane, api_key_id=api_key_id)
 
 	service = get_extract_service(pdf_downloader=pdf_downloader, gemini_client=gemini_client)
+	# Background tasks run after the response; re-attach the request's trace explicitly
+	trace_parent = current_context()
 
 	async def run_job():
-		repo.mark_running(job_id)
+		with use_context(trace_parent), span("extract.job", **{"job.id": job_id, "case.id": payload.case_id}):
+			await _run_job()
+
+	async def _run_job():
+		import httpx  # deferred: only background jobs with callbacks need it
+
 		try:
-			result = await service.extract(payload)
-			repo.mark_success(job_id)
+			result = await service.extract(
+				payload,
+				job_id=job_id,
+				timeout=get_settings().job_timeout_s,
+				lane=payload.lane,
+				api_key_id=api_key_id,
+				on_start=lambda: repo.mark_running(job_id),
+			)
+			await repo.mark_success(job_id)
 			if payload.callback_url:
 				try:
-					async with httpx.AsyncClient(timeout=10) as client:
-						await client.post(payload.callback_url, json={
-							"job_id": job_id,
-							"case_id": payload.case_id,
-							"status": "completed",
-							"result": {
-								"resume": result.resume,
-								"timeline": [e.model_dump() for e in result.timeline],
-								"evidence": [e.model_dump() for e in result.evidence],
-							}
-						})
+					with span("webhook.post", **{"http.url": payload.callback_url}):
+						async with httpx.AsyncClient(timeout=10) as client:
+							await client.post(payload.callback_url, headers=inject_headers(), json={
+								"job_id": job_id,
+								"case_id": payload.case_id,
+								"status": "completed",
+								"result": {
+									"resume": result.resume,
+									"timeline": [e.model_dump() for e in result.timeline],
+									"evidence": [e.model_dump() for e in result.evidence],
+								}
+							})
 				except Exception:
 					pass
 		except Exception as exc:  
-			repo.mark_error(job_id, str(exc))
+			await repo.mark_error(job_id, str(exc))
 			if payload.callback_url:
 				try:
-					async with httpx.AsyncClient(timeout=10) as client:
-						await client.post(payload.callback_url, json={
-							"job_id": job_id,
-							"case_id": payload.case_id,
-							"status": "failed",
-							"error": str(exc),
-						})
+					with span("webhook.post", **{"http.url": payload.callback_url}):
+						async with httpx.AsyncClient(timeout=10) as client:
+							await client.post(payload.callback_url, headers=inject_headers(), json={
+								"job_id": job_id,
+								"case_id": payload.case_id,
+								"status": "failed",
+								"error": str(exc),
+							})
 				except Exception:
 					pass
 
 	background_tasks.add_task(run_job)
-	return {"job_id": job_id, "status": "pending"}
+	return {"job_id": job_id, "status": "pending", "lane": payload.lane}
 
 
 @api_router.get(
 	"/extract/jobs/{job_id}",
-	dependencies=[Depends(require_api_key)],
 	summary="Get extraction job status",
-	description="Retrieve current status and metadata for a previously submitted asynchronous extraction job.",
+	description=(
+		"Retrieve current status and metadata for a previously submitted asynchronous extraction job. "
+		"Keys from the `api_keys` table see only their own jobs; `API_KEYS` (operator) keys see every job."
+	),
 	responses={
 		200: {
 			"description": "Job status",
@@ -180,20 +238,28 @@ async def extract_async_endpoint(
 		404: {"description": "Job not found"},
 	},
 )
-async def get_job_status(job_id: str):
-	repo = ExtractionJobRepository()
-	job = repo.get(job_id)
-	if not job:
+async def get_job_status(
+	job_id: str,
+	api_key: ApiKeyIdentity = Depends(require_api_key),
+	repo: AsyncExtractionJobRepository = Depends(get_async_job_repository),
+):
+	job = await repo.get(job_id)
+	# Another tenant's job is reported as missing, so job ids cannot be probed
+	if not job or (api_key.source != "env" and job["api_key_id"] != api_key.key_id):
 		raise HTTPException(status_code=404, detail="Job not found")
 	return job
 
 
 @api_router.get(
 	"/cases",
+	response_model=CaseList,
 	dependencies=[Depends(require_api_key)],
 	tags=["cases"],
 	summary="List cases",
-	description="Paginated list of stored cases (without full timeline/evidence to reduce payload).",
+	description=(
+		"Paginated list of stored cases (without full timeline/evidence to reduce payload). "
+		"Cases are shared by every API key: one stored extraction per case_id."
+	),
 	responses={
 		200: {
 			"description": "List of cases",
@@ -212,16 +278,21 @@ async def get_job_status(job_id: str):
 		}
 	},
 )
-async def list_cases(limit: int = 50, offset: int = 0):
-	repo = CaseRepository()
+async def list_cases(
+	request: Request,
+	limit: int = 50,
+	offset: int = 0,
+	repo: AsyncCaseRepository = Depends(get_async_case_repository),
+) -> Response:
 	limit = min(max(limit, 1), 200)
-	data = repo.list_cases(limit=limit, offset=offset)
-	items = [CaseSummary(case_id=c_id, resume=extraction.resume).model_dump() for c_id, extraction in data]
-	return {"items": items, "count": len(items), "limit": limit, "offset": offset}
+	data = await repo.list_case_summaries(limit=limit, offset=offset)
+	items = [CaseSummary.model_construct(case_id=c_id, resume=resume) for c_id, resume in data]
+	return await json_response(CaseList.model_construct(items=items, count=len(items), limit=limit, offset=offset), request)
 
 
 @api_router.get(
 	"/cases/{case_id}",
+	response_model=CaseDetail,
 	dependencies=[Depends(require_api_key)],
 	tags=["cases"],
 	summary="Get case by ID",
@@ -247,15 +318,146 @@ async def list_cases(limit: int = 50, offset: int = 0):
 		404: {"description": "Case not found"},
 	},
 )
-async def get_case(case_id: str):
-	repo = CaseRepository()
-	extraction = repo.get_case(case_id)
+async def get_case(
+	case_id: str,
+	request: Request,
+	repo: AsyncCaseRepository = Depends(get_async_case_repository),
+) -> Response:
+	extraction = await repo.get_case(case_id)
 	if not extraction:
 		raise HTTPException(status_code=404, detail="Case not found")
-	return CaseDetail(
+	detail = CaseDetail.model_construct(
 		case_id=case_id,
 		resume=extraction.resume,
-		timeline=[e.model_dump() for e in extraction.timeline],
-		evidence=[e.model_dump() for e in extraction.evidence],
+		timeline=extraction.timeline,
+		evidence=extraction.evidence,
 	)
+	return await json_response(detail, request)
+
+
+
+@api_router.get(
+	"/usage",
+	tags=["usage"],
+	summary="Usage per API key and day",
+	description=(
+		"Extractions, PDF bytes and pages, model tokens (prompt / output / total / cached) and LLM time "
+		"per API key and UTC day, read from the daily rollup (updated every `USAGE_FLUSH_INTERVAL_S`). "
+		"Keys from the `api_keys` table see their own usage; `API_KEYS` (operator) keys see every key "
+		"or filter with `api_key_id`. Defaults to the last 30 days."
+	),
+	responses={403: {"description": "Usage of another API key requested"}},
+)
+async def get_usage(
+	start: date | None = None,
+	end: date | None = None,
+	api_key_id: str | None = None,
+	api_key: ApiKeyIdentity = Depends(require_api_key),
+	repo: AsyncUsageRepository = Depends(get_async_usage_repository),
+):
+	if api_key.source != "env":
+		if api_key_id not in (None, api_key.key_id):
+			raise HTTPException(status_code=403, detail="Usage of other API keys is not visible to this key")
+		api_key_id = api_key.key_id
+	end = end or datetime.now(timezone.utc).date()
+	start = start or end - timedelta(days=30)
+	items = await repo.daily(api_key_id=api_key_id, start=start, end=end)
+	totals: dict[str, dict] = {}
+	for item in items:
+		key_totals = totals.setdefault(item["api_key_id"], dict.fromkeys(ROLLUP_COUNTERS, 0))
+		for counter in ROLLUP_COUNTERS:
+			key_totals[counter] += item[counter]
+	return {"start": start.isoformat(), "end": end.isoformat(), "items": items, "totals": totals, "count": len(items)}
+
+
+@api_router.get(
+	"/metrics",
+	dependencies=[Depends(require_api_key)],
+	tags=["diagnostics"],
+	response_class=PlainTextResponse,
+	summary="Prometheus metrics",
+	description=(
+		"Prometheus text exposition: per-stage extraction latency histograms, validation / fallback / "
+		"persistence error counters, PDF size and page-count distributions, HTTP latency per route "
+		"and DB pool gauges."
+	),
+)
+async def prometheus_metrics():
+	return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@api_router.get(
+	"/metrics/db-pool",
+	dependencies=[Depends(require_api_key)],
+	tags=["diagnostics"],
+	summary="Database pool metrics",
+	description=(
+		"Connection pool usage per engine (sync / async): configured mode, pool size, "
+		"connections in use, overflow and checkout wait time. Use it to size Postgres max_connections."
+	),
+)
+async def db_pool_metrics():
+	return {"pools": pool_metrics()}
 
+
+@api_router.get(
+	"/metrics/scheduler",
+	dependencies=[Depends(require_api_key)],
+	tags=["diagnostics"],
+	summary="Scheduler lanes",
+	description="Slots in use and extractions waiting per priority lane (interactive, async, bulk) in this process.",
+)
+async def scheduler_metrics():
+	return get_scheduler().stats()
+
+
+@api_router.get(
+	"/metrics/startup",
+	dependencies=[Depends(require_api_key)],
+	tags=["diagnostics"],
+	summary="Startup timings",
+	description="Outcome of the startup schema check and wall-clock time per startup phase (ms).",
+)
+async def startup_metrics(request: Request):
+	report = getattr(request.app.state, "startup_report", None)
+	return report.as_dict() if report is not None else {"outcome": None, "phases_ms": {}, "total_ms": 0}
+
+
+@api_router.get(
+	"/debug/extractions",
+	dependencies=[Depends(require_operator_key)],
+	tags=["diagnostics"],
+	summary="List archived extraction outputs",
+	description=(
+		"Metadata of archived raw model outputs (model, prompt hash, token usage, sizes), newest first. "
+		"Filter by case_id and/or job_id; fetch the full raw output by id. Operator (`API_KEYS`) keys only."
+	),
+	responses={403: {"description": "Not an operator key"}},
+)
+async def list_extraction_artifacts(
+	case_id: str | None = None,
+	job_id: str | None = None,
+	limit: int = 20,
+	repo: AsyncExtractionArtifactRepository = Depends(get_async_artifact_repository),
+):
+	limit = min(max(limit, 1), 100)
+	items = await repo.list(case_id=case_id, job_id=job_id, limit=limit)
+	return {"items": items, "count": len(items)}
+
+
+@api_router.get(
+	"/debug/extractions/{artifact_id}",
+	dependencies=[Depends(require_operator_key)],
+	tags=["diagnostics"],
+	summary="Get archived extraction output",
+	description="Decompressed raw model output, token usage and prompt hash of one extraction. Operator (`API_KEYS`) keys only.",
+	responses={403: {"description": "Not an operator key"}, 404: {"description": "Artifact not found"}},
+)
+async def get_extraction_artifact(
+	artifact_id: str,
+	repo: AsyncExtractionArtifactRepository = Depends(get_async_artifact_repository),
+):
+	artifact = await repo.get(artifact_id)
+	if not artifact:
+		raise HTTPException(status_code=404, detail="Artifact not found")
+	return artifact
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 from pathlib import Path
 import pytest
@@ -7,14 +8,15 @@ project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from benchmarks.synthetic import make_pdf  # noqa: E402
 from src.main import app  # noqa: E402
-from src.infrastructure.auth import require_api_key  # noqa: E402
+from src.infrastructure.auth import ApiKeyIdentity, key_id, require_api_key  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
 def disable_auth():
     """Automatically disable API key auth in tests unless specifically testing it."""
-    app.dependency_overrides[require_api_key] = lambda: "test-key"
+    app.dependency_overrides[require_api_key] = lambda: ApiKeyIdentity(key_id=key_id("test-key"), name="test", source="env")
     yield
     app.dependency_overrides.pop(require_api_key, None)
 
@@ -22,3 +24,61 @@ def disable_auth():
 @pytest.fixture()
 def client():
     return TestClient(app)
+
+
+class FixedDownloader:
+    """PDF downloader that always returns the same local file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def download(self, url, case_id):
+        return self.path
+
+
+class FakeCaseRepo:
+    """In-memory ``save_extraction`` / ``get_case``.
+
+    ``stored`` is returned by successive ``get_case`` calls (then None);
+    with ``error`` set, every save raises it.
+    """
+
+    def __init__(self, stored=None, error=None):
+        self.saved = []
+        self.stored = list(stored or [])
+        self.loads = 0
+        self.error = error
+
+    async def save_extraction(self, case_id, extraction, *, pdf_profile=None):
+        if self.error is not None:
+            raise self.error
+        await asyncio.sleep(0)  # like a real DB round trip: callers queued meanwhile join
+        self.saved.append(extraction)
+
+    async def get_case(self, case_id):
+        self.loads += 1
+        return self.stored.pop(0) if self.stored else None
+
+
+@pytest.fixture()
+def fixed_downloader():
+    """Factory: ``fixed_downloader(path)`` downloads every URL to ``path``."""
+    return FixedDownloader
+
+
+@pytest.fixture()
+def fake_case_repo():
+    """Factory: ``fake_case_repo(stored=None, error=None)``."""
+    return FakeCaseRepo
+
+
+@pytest.fixture()
+def pdf_file(tmp_path):
+    """Factory: a synthetic ``pages``-page PDF (text layer on the first ``text_pages``) in tmp_path."""
+
+    def make(pages, text_pages=None):
+        path = tmp_path / f"doc-{pages}-{text_pages}.pdf"
+        path.write_bytes(make_pdf(pages, text_pages))
+        return path
+
+    return make
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.infrastructure.models import Base  # type: ignore
+from src.infrastructure.case_repository import AsyncCaseRepository, get_async_case_repository
+from src.infrastructure.job_repository import AsyncExtractionJobRepository
+from src.application.extraction_models import CaseExtraction, Event, Evidence
+
+
+@pytest_asyncio.fixture()
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async with SessionLocal() as s:
+        yield s
+    await engine.dispose()
+
+
+def make_extraction(suffix: str) -> CaseExtraction:
+    return CaseExtraction(
+        resume=f"Resume {suffix}",
+        timeline=[
+            Event(
+                event_id=i,
+                event_name=f"Event{i}{suffix}",
+                event_description="d",
+                event_date="2024-01-01",
+                event_page_init=i + 1,
+                event_page_end=i + 2,
+            )
+            for i in range(3)
+        ],
+        evidence=[
+            Evidence(
+                evidence_id=0,
+                evidence_name=f"Evidence{suffix}",
+                evidence_flaw="f",
+                evidence_page_init=5,
+                evidence_page_end=6,
+            )
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_case_repository_upsert_and_list(session):
+    repo = AsyncCaseRepository(session=session)
+    await repo.save_extraction("CASE1", make_extraction("_v1"))
+    await repo.save_extraction("CASE1", make_extraction("_v2"))
+    await repo.save_extraction("CASE2", make_extraction("_other"))
+
+    stored = await repo.get_case("CASE1")
+    assert stored is not None
+    assert stored.resume == "Resume _v2"
+    assert [e.event_name for e in stored.timeline] == ["Event0_v2", "Event1_v2", "Event2_v2"]
+    assert len(stored.evidence) == 1
+
+    listed = await repo.list_cases(limit=10)
+    assert [case_id for case_id, _ in listed] == ["CASE1", "CASE2"]
+    assert await repo.list_case_summaries(limit=10) == [("CASE1", "Resume _v2"), ("CASE2", "Resume _other")]
+    assert await repo.list_case_summaries(limit=1, offset=1) == [("CASE2", "Resume _other")]
+    assert await repo.get_case("MISSING") is None
+
+
+@pytest.mark.asyncio
+async def test_async_job_repository_lifecycle(session):
+    repo = AsyncExtractionJobRepository(session=session)
+    await repo.create_job("job-1", "CASE1", None)
+    await repo.mark_running("job-1")
+    await repo.mark_error("job-1", "boom")
+    job = await repo.get("job-1")
+    assert job is not None
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+    assert await repo.get("missing") is None
+
+
+def test_get_case_route_uses_async_repository():
+    class FakeRepo:
+        async def get_case(self, case_id):
+            return make_extraction("_route") if case_id == "CASE1" else None
+
+    app.dependency_overrides[get_async_case_repository] = lambda: FakeRepo()
+    try:
+        client = TestClient(app)
+        ok = client.get("/cases/CASE1")
+        missing = client.get("/cases/NOPE")
+    finally:
+        app.dependency_overrides.pop(get_async_case_repository, None)
+    assert ok.status_code == 200
+    assert ok.json()["timeline"][0]["event_name"] == "Event0_route"
+    assert missing.status_code == 404
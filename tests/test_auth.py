@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.api_key_repository import AsyncApiKeyRepository
+from src.infrastructure.auth import (
+    ApiKeyAuthenticator,
+    ApiKeyIdentity,
+    KeyStoreUnavailable,
+    RateLimiter,
+    get_authenticator,
+    key_id,
+    require_api_key,
+)
+from src.infrastructure.job_repository import get_async_job_repository
+from src.infrastructure.models import Base
+from src.main import app
+
+
+@pytest.fixture()
+def real_auth():
+    """Undo the conftest override so requests go through get_api_key."""
+    override = app.dependency_overrides.pop(require_api_key)
+    yield
+    app.dependency_overrides.pop(get_authenticator, None)
+    app.dependency_overrides[require_api_key] = override
+
+
+@pytest_asyncio.fixture()
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as s:
+        yield s
+    await engine.dispose()
+
+
+def test_static_keys_and_per_key_rate_limit(client, real_auth):
+    authenticator = ApiKeyAuthenticator(["key-one", "key-two"], limiter=RateLimiter(per_minute=60, burst=2))
+    app.dependency_overrides[get_authenticator] = lambda: authenticator
+
+    assert client.get("/metrics/scheduler").status_code == 401
+    assert client.get("/metrics/scheduler", headers={"X-API-Key": "key-three"}).json()["detail"] == "Invalid API key"
+    ok = [client.get("/metrics/scheduler", headers={"X-API-Key": "key-one"}).status_code for _ in range(2)]
+    limited = client.get("/metrics/scheduler", headers={"X-API-Key": "key-one"})
+    assert ok == [200, 200] and limited.status_code == 429 and limited.headers["Retry-After"] == "1"
+    # Buckets are per key
+    assert client.get("/metrics/scheduler", headers={"X-API-Key": "key-two"}).status_code == 200
+
+    app.dependency_overrides[get_authenticator] = lambda: ApiKeyAuthenticator([])
+    assert client.get("/metrics/scheduler", headers={"X-API-Key": "key-one"}).json()["detail"] == "API key required"
+
+
+class _CountingRepo:
+    def __init__(self, inner):
+        self.inner = inner
+        self.lookups = 0
+        self.fail = False
+
+    async def lookup(self, digest):
+        self.lookups += 1
+        if self.fail:
+            raise ConnectionError("db down")
+        return await self.inner.lookup(digest)
+
+
+@pytest.mark.asyncio
+async def test_db_keys_are_cached_and_revocable(session):
+    repo = AsyncApiKeyRepository(session=session)
+    api_key, kid = await repo.create("tenant-a", rate_limit_per_min=5)
+    counting = _CountingRepo(repo)
+    authenticator = ApiKeyAuthenticator(["env-key"], repository=counting, cache_ttl=60)
+
+    identity = await authenticator.authenticate(api_key)
+    assert identity is not None and identity.key_id == kid == key_id(api_key)
+    assert (identity.name, identity.source, identity.rate_limit_per_min) == ("tenant-a", "db", 5)
+    assert await authenticator.authenticate(api_key) == identity and counting.lookups == 1
+    assert (await authenticator.authenticate("env-key")).source == "env" and counting.lookups == 1
+
+    assert await repo.revoke(kid)
+    assert await authenticator.authenticate(api_key) == identity  # until the cache entry expires
+    authenticator.invalidate()
+    assert await authenticator.authenticate(api_key) is None and counting.lookups == 2
+
+    counting.fail = True
+    with pytest.raises(KeyStoreUnavailable):
+        await authenticator.authenticate("never-seen")
+    assert await authenticator.authenticate(api_key) is None  # cached result is served while the DB is down
+
+
+class _JobRepo:
+    async def get(self, job_id):
+        return {"id": job_id, "case_id": "CASE-1", "status": "completed", "api_key_id": "tenant-a"} if job_id == "job-1" else None
+
+
+def test_tenant_keys_see_own_jobs_and_no_debug_output(client):
+    app.dependency_overrides[get_async_job_repository] = lambda: _JobRepo()
+    try:
+        assert client.get("/extract/jobs/job-1").status_code == 200  # operator key (conftest)
+        for tenant, status in (("tenant-a", 200), ("tenant-b", 404)):
+            app.dependency_overrides[require_api_key] = lambda: ApiKeyIdentity(key_id=tenant, name=tenant, source="db")
+            assert client.get("/extract/jobs/job-1").status_code == status
+        denied = client.get("/debug/extractions")
+    finally:
+        app.dependency_overrides.pop(get_async_job_repository, None)
+    assert denied.status_code == 403 and denied.json()["detail"] == "Operator API key required"
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import json
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+def test_benchmark_cli_quick_run(tmp_path, capsys):
+    out = tmp_path / "run.json"
+    assert main(["--quick", "--filter", "case_extraction_validate.10", "--output", str(out)]) == 0
+    document = json.loads(out.read_text())
+    assert "case_extraction_validate.10" in document["results"]
+    assert "case_extraction_validate.10k" in document["results"]
+    report = capsys.readouterr().out
+    assert "case_extraction_validate.10" in report
+
+
+def test_compare_flags_regressions():
+    base = {"results": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0}, "gone": {"median_us": 1.0}}}
+    cur = {"results": {"a": {"median_us": 20.0}, "b": {"median_us": 5.0}, "new": {"median_us": 1.0}}}
+    statuses = {row["name"]: row["status"] for row in harness.compare(cur, base, threshold=1.25)}
+    assert statuses == {"a": "regression", "b": "improved", "gone": "missing", "new": "new"}
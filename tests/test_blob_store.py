@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.infrastructure.blob_store import FileBlobStore
+from src.infrastructure.pdf_downloader import RequestsPdfDownloader, estimate_page_count
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = FileBlobStore(tmp_path)
+    key = store.put(b"%PDF-1.4 one")
+    assert key == hashlib.sha256(b"%PDF-1.4 one").hexdigest()
+    assert store.path(key) == tmp_path / key[:2] / key[2:4] / key
+    assert store.put(b"%PDF-1.4 one") == key
+    assert store.usage == len(b"%PDF-1.4 one")
+
+    with store.open(key) as view:
+        assert view[:8] == b"%PDF-1.4"
+    assert store.load(key) == b"%PDF-1.4 one"
+
+    store.save(hashlib.sha256(b"x").hexdigest(), b"x")
+    with pytest.raises(ValueError):
+        store.save(key, b"other content")
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+    with pytest.raises(KeyError):
+        store.load("0" * 64)
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    store = FileBlobStore(tmp_path)
+
+    def chunks():
+        yield b"partial"
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        store.put_stream(chunks())
+    assert os.listdir(tmp_path / "tmp") == []
+    assert store.usage == 0
+
+
+def test_lru_eviction_respects_quota_and_recent_use(tmp_path):
+    store = FileBlobStore(tmp_path, max_bytes=3000, grace_seconds=0)
+    keys = [store.put(bytes([i]) * 1000) for i in range(3)]
+    for age, key in zip((300, 200, 100), keys):  # keys[0] oldest
+        mtime = store.path(key).stat().st_mtime - age
+        os.utime(store.path(key), (mtime, mtime))
+    store.touch(keys[0])  # now most recently used
+
+    newest = store.put(b"\xff" * 1000)
+    assert not store.exists(keys[1]) and not store.exists(keys[2])  # down to the 90% watermark
+    assert store.exists(keys[0]) and store.exists(newest)
+    assert store.usage == 2000
+
+    # Blobs inside the grace period are never evicted
+    store = FileBlobStore(tmp_path, max_bytes=1000, grace_seconds=3600)
+    store.put(b"\xee" * 1000)
+    assert store.usage == 3000
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def test_downloader_streams_into_store(tmp_path):
+    body = b"%PDF-1.4\n" + b"1 0 obj << /Type /Page >> endobj\n" * 3 + b"x" * 200_000
+    downloader = RequestsPdfDownloader(store=FileBlobStore(tmp_path))
+    with patch("requests.get", return_value=_Response(body)) as get:
+        first = downloader.download("https://example.com/a.pdf", "CASE-1")
+        second = downloader.download("https://example.com/b.pdf", "CASE-2")
+    assert get.call_args.kwargs["stream"] is True
+    assert first == second and first.read_bytes() == body
+    assert estimate_page_count(first) == 3
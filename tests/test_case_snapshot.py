@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import importlib.util
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.synthetic import make_extraction_dict
+from src.application.extraction_models import CaseExtraction
+from src.infrastructure.case_repository import AsyncCaseRepository
+from src.infrastructure.metrics import CASE_SNAPSHOT_READS
+from src.infrastructure.migrations import ALEMBIC_INI, PROJECT_ROOT, VERSIONS_DIR, run_migrations
+from src.infrastructure.models import Base, CaseORM
+
+
+def _upgrade(engine, revision: str) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, revision)
+
+
+def _snapshot_migration():
+    spec = importlib.util.spec_from_file_location("snapshot_migration", VERSIONS_DIR / "0003_case_snapshot.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+@pytest_asyncio.fixture()
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async with SessionLocal() as s:
+        yield s
+    await engine.dispose()
+
+
+def test_migration_backfills_snapshots_in_batches(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'snap.db'}", future=True)
+    _upgrade(engine, "0002_add_extraction_jobs")
+    with engine.begin() as conn:
+        for case_id in ("C1", "C2", "C3"):
+            conn.execute(text("INSERT INTO cases (case_id, resume) VALUES (:c, :r)"), {"c": case_id, "r": f"resume {case_id}"})
+        for event_id in (1, 0):  # inserted out of order; snapshot is ordered by event_id
+            conn.execute(
+                text(
+                    "INSERT INTO timeline_events (case_id, event_id, event_name, event_description, event_date, "
+                    "event_page_init, event_page_end) VALUES ('C2', :e, :n, 'd', '', 1, 2)"
+                ),
+                {"e": event_id, "n": f"E{event_id}"},
+            )
+    with engine.connect() as conn:  # as on startup: the backfill commits batch by batch
+        run_migrations(conn)
+        conn.commit()
+
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT case_id, snapshot FROM cases")).all())
+    c2 = CaseExtraction.model_validate_json(rows["C2"])
+    assert [e.event_name for e in c2.timeline] == ["E0", "E1"] and c2.evidence == []
+    assert CaseExtraction.model_validate_json(rows["C3"]).resume == "resume C3"
+
+    # Re-runnable: only NULL snapshots are rewritten, batch by batch
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE cases SET snapshot = NULL WHERE case_id != 'C2'"))
+        assert _snapshot_migration().backfill(conn, batch_size=1) == 2
+        assert _snapshot_migration().backfill(conn, batch_size=1) == 0
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_case_reads_snapshot_and_falls_back(session):
+    repo = AsyncCaseRepository(session=session)
+    extraction = CaseExtraction(**make_extraction_dict(20))
+    await repo.save_extraction("CASE-SNAP", extraction)
+    await repo.save_extraction("CASE-OLD", extraction)
+    await session.execute(update(CaseORM).where(CaseORM.case_id == "CASE-OLD").values(snapshot=None))
+    await session.commit()
+
+    hits, misses = CASE_SNAPSHOT_READS.value("hit"), CASE_SNAPSHOT_READS.value("miss")
+    assert await repo.get_case("CASE-SNAP") == extraction
+    assert await repo.get_case("CASE-OLD") == extraction
+    assert CASE_SNAPSHOT_READS.value("hit") == hits + 1
+    assert CASE_SNAPSHOT_READS.value("miss") == misses + 1
+
+    listed = await repo.list_cases()
+    assert [case_id for case_id, _ in listed] == ["CASE-OLD", "CASE-SNAP"]
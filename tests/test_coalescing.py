@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.application.extraction_models import CaseExtraction
+from src.infrastructure.coalescing import ExtractionCoalescer, PgAdvisoryLock, coalesce_key, lock_id
+from src.infrastructure.metrics import COALESCED
+from src.infrastructure.scheduler import LaneScheduler
+
+
+class _Client:
+    model_name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_pdf(self, file_path, prompt):
+        self.calls += 1
+        return {"resume": "extracted", "timeline": [_event(0), _event(1)], "evidence": []}
+
+
+def _event(i):
+    return {"event_id": i, "event_name": "e", "event_description": "", "event_date": "", "event_page_init": 1, "event_page_end": 1}
+
+
+class _ContendedLock:
+    """Taken by another node for the first ``busy`` attempts."""
+
+    def __init__(self, busy: int):
+        self.busy = busy
+        self.attempts = 0
+
+    @asynccontextmanager
+    async def acquire(self, key):
+        self.attempts += 1
+        yield self.attempts > self.busy
+
+
+class _CountingLock:
+    """Never contended; records how many callers hold a lock connection at once."""
+
+    def __init__(self):
+        self.held = self.peak = 0
+
+    @asynccontextmanager
+    async def acquire(self, key):
+        self.held += 1
+        self.peak = max(self.peak, self.held)
+        try:
+            yield True
+        finally:
+            self.held -= 1
+
+
+def _request(case_id="CASE-COALESCE"):
+    return ExtractRequest(pdf_url="https://example.com/a.pdf", case_id=case_id)
+
+
+@pytest.fixture()
+def make_service(tmp_path, fixed_downloader):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+
+    def make(client, repo, coalescer, scheduler=None):
+        return ExtractService(fixed_downloader(pdf), client, case_repository=repo, coalescer=coalescer, scheduler=scheduler)
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_extractions_share_one_call(make_service, fake_case_repo):
+    client = _Client()
+    repo = fake_case_repo()
+    service = make_service(client, repo, ExtractionCoalescer())
+    joined = COALESCED.value("local")
+
+    first, second, third = await asyncio.gather(*(service.extract(_request()) for _ in range(3)))
+    assert client.calls == 1 and len(repo.saved) == 1
+    assert first is second is third and len(first.timeline) == 2
+    assert COALESCED.value("local") == joined + 2
+
+    await service.extract(_request())  # nothing in flight any more: a new extraction
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_follower_reuses_result_stored_by_other_node(make_service, fake_case_repo):
+    client = _Client()
+    stored = CaseExtraction(resume="from node A", timeline=[], evidence=[])
+    repo = fake_case_repo(stored=[None, stored])  # absent before waiting, present after
+    lock = _ContendedLock(busy=2)
+    service = make_service(client, repo, ExtractionCoalescer(lock=lock, poll_interval=0.01))
+    reused = COALESCED.value("remote")
+
+    out = await service.extract(_request(), debug=True)
+    assert out.resume == "from node A" and out.debug == {"coalesced": "remote"}
+    assert client.calls == 0 and repo.saved == [] and lock.attempts == 3 and repo.loads == 2
+    assert COALESCED.value("remote") == reused + 1
+
+    # The other node failed (stored case unchanged): extract ourselves
+    repo = fake_case_repo(stored=[stored, stored])
+    service = make_service(client, repo, ExtractionCoalescer(lock=_ContendedLock(busy=1), poll_interval=0.01))
+    out = await service.extract(_request())
+    assert client.calls == 1 and len(repo.saved) == 1 and len(out.timeline) == 2
+
+
+@pytest.mark.asyncio
+async def test_queued_cases_do_not_hold_the_cluster_lock(make_service, fake_case_repo):
+    client = _Client()
+    lock = _CountingLock()
+    scheduler = LaneScheduler(capacity=2)
+    repo = fake_case_repo()
+    service = make_service(client, repo, ExtractionCoalescer(lock=lock), scheduler)
+
+    cases = [_request(f"CASE-QUEUED-{i}") for i in range(6)]
+    await asyncio.gather(*(service.extract(case, lane="interactive") for case in cases))
+    # Waiting for a slot happens before the lock: never more lock connections than slots
+    assert client.calls == 6 and lock.peak <= 2
+    assert repo.loads == 0  # uncontended: the stored case is never read
+    assert scheduler.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_keys_and_lock_fallback_without_postgres():
+    assert coalesce_key("CASE-1", "https://x/a.pdf") == "CASE-1"
+    assert coalesce_key("CASE-1", "https://x/a.pdf", "case_url") != coalesce_key("CASE-1", "https://x/b.pdf", "case_url")
+    with pytest.raises(ValueError):
+        coalesce_key("CASE-1", None, "url")
+    assert lock_id("CASE-1") == lock_id("CASE-1") and -(2**63) <= lock_id("CASE-1") < 2**63
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with PgAdvisoryLock(lambda: engine).acquire("CASE-1") as held:
+        assert held  # no advisory locks outside Postgres: in-process coalescing only
+    await engine.dispose()
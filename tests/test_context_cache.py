@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from unittest.mock import Mock, patch
+
+from benchmarks.synthetic import clean_output
+from src.application.prompts import PROMPT_VERSION, extraction_prompt
+from src.infrastructure.context_cache import CACHED_PROMPT_REFERENCE, PromptContextCache, SdkCacheBackend
+from src.infrastructure.gemini_client import GeminiClient
+from src.infrastructure.metrics import CONTEXT_CACHE
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Backend:
+    def __init__(self):
+        self.created, self.refreshed = [], []
+        self.fail_create = self.fail_refresh = False
+
+    def create(self, model, prompt, ttl):
+        if self.fail_create:
+            raise RuntimeError("400 cached content is too small")
+        self.created.append((model, prompt, ttl))
+        return f"cachedContents/{len(self.created)}"
+
+    def refresh(self, handle, ttl):
+        if self.fail_refresh:
+            raise RuntimeError("404 not found")
+        self.refreshed.append((handle, ttl))
+
+    def bind(self, handle):
+        return ("model", handle)
+
+
+def test_prompt_is_built_once_per_version():
+    prompt = extraction_prompt()
+    assert prompt is extraction_prompt(PROMPT_VERSION) and prompt.version == PROMPT_VERSION
+    assert "JSON SCHEMA EXAMPLE" in prompt.text and len(prompt.sha256) == 64
+
+
+def test_cache_lifetime_refresh_and_fallback():
+    clock, backend = _Clock(), _Backend()
+    text = extraction_prompt().text
+    too_small = PromptContextCache(backend, clock=clock)  # default minimum: 32,768 tokens
+    assert too_small.model_for("m", text) is None and too_small.model_for("m", text) is None
+    assert backend.created == [] and CONTEXT_CACHE.value("m", "too_small") == 1
+
+    cache = PromptContextCache(backend, ttl=100, refresh_margin=10, min_tokens=0, clock=clock)
+
+    assert cache.model_for("m", text) == ("model", "cachedContents/1")
+    clock.now = 50
+    assert cache.model_for("m", text) == ("model", "cachedContents/1") and len(backend.created) == 1
+    assert CONTEXT_CACHE.value("m", "hit") >= 1
+
+    clock.now = 95  # inside the refresh margin: TTL extended, same cache
+    assert cache.model_for("m", text) == ("model", "cachedContents/1")
+    assert backend.refreshed == [("cachedContents/1", 100)]
+    clock.now = 150
+    assert cache.model_for("m", text) == ("model", "cachedContents/1") and len(backend.created) == 1
+
+    clock.now = 400  # expired without traffic: created again
+    assert cache.model_for("m", text) == ("model", "cachedContents/2")
+    clock.now = 495
+    backend.fail_refresh = True  # e.g. deleted server-side
+    assert cache.model_for("m", text) == ("model", "cachedContents/3")
+
+    backend.fail_create = True
+    assert cache.model_for("other-model", text) is None
+    backend.fail_create = False
+    assert cache.model_for("other-model", text) is None  # failure remembered for one TTL
+    assert CONTEXT_CACHE.value("other-model", "bypass") == 1
+    clock.now += 100
+    assert cache.model_for("other-model", text) == ("model", "cachedContents/4")
+
+
+def test_client_sends_document_plus_reference_when_cached():
+    text = extraction_prompt().text
+    plain, cached = Mock(), Mock()
+    plain.generate_content.return_value = Mock(text=clean_output(1))
+    cached.generate_content.return_value = Mock(text=clean_output(2))
+    sdk = Mock()
+    sdk.GenerativeModel.return_value = plain
+    sdk.GenerativeModel.from_cached_content.return_value = cached
+    cache = PromptContextCache(SdkCacheBackend(lambda: sdk), ttl=600, min_tokens=0)
+
+    with patch("src.infrastructure.gemini_client.genai", new=sdk):
+        out = GeminiClient(api_key="k", model="gemini-test", context_cache=cache).analyze_pdf("/tmp/x.pdf", text)
+        assert len(out["timeline"]) == 2
+        create = sdk.caching.CachedContent.create.call_args.kwargs
+        assert create["model"] == "models/gemini-test" and create["system_instruction"] is text
+        assert create["ttl"].total_seconds() == 600
+        contents = cached.generate_content.call_args.args[0]
+        assert contents[-1] == {"text": CACHED_PROMPT_REFERENCE} and "file_data" in contents[0]
+
+        # No cache: the full prompt goes with the document
+        GeminiClient(api_key="k", model="gemini-test").analyze_pdf("/tmp/x.pdf", text)
+        assert plain.generate_content.call_args.args[0][-1] == {"text": text}
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.infrastructure import db
+from src.infrastructure.settings import Settings
+
+
+def test_pool_mode_resolution(monkeypatch):
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+    assert Settings().pool_mode() == "queue"
+    assert Settings(db_pool_mode="null").pool_config() == {"mode": "null"}
+
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "intj-api")
+    assert Settings().pool_mode() == "null"
+    # Explicit mode wins over Lambda auto-detection
+    assert Settings(db_pool_mode="queue").pool_config()["pool_size"] == 10
+
+    with pytest.raises(ValueError):
+        Settings(db_pool_mode="bogus").pool_mode()
+
+
+def test_engine_pool_kwargs_follow_settings(monkeypatch):
+    monkeypatch.setattr(db, "get_settings", lambda: Settings(db_pool_mode="queue", db_pool_size=3, db_max_overflow=1))
+    kwargs = db.engine_pool_kwargs("async")
+    assert kwargs["poolclass"] is db.InstrumentedAsyncQueuePool
+    assert kwargs["pool_size"] == 3
+    assert kwargs["max_overflow"] == 1
+
+    monkeypatch.setattr(db, "get_settings", lambda: Settings(db_pool_mode="null"))
+    assert db.engine_pool_kwargs("sync") == {"poolclass": db.InstrumentedNullPool}
+
+
+def test_instrumented_pool_reports_usage():
+    stats = db._POOL_STATS["sync"]
+    previous = stats.engine
+    engine = create_engine("sqlite+pysqlite:///:memory:", poolclass=db.InstrumentedQueuePool, pool_size=2, max_overflow=1)
+    stats.reset()
+    db.instrument_engine(engine, "sync")
+    try:
+        with engine.connect() as c1, engine.connect() as c2, engine.connect() as c3:
+            for conn in (c1, c2, c3):
+                conn.execute(text("SELECT 1"))
+            snap = stats.snapshot()
+            assert snap["mode"] == "queue"
+            assert snap["checked_out"] == 3
+            assert snap["pool_size"] == 2
+            assert snap["overflow"] == 1
+        snap = stats.snapshot()
+        assert snap["checked_out"] == 0
+        assert snap["checkouts_total"] == 3
+        assert snap["checkout_wait_seconds"]["count"] == 3
+    finally:
+        engine.dispose()
+        stats.engine = previous
+        stats.reset()
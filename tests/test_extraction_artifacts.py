@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.synthetic import clean_output
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.infrastructure import artifact_repository
+from src.infrastructure.artifact_repository import (
+    AsyncExtractionArtifactRepository,
+    ExtractionArtifact,
+    decode_payload,
+    encode_payload,
+    get_async_artifact_repository,
+)
+from src.infrastructure.models import Base, ExtractionArtifactORM
+from src.infrastructure.replay_llm_client import ReplayGeminiClient
+from src.main import app
+
+USAGE = {"prompt_token_count": 1200, "candidates_token_count": 340, "total_token_count": 1540}
+
+
+@pytest_asyncio.fixture()
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async with SessionLocal() as s:
+        yield s
+    await engine.dispose()
+
+
+def test_payload_roundtrip_and_codecs(monkeypatch):
+    monkeypatch.setattr(artifact_repository, "zstandard", None)
+    payload = {"raw_text": clean_output(200), "usage": USAGE, "response_mode": "text"}
+    encoding, blob, raw_bytes = encode_payload(payload)
+    assert encoding == "gzip" and len(blob) < raw_bytes // 4
+    assert json.loads(gzip.decompress(blob)) == payload
+    assert decode_payload(encoding, blob) == payload
+    with pytest.raises(RuntimeError):
+        decode_payload("zstd", b"")
+    with pytest.raises(ValueError):
+        decode_payload("lz4", b"")
+
+
+@pytest.mark.asyncio
+async def test_extract_archives_raw_output_outside_the_response(tmp_path, session, fixed_downloader, fake_case_repo):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    raw = clean_output(30)
+    client = ReplayGeminiClient([{"raw_text": raw, "latency_ms": 0, "usage": USAGE}], model="gemini-test", sleep=lambda _s: None)
+    repo = AsyncExtractionArtifactRepository(session=session)
+    service = ExtractService(
+        fixed_downloader(pdf), client, case_repository=fake_case_repo(error=RuntimeError("no database")), artifact_repository=repo
+    )
+
+    result = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-ART-1"), debug=True, job_id="job-1")
+    assert len(result.timeline) == 30
+    assert "raw_text" not in result.debug and result.debug["artifact_id"]
+
+    listed = await repo.list(case_id="CASE-ART-1")
+    assert [a["id"] for a in listed] == [result.debug["artifact_id"]]
+    assert listed[0]["job_id"] == "job-1" and listed[0]["prompt_tokens"] == 1200 and listed[0]["output_tokens"] == 340
+    assert "raw_text" not in listed[0]
+    assert await repo.list(job_id="other") == []
+
+    stored = await repo.get(result.debug["artifact_id"])
+    assert stored["raw_text"] == raw and stored["usage"] == USAGE and stored["model"] == "gemini-test"
+    assert stored["stored_bytes"] < stored["raw_bytes"]
+    assert len(stored["prompt_sha256"]) == 64
+    assert await repo.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_coded_off_the_event_loop(session, monkeypatch):
+    offloaded = []
+
+    async def to_thread(fn, *args):
+        offloaded.append(fn.__name__)
+        return fn(*args)
+
+    monkeypatch.setattr(artifact_repository, "_THREAD_THRESHOLD", 1024)
+    monkeypatch.setattr(artifact_repository.asyncio, "to_thread", to_thread)
+    repo = AsyncExtractionArtifactRepository(session=session)
+    raw = clean_output(30)
+    artifact_id = await repo.save(ExtractionArtifact(case_id="CASE-ART-3", prompt_sha256="0" * 64, raw_text=raw))
+    assert (await repo.get(artifact_id))["raw_text"] == raw
+    assert offloaded == ["encode_payload", "decode_payload"]
+
+
+@pytest.mark.asyncio
+async def test_debug_endpoints(session):
+    repo = AsyncExtractionArtifactRepository(session=session)
+    artifact_id = await repo.save(ExtractionArtifact(case_id="CASE-ART-2", prompt_sha256="0" * 64, raw_text="{}", usage=USAGE))
+    row = (await session.execute(select(ExtractionArtifactORM))).scalars().one()
+    assert row.encoding in {"gzip", "zstd"}
+
+    from httpx import ASGITransport, AsyncClient
+
+    app.dependency_overrides[get_async_artifact_repository] = lambda: repo
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http:
+            listing = await http.get("/debug/extractions", params={"case_id": "CASE-ART-2"})
+            detail = await http.get(f"/debug/extractions/{artifact_id}")
+            missing = await http.get("/debug/extractions/nope")
+    finally:
+        app.dependency_overrides.pop(get_async_artifact_repository, None)
+
+    assert listing.json()["count"] == 1 and listing.json()["items"][0]["id"] == artifact_id
+    assert detail.json()["raw_text"] == "{}" and detail.json()["usage"] == USAGE
+    assert missing.status_code == 404
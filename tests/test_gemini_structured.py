@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from benchmarks.synthetic import clean_output, make_extraction_dict, truncated_output
+from src.application.extraction_models import CaseExtraction, Event
+from src.infrastructure.gemini_client import GeminiClient, _build_client, count_streamed_item
+from src.infrastructure.gemini_structured import IncrementalExtractionParser, response_schema
+from src.infrastructure.metrics import LLM_STREAMED_ITEMS
+from src.infrastructure.replay_llm_client import ReplayGeminiClient
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _fake_sdk(model: Mock) -> Mock:
+    sdk = Mock()
+    sdk.GenerativeModel.return_value = model
+    return sdk
+
+
+def test_response_schema_is_gemini_subset():
+    schema = response_schema(CaseExtraction)
+    dumped = json.dumps(schema)
+    assert "$ref" not in dumped and "title" not in dumped
+    assert schema["type"] == "object"
+    assert schema["required"] == ["resume", "timeline", "evidence"]
+    event = schema["properties"]["timeline"]["items"]
+    assert event["properties"]["event_page_init"] == {"type": "integer"}
+
+
+def test_parser_emits_items_as_they_complete():
+    text = clean_output(12)
+    parser = IncrementalExtractionParser()
+    first_emit_at = None
+    seen = []
+    for i, chunk in enumerate(_chunks(text, 40)):
+        items = parser.feed(chunk)
+        if items and first_emit_at is None:
+            first_emit_at = i
+        seen.extend(items)
+    parsed, status = parser.finish()
+    assert status == "stream"
+    expected = json.loads(text)
+    assert parsed["resume"] == expected["resume"]
+    assert [e.model_dump() for e in parsed["timeline"]] == expected["timeline"]
+    assert [k for k, _ in seen].count("timeline") == 12
+    assert isinstance(seen[0][1], Event)
+    # The first event is available long before the stream ends
+    assert first_emit_at < len(_chunks(text, 40)) // 4
+
+
+def test_parser_drops_invalid_items_and_salvages_truncation():
+    data = make_extraction_dict(3)
+    data["timeline"][1]["event_page_init"] = "not-a-page"
+    parser = IncrementalExtractionParser()
+    for chunk in _chunks(json.dumps(data), 25):
+        parser.feed(chunk)
+    parsed, status = parser.finish()
+    assert status == "stream" and parser.invalid_items == 1
+    assert len(parsed["timeline"]) == 2
+
+    parser = IncrementalExtractionParser()
+    for chunk in _chunks(truncated_output(20), 64):
+        parser.feed(chunk)
+    parsed, status = parser.finish()
+    assert status == "salvaged" and 0 < len(parsed["timeline"]) < 20
+
+
+def test_json_mode_passes_schema_and_mime_type():
+    model = Mock()
+    model.generate_content.return_value = Mock(text=clean_output(2))
+    client = GeminiClient(api_key="k", model="m", response_mode="json")
+    with patch("src.infrastructure.gemini_client.genai", new=_fake_sdk(model)):
+        out = client.analyze_pdf("/tmp/x.pdf", "prompt")
+    config = model.generate_content.call_args.kwargs["generation_config"]
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"] == response_schema(CaseExtraction)
+    assert len(out["timeline"]) == 2 and "validation_error" not in out
+
+
+def test_stream_mode_validates_incrementally_with_mocked_sdk():
+    model = Mock()
+    model.generate_content.return_value = iter([Mock(text=c) for c in _chunks(clean_output(5), 30)])
+    received = []
+    client = GeminiClient(api_key="k", model="m", response_mode="stream", on_item=lambda k, item: received.append(k))
+    with patch("src.infrastructure.gemini_client.genai", new=_fake_sdk(model)):
+        out = client.analyze_pdf("/tmp/x.pdf", "prompt")
+    assert model.generate_content.call_args.kwargs["stream"] is True
+    assert received.count("timeline") == 5
+    assert len(out["timeline"]) == 5 and "validation_error" not in out
+
+
+def test_replay_client_streams_recorded_output(tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    received = []
+    client = ReplayGeminiClient(
+        [{"raw_text": clean_output(4), "latency_ms": 0}],
+        response_mode="stream",
+        stream_chunk_chars=50,
+        sleep=lambda _s: None,
+        on_item=lambda k, item: received.append(k),
+    )
+    out = client.analyze_pdf(str(pdf), "prompt")
+    assert received.count("timeline") == 4
+    assert len(out["timeline"]) == 4
+
+
+def test_clients_from_settings_count_streamed_items():
+    settings = SimpleNamespace(llm_client_mode="live", gemini_api_key="k", gemini_response_mode="stream")
+    with patch("src.infrastructure.gemini_client.genai", new=_fake_sdk(Mock())):
+        assert _build_client(settings, "m").on_item is count_streamed_item
+
+    before = LLM_STREAMED_ITEMS.value("timeline")
+    client = ReplayGeminiClient(
+        [{"raw_text": clean_output(3), "latency_ms": 0}], response_mode="stream", sleep=lambda _s: None, on_item=count_streamed_item
+    )
+    client.analyze_pdf("/tmp/x.pdf", "prompt")
+    assert LLM_STREAMED_ITEMS.value("timeline") == before + 3
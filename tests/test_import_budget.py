@@ -0,0 +1,54 @@
+"""Guard Lambda cold-start cost: importing src.main must stay lean.
+
+Heavy SDKs are deferred until first use; if one of them shows up here,
+something imported it at module level.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFERRED_MODULES = [
+    "google.generativeai",
+    "grpc",
+    "IPython",
+    "pypdf",
+    "langchain_google_genai",
+    "requests",
+    "httpx",
+    "alembic",
+]
+# Wall-clock budget for `import src.main` in a fresh interpreter (override on slow CI).
+IMPORT_BUDGET_MS = float(os.getenv("INTJ_IMPORT_BUDGET_MS", "3000"))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_import_src_main_within_budget():
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % (DEFERRED_MODULES,)],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "AWS_LAMBDA_FUNCTION_NAME": "import-budget-test"},
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["loaded"] == [], f"eagerly imported: {result['loaded']}"
+    assert result["ms"] < IMPORT_BUDGET_MS, f"import took {result['ms']:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms)"
+
+
+def test_lambda_adapter_is_singleton():
+    from src import main
+
+    assert main._get_lambda_adapter() is main._get_lambda_adapter()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+
+from benchmarks.synthetic import brace_heavy_prose, fenced_output, make_extraction_dict, truncated_output
+from src.infrastructure.gemini_client import GeminiClient
+from src.infrastructure.json_scan import scan_json
+
+
+def test_exact_and_fenced_output():
+    assert scan_json('{"resume": "r"}').status == "exact"
+    scan = scan_json(fenced_output(5))
+    assert scan.status == "embedded"
+    assert scan.value == make_extraction_dict(5)
+
+
+def test_braces_and_quotes_in_strings_and_prose():
+    text = 'Veja {fls. 3} e "aspas" {}\n```json\n{"resume": "chave } { \\" ok", "timeline": []}\n``` fim {x}'
+    scan = scan_json(text)
+    assert scan.status == "embedded"
+    assert scan.value == {"resume": 'chave } { " ok', "timeline": []}
+
+
+def test_prefers_outermost_object():
+    scan = scan_json('texto {"resume": "r", "timeline": [{"event_id": 1}]} depois')
+    assert list(scan.value) == ["resume", "timeline"]
+
+
+def test_salvages_complete_items_from_truncated_output():
+    full = make_extraction_dict(50)
+    scan = scan_json(truncated_output(50, keep=0.8))
+    assert scan.status == "salvaged"
+    assert scan.truncated_keys == ["timeline"]
+    assert scan.value["resume"] == full["resume"]
+    salvaged = scan.value["timeline"]
+    assert 0 < len(salvaged) < 50
+    assert salvaged == full["timeline"][: len(salvaged)]
+
+
+def test_salvage_keeps_evidence_when_cut_in_second_array():
+    full = make_extraction_dict(4, 6)
+    text = json.dumps(full)
+    cut = text.rindex('{"evidence_id": 5')
+    scan = scan_json("```json\n" + text[: cut + 10])
+    assert len(scan.value["timeline"]) == 4
+    assert scan.value["evidence"] == full["evidence"][:5]
+    assert scan.truncated_keys == ["evidence"]
+
+
+def test_no_object_and_adversarial_inputs():
+    assert not scan_json("").found
+    assert not scan_json("sem json aqui").found
+    assert not scan_json("{" * 10_000).found
+    assert scan_json(brace_heavy_prose(50_000)).value["resume"]
+
+
+def test_client_flags_salvaged_output():
+    client = GeminiClient(api_key="dummy", model="m")
+    out = client._parse_raw(truncated_output(20))
+    assert out["validation_error"] is True
+    assert out["timeline"] and out["resume"]
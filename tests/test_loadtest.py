@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from benchmarks.loadtest import compare, main, parse_mix, percentiles
+from src.infrastructure.settings import get_settings
+
+
+def test_percentiles_nearest_rank():
+    stats = percentiles([float(i) for i in range(1, 101)])
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (50.0, 95.0, 99.0, 100.0)
+    assert percentiles([]) == {"count": 0}
+
+
+def test_parse_mix_rejects_unknown_routes():
+    assert parse_mix("extract:2,cases") == {"extract": 2.0, "cases": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("upload:1")
+
+
+def test_loadtest_end_to_end_sqlite(tmp_path, capsys):
+    out = tmp_path / "load.json"
+    argv = ["--rate", "25", "--duration", "0.6", "--llm-latency", "fixed:1", "--seed-cases", "5", "--events", "5",
+            "--output", str(out)]
+    assert main(argv) == 0
+    report = json.loads(out.read_text())
+
+    assert report["requests"] > 0
+    assert set(report["routes"]) <= {"extract", "extract_async", "cases", "case"}
+    assert all(r["errors"] == 0 for r in report["routes"].values())
+    assert report["stages"]["gemini.generation"]["count"] >= 1
+    assert "p99" in report["stages"]["extract"]
+    assert "route:" in capsys.readouterr().out
+
+    rows = compare(report, report)
+    assert all(r["ratio"] in (1.0, None) for r in rows)
+    # The harness restores the process environment it overrode
+    assert get_settings().llm_client_mode == "gemini"
+    assert get_settings().database_url_override is None
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import Mock
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.infrastructure.metrics import Registry, STAGE_SECONDS, HTTP_SECONDS, FALLBACKS
+from src.infrastructure.pdf_downloader import get_pdf_downloader, estimate_page_count
+from src.infrastructure.gemini_client import get_gemini_client
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1))
+    hist.observe(0.05, "a")
+    hist.observe(0.5, "a")
+    hist.observe(5, "a")
+    counter = registry.counter("demo_total", "Demo counter.")
+    counter.inc()
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert "# TYPE demo_total counter" in text
+    assert "demo_total 1" in text
+
+
+def test_summary_exposes_sum_and_count_under_one_type():
+    registry = Registry()
+    registry.summary("demo_wait_seconds", "Demo summary.", ("engine",), lambda: {("async",): (1.5, 3)})
+    text = registry.render()
+    assert "# TYPE demo_wait_seconds summary" in text
+    assert 'demo_wait_seconds_sum{engine="async"} 1.5' in text
+    assert 'demo_wait_seconds_count{engine="async"} 3' in text
+
+
+def test_estimate_page_count(tmp_path):
+    pdf = tmp_path / "p.pdf"
+    pdf.write_bytes(b"%PDF-1.4 1 0 obj <</Type /Pages /Count 2>> 2 0 obj <</Type /Page>> 3 0 obj <</Type/Page>>")
+    assert estimate_page_count(pdf) == 2
+
+
+def test_extract_records_stage_and_route_metrics(tmp_path):
+    pdf = tmp_path / "m.pdf"
+    pdf.write_bytes(b"%PDF-1.4 <</Type /Page>>")
+    downloader = Mock()
+    downloader.download.return_value = pdf
+    downloads_before = STAGE_SECONDS.count("download")
+    no_client_before = FALLBACKS.value("no_client")
+
+    app.dependency_overrides[get_pdf_downloader] = lambda: downloader
+    app.dependency_overrides[get_gemini_client] = lambda: None
+    try:
+        client = TestClient(app)
+        assert client.post("/extract", json={"pdf_url": "https://example.com/a.pdf", "case_id": "CASE-METRICS"}).status_code == 200
+        resp = client.get("/metrics")
+    finally:
+        app.dependency_overrides.pop(get_pdf_downloader, None)
+        app.dependency_overrides.pop(get_gemini_client, None)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert STAGE_SECONDS.count("download") == downloads_before + 1
+    assert FALLBACKS.value("no_client") == no_client_before + 1
+    assert HTTP_SECONDS.count("POST", "/extract", "200") >= 1
+    assert 'intj_extract_stage_seconds_bucket{stage="download"' in resp.text
+    assert 'route="/extract"' in resp.text
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.application.extract_service import ExtractRequest, ExtractService
+
+from src.application.extraction_models import Event
+from src.infrastructure.metrics import FALLBACKS, LLM_ABANDONED_CALLS, MODEL_ROUTES
+from src.infrastructure.model_router import DocumentProfile, ModelRouter, RouteRule, load_rules, profile_pdf
+from src.infrastructure.pdf_preflight import preflight_pdf
+
+
+class _FakeClient:
+    """Returns one event spanning the pages of the (possibly split) PDF it receives."""
+
+    response_mode = "text"
+
+    def __init__(self, model: str, delay: float = 0.0):
+        self.model_name = model
+        self.delay = delay
+        self.calls = 0
+        self._release = threading.Event()
+
+    def analyze_pdf(self, file_path, prompt):
+        self.calls += 1
+        if self.delay:
+            self._release.wait(self.delay)
+        pages = profile_pdf(file_path, sample_pages=0).pages
+        event = Event(event_id=0, event_name=self.model_name, event_description="", event_date="", event_page_init=1, event_page_end=pages)
+        return {"resume": f"{self.model_name}:{pages}", "timeline": [event], "evidence": [], "raw_text": "{}", "usage": {"total_token_count": 10}}
+
+
+def test_profile_and_rule_matching(pdf_file):
+    text = profile_pdf(pdf_file(10))
+    scanned = profile_pdf(pdf_file(10, text_pages=0))
+    assert text.pages == scanned.pages == 10
+    assert text.chars_per_page > 100 and scanned.chars_per_page == 0
+
+    rules = load_rules(
+        '[{"name": "scanned", "max_chars_per_page": 50, "model": "pro"},'
+        ' {"name": "short", "max_pages": 20, "model": "flash"},'
+        ' {"name": "rest"}]'
+    )
+    router = ModelRouter(_FakeClient, rules, default_model="default")
+    assert router.route(scanned).name == "scanned"
+    assert router.route(text).name == "short"
+    assert router.route(DocumentProfile(bytes=1, pages=500, chars_per_page=None)).name == "rest"
+
+    # The pre-flight profile is reused as is: no second pass over the PDF
+    digital = preflight_pdf(pdf_file(10)).profile
+    with patch("src.infrastructure.model_router.profile_pdf") as resampled:
+        out = router.analyze_pdf(str(pdf_file(10)), "prompt", pdf_profile=digital)
+    resampled.assert_not_called()
+    assert out["routing"]["rule"] == "short" and out["routing"]["profile"]["chars_per_page"] == digital.text_chars / 10
+    with pytest.raises(ValueError):
+        load_rules('[{"name": "x", "max_page": 3}]')
+    assert [r.name for r in load_rules(None)] == ["short", "scanned", "long", "default"]
+
+
+def test_timeout_falls_back_to_faster_model(pdf_file):
+    slow, fast = _FakeClient("slow", delay=5), _FakeClient("fast")
+    clients = {"slow": slow, "fast": fast}
+    rule = RouteRule(name="all", model="slow", timeout_s=0.05, fallback_model="fast")
+    router = ModelRouter(clients.__getitem__, [rule], default_model="slow")
+    fallbacks = FALLBACKS.value("timeout")
+
+    out = router.analyze_pdf(str(pdf_file(3)), "prompt")
+    slow._release.set()
+    assert out["resume"] == "fast:3"
+    assert out["routing"]["model"] == "slow" and out["routing"]["models_used"] == ["fast"]
+    assert out["routing"]["fallback"] is True and out["routing"]["profile"]["pages"] == 3
+    assert FALLBACKS.value("timeout") == fallbacks + 1
+    assert MODEL_ROUTES.value("all", "slow", "whole") >= 1
+
+
+@pytest.mark.asyncio
+async def test_timed_out_generation_is_not_saved(pdf_file, fixed_downloader, fake_case_repo):
+    slow = _FakeClient("slow", delay=5)
+    router = ModelRouter(lambda model: slow, [RouteRule(name="all", model="slow", timeout_s=0.05)], default_model="slow")
+    abandoned = LLM_ABANDONED_CALLS.value("slow")
+    repo = fake_case_repo()
+
+    service = ExtractService(fixed_downloader(pdf_file(3, text_pages=0)), router, case_repository=repo)
+    out = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-SLOW"), debug=True)
+    slow._release.set()
+    assert "generation timeout" in out.debug["error"] and out.timeline == []
+    assert repo.saved == []  # the stored case is kept
+    assert LLM_ABANDONED_CALLS.value("slow") == abandoned + 1
+
+
+def test_long_documents_are_chunked_and_merged(pdf_file):
+    client = _FakeClient("pro")
+    rule = RouteRule(name="long", min_pages=5, model="pro", chunk_pages=3)
+    router = ModelRouter(lambda model: client, [rule], default_model="pro")
+
+    out = router.analyze_pdf(str(pdf_file(7)), "prompt")
+    assert client.calls == 3 and out["routing"]["chunks"] == 3
+    assert [(e.event_id, e.event_page_init, e.event_page_end) for e in out["timeline"]] == [(0, 1, 3), (1, 4, 6), (2, 7, 7)]
+    assert out["resume"] == "pro:3\n\npro:3\n\npro:1"
+    assert out["usage"] == {"total_token_count": 30}
+    assert out["raw_text"].count("--- pages from") == 3
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.application.extraction_models import Event, Evidence
+from src.application.page_ranges import check_page_ranges
+from src.infrastructure.metrics import PAGE_RANGE_FLAGS, PAGE_RANGE_ITEMS
+
+
+def _event(i, init, end):
+    return Event(event_id=i, event_name="e", event_description="", event_date="", event_page_init=init, event_page_end=end)
+
+
+def _evidence(i, init, end):
+    return Evidence(evidence_id=i, evidence_name="d", evidence_flaw="", evidence_page_init=init, evidence_page_end=end)
+
+
+def test_ranges_are_flagged_and_clamped():
+    timeline = [_event(0, 1, 3), _event(1, 5, 2), _event(2, 8, 40), _event(3, 0, 0), _event(4, 0, 4), _event(5, 6, 7)]
+    evidence = [_evidence(0, 12, 15), _evidence(1, 2, 2)]
+    page_chars = [900, 800, 700, 600, 500, 0, 0, 400, 300, 200]  # pages 6-7 have no text layer
+
+    report = check_page_ranges(timeline, evidence, 10, page_chars=page_chars)
+    assert (report.checked, report.flagged, report.repaired) == (8, 6, 4)
+    assert report.counts == {"missing": 1, "non_positive": 1, "inverted": 1, "beyond_document": 2, "blank_pages": 1}
+    assert [(e.event_page_init, e.event_page_end) for e in timeline] == [(1, 3), (2, 5), (8, 10), (0, 0), (4, 4), (6, 7)]
+    assert (evidence[0].evidence_page_init, evidence[0].evidence_page_end) == (10, 10)
+    assert report.as_dict()["items"][0] == {"kind": "timeline", "id": 1, "flags": ["inverted"], "pages": [5, 2], "clamped": [2, 5]}
+
+    flagged_only = [_event(0, 9, 30)]
+    report = check_page_ranges(flagged_only, [], 10, policy="flag")
+    assert flagged_only[0].event_page_end == 30 and report.repaired == 0
+    assert report.items[0]["suggested"] == [9, 10]
+    with pytest.raises(ValueError):
+        check_page_ranges([], [], 10, policy="drop")
+
+    class _Tagged(Event):
+        tag: str = ""
+
+    subclassed = [_Tagged(**_event(0, 12, 3).model_dump())]
+    assert check_page_ranges(subclassed, [], 10).counts["inverted"] == 1 and subclassed[0].event_page_end == 10
+
+
+def test_large_timelines_are_checked_in_one_pass():
+    timeline = [_event(i, i % 500 + 1, i % 500 + 3) for i in range(20_000)]
+    report = check_page_ranges(timeline, [], 500)
+    # Only the ranges running past page 500 (init 499 / 500) are touched
+    assert report.checked == 20_000 and report.counts["beyond_document"] == report.repaired == 80
+    assert len(report.items) == 50 and all(e.event_page_end <= 500 for e in timeline)
+
+
+class _Client:
+    model_name = "page-model-v2"
+
+    def analyze_pdf(self, file_path, prompt):
+        return {"resume": "r", "timeline": [_event(0, 2, 9).model_dump()], "evidence": [_evidence(0, 3, 1).model_dump()]}
+
+
+@pytest.mark.asyncio
+async def test_extraction_reports_bad_ranges_per_model(pdf_file, fixed_downloader, fake_case_repo):
+    repo = fake_case_repo()
+    items, beyond = PAGE_RANGE_ITEMS.value("page-model-v2"), PAGE_RANGE_FLAGS.value("page-model-v2", "beyond_document")
+    service = ExtractService(fixed_downloader(pdf_file(3)), _Client(), case_repository=repo)
+    response = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-PAGES"), debug=True)
+
+    assert response.debug["page_ranges"]["counts"] == {"inverted": 1, "beyond_document": 1}
+    assert PAGE_RANGE_ITEMS.value("page-model-v2") == items + 2
+    assert PAGE_RANGE_FLAGS.value("page-model-v2", "beyond_document") == beyond + 1
+    assert (repo.saved[0].timeline[0].event_page_init, repo.saved[0].timeline[0].event_page_end) == (2, 3)
+    assert (repo.saved[0].evidence[0].evidence_page_init, repo.saved[0].evidence[0].evidence_page_end) == (1, 3)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.synthetic import clean_output
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.infrastructure.case_repository import AsyncCaseRepository
+from src.infrastructure.gemini_client import GeminiClient
+from src.infrastructure.metrics import PDF_PREFLIGHT
+from src.infrastructure.models import Base
+from src.infrastructure.pdf_preflight import preflight_pdf
+from src.infrastructure.resilience import DeadlineExceeded, deadline_scope
+
+
+def test_coverage_decides_between_text_and_file(tmp_path, pdf_file):
+    digital = preflight_pdf(pdf_file(4))
+    assert (digital.profile.mode, digital.profile.reason, digital.profile.coverage) == ("text", "text_layer", 1.0)
+    assert digital.text.index("--- PAGE 1 ---") < digital.text.index("Peticao inicial fls. 4") and "--- PAGE 4 ---" in digital.text
+    assert len(digital.profile.page_chars) == 4 and digital.profile.as_dict()["pages"] == 4
+
+    scanned = preflight_pdf(pdf_file(10, text_pages=3))
+    assert (scanned.profile.mode, scanned.profile.reason, scanned.text) == ("file", "low_coverage", None)
+    assert scanned.profile.coverage == 0.3 and scanned.profile.page_chars[5] == 0
+    assert preflight_pdf(pdf_file(10, text_pages=9), min_coverage=0.9).profile.mode == "text"
+
+    before = PDF_PREFLIGHT.value("file", "too_many_pages")
+    long = preflight_pdf(pdf_file(6), max_pages=5).profile
+    assert (long.mode, long.pages, long.coverage) == ("file", 6, None)
+    assert PDF_PREFLIGHT.value("file", "too_many_pages") == before + 1
+    assert preflight_pdf(pdf_file(4), text_path=False).profile.reason == "disabled"
+
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4 /Type /Page /Type /Page")
+    assert (preflight_pdf(broken).profile.reason, preflight_pdf(broken).profile.pages) == ("unreadable", 2)
+
+    with deadline_scope(0.001):
+        time.sleep(0.002)
+        with pytest.raises(DeadlineExceeded) as info:
+            preflight_pdf(pdf_file(4))
+    assert info.value.stage == "preflight"
+
+
+def test_client_sends_text_inline_without_upload():
+    model = Mock()
+    model.generate_content.return_value = Mock(text=clean_output(1))
+    sdk = Mock()
+    sdk.GenerativeModel.return_value = model
+    with patch("src.infrastructure.gemini_client.genai", new=sdk):
+        out = GeminiClient(api_key="k", model="m").analyze_pdf("/tmp/x.pdf", "prompt", document_text="--- PAGE 1 ---\nabc")
+    assert len(out["timeline"]) == 1
+    assert model.generate_content.call_args.args[0] == [{"text": "--- PAGE 1 ---\nabc"}, {"text": "prompt"}]
+    sdk.upload_file.assert_not_called()
+
+
+@pytest_asyncio.fixture()
+async def case_repo():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as s:
+        yield AsyncCaseRepository(session=s)
+    await engine.dispose()
+
+
+class _TextClient:
+    model_name = "fake-model"
+    supports_text_input = True
+
+    def __init__(self):
+        self.document_text = "unset"
+
+    def analyze_pdf(self, file_path, prompt, *, document_text=None):
+        self.document_text = document_text
+        return {"resume": "r", "timeline": [], "evidence": []}
+
+
+@pytest.mark.asyncio
+async def test_profile_is_stored_with_the_case_and_picks_the_path(pdf_file, fixed_downloader, case_repo):
+    client = _TextClient()
+    service = ExtractService(fixed_downloader(pdf_file(3)), client, case_repository=case_repo)
+    response = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-PRE"), debug=True)
+    assert "--- PAGE 3 ---" in client.document_text
+    assert response.debug["pdf_profile"]["mode"] == "text"
+    stored = await case_repo.get_pdf_profile("CASE-PRE")
+    assert (stored["pages"], stored["mode"], stored["coverage"], len(stored["page_chars"])) == (3, "text", 1.0, 3)
+
+    service = ExtractService(fixed_downloader(pdf_file(4, text_pages=0)), client, case_repository=case_repo)
+    await service.extract(ExtractRequest(pdf_url="https://example.com/b.pdf", case_id="CASE-PRE"))
+    assert client.document_text is None  # scanned: uploaded as a file
+    assert (await case_repo.get_pdf_profile("CASE-PRE"))["reason"] == "low_coverage"
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import random
+from unittest.mock import Mock
+
+import pytest
+
+import src.infrastructure.gemini_client as gemini_module
+from src.infrastructure.replay_llm_client import (
+    RecordingGeminiClient,
+    ReplayGeminiClient,
+    load_cassette,
+    parse_latency,
+    sha256_file,
+)
+from src.infrastructure.settings import get_settings
+
+RAW = json.dumps(
+    {
+        "resume": "Recorded",
+        "timeline": [
+            {
+                "event_id": 1,
+                "event_name": "Petition",
+                "event_description": "Filed",
+                "event_date": "2024-01-01",
+                "event_page_init": 1,
+                "event_page_end": 2,
+            }
+        ],
+        "evidence": [],
+    }
+)
+
+
+@pytest.fixture()
+def pdf(tmp_path):
+    path = tmp_path / "case.pdf"
+    path.write_bytes(b"%PDF-1.4 replay")
+    return path
+
+
+def _entry(**overrides):
+    entry = {"raw_text": RAW, "latency_ms": 40.0, "pdf_sha256": None}
+    entry.update(overrides)
+    return entry
+
+
+def test_recording_client_appends_to_cassette(monkeypatch, tmp_path, pdf):
+    fake_sdk = Mock()
+    fake_sdk.upload_file.return_value = Mock(state=Mock(name="ACTIVE"))
+    fake_sdk.GenerativeModel.return_value.generate_content.return_value = Mock(text=RAW)
+    monkeypatch.setattr(gemini_module, "genai", fake_sdk)
+
+    cassette = tmp_path / "c.jsonl"
+    client = RecordingGeminiClient(api_key="k", model="gemini-test", cassette_path=cassette)
+    result = client.analyze_pdf(str(pdf), prompt="p")
+
+    assert result["resume"] == "Recorded"
+    entries = load_cassette(cassette)
+    assert len(entries) == 1
+    assert entries[0]["raw_text"] == RAW
+    assert entries[0]["model"] == "gemini-test"
+    assert entries[0]["pdf_bytes"] == pdf.stat().st_size
+
+
+def test_replay_parses_and_validates(pdf):
+    sleeps = []
+    client = ReplayGeminiClient([_entry()], latency="recorded:0.5", seed=1, sleep=sleeps.append)
+    result = client.analyze_pdf(str(pdf), prompt="p")
+    assert result["resume"] == "Recorded"
+    assert result["timeline"][0].event_name == "Petition"
+    assert "validation_error" not in result
+    assert sleeps == [pytest.approx(0.02)]
+
+
+def test_replay_prefers_entry_for_same_pdf(pdf):
+    other = _entry(raw_text=RAW.replace("Recorded", "Other"))
+    match = _entry(pdf_sha256=sha256_file(str(pdf)))
+    client = ReplayGeminiClient([other, match], latency="fixed:0", sleep=lambda _s: None)
+    assert client.analyze_pdf(str(pdf), prompt="p")["resume"] == "Recorded"
+
+
+def test_replay_injects_rate_limit(pdf):
+    client = ReplayGeminiClient([_entry()], latency="fixed:0", rate_limit_rate=1.0, sleep=lambda _s: None)
+    result = client.analyze_pdf(str(pdf), prompt="p")
+    assert result["validation_error"] is True
+    assert result["resume"].startswith("(generation error) 429")
+
+
+def test_parse_latency_specs():
+    rng = random.Random(0)
+    assert parse_latency("fixed:250", rng)(None) == 0.25
+    assert parse_latency("recorded", rng)(100.0) == 0.1
+    assert 0.1 <= parse_latency("uniform:100,200", rng)(None) <= 0.2
+    assert parse_latency("normal:0,1", rng)(None) >= 0
+    assert parse_latency("lognormal:500,0.3", rng)(None) > 0
+    with pytest.raises(ValueError):
+        parse_latency("bogus:1", rng)
+
+
+def test_get_gemini_client_replay_mode(monkeypatch, tmp_path):
+    cassette = tmp_path / "c.jsonl"
+    cassette.write_text(json.dumps(_entry()) + "\n")
+    monkeypatch.setenv("LLM_CLIENT_MODE", "replay")
+    monkeypatch.setenv("LLM_CASSETTE_PATH", str(cassette))
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr(gemini_module, "_replay_singleton", None)
+    get_settings.cache_clear()
+    try:
+        client = gemini_module.get_gemini_client()
+        assert isinstance(client, ReplayGeminiClient)
+        assert gemini_module.get_gemini_client() is client
+    finally:
+        get_settings.cache_clear()
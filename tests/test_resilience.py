@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from benchmarks.synthetic import clean_output
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.infrastructure.gemini_client import GeminiClient, get_gemini_client
+from src.infrastructure.pdf_downloader import get_pdf_downloader
+from src.infrastructure.metrics import DEADLINES_EXCEEDED, LLM_HEDGES, LLM_RETRIES
+from src.infrastructure.replay_llm_client import RateLimitError, ReplayError, ReplayGeminiClient
+from src.infrastructure.resilience import (
+    DeadlineExceeded,
+    RetryPolicy,
+    call_with_retry,
+    deadline_scope,
+    is_retryable,
+    latency_window,
+    remaining,
+    remaining_or,
+)
+from src.main import app
+
+
+def _sdk(model):
+    sdk = Mock()
+    sdk.GenerativeModel.return_value = model
+    return sdk
+
+
+def test_retry_classification_and_deadline_scopes():
+    assert is_retryable(RateLimitError("429 quota")) and is_retryable(ReplayError("503 unavailable"))
+    assert is_retryable(type("ServiceUnavailable", (Exception,), {})("x"))
+    assert not is_retryable(ValueError("bad schema")) and not is_retryable(DeadlineExceeded("generation"))
+
+    sleeps, calls = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ReplayError("503 The service is currently unavailable.")
+        return "ok"
+
+    assert call_with_retry(flaky, RetryPolicy(attempts=3), stage="generation", sleep=sleeps.append) == "ok"
+    assert len(sleeps) == 2 and all(0 <= s <= 1.0 for s in sleeps)
+    with pytest.raises(ValueError):
+        call_with_retry(Mock(side_effect=ValueError("no")), RetryPolicy(attempts=5), stage="generation", sleep=sleeps.append)
+
+    assert remaining() is None and remaining_or(5.0) == 5.0
+    with deadline_scope(10) as outer:
+        with deadline_scope(60) as inner:  # nested scopes never extend the deadline
+            assert inner is outer and remaining() <= 10 and remaining_or(60.0) <= 10
+        with deadline_scope(0.001):
+            time.sleep(0.002)
+            with pytest.raises(DeadlineExceeded):
+                call_with_retry(lambda: "never", RetryPolicy(), stage="upload")
+
+
+def test_generation_retries_transient_errors_within_deadline():
+    model = Mock()
+    model.generate_content.side_effect = [RateLimitError("429 quota"), ReplayError("503 busy"), Mock(text=clean_output(2))]
+    client = GeminiClient(api_key="k", model="retry-model")
+    client.retry_policy = RetryPolicy(attempts=3, backoff_base=0.001)
+    retries = LLM_RETRIES.value("generation")
+    with patch("src.infrastructure.gemini_client.genai", new=_sdk(model)), deadline_scope(30):
+        out = client.analyze_pdf("/tmp/x.pdf", "prompt")
+    assert len(out["timeline"]) == 2 and "validation_error" not in out
+    assert LLM_RETRIES.value("generation") == retries + 2
+    timeout = model.generate_content.call_args.kwargs["request_options"]["timeout"]
+    assert 0 < timeout <= 30
+
+
+def test_slow_generation_is_hedged():
+    release = threading.Event()
+    calls = []
+
+    def generate(contents, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)  # the straggler
+            return Mock(text=clean_output(1))
+        return Mock(text=clean_output(3))
+
+    model = Mock()
+    model.generate_content.side_effect = generate
+    window = latency_window("hedge-model")
+    for _ in range(20):
+        window.observe(0.01)
+    client = GeminiClient(api_key="k", model="hedge-model")
+    client.retry_policy = RetryPolicy(hedge_percentile=0.95, hedge_min_samples=20)
+    won = LLM_HEDGES.value("won")
+    start = time.perf_counter()
+    with patch("src.infrastructure.gemini_client.genai", new=_sdk(model)):
+        out = client.analyze_pdf("/tmp/x.pdf", "prompt")
+    release.set()
+    assert time.perf_counter() - start < 2
+    assert len(out["timeline"]) == 3 and LLM_HEDGES.value("won") == won + 1
+
+
+@pytest.mark.asyncio
+async def test_extraction_deadline_stops_slow_generation(tmp_path, fixed_downloader, fake_case_repo):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    client = ReplayGeminiClient([{"raw_text": clean_output(2), "latency_ms": 5000}], sleep=time.sleep)
+    repo = fake_case_repo(error=AssertionError("timed-out extractions must not be persisted"))
+    service = ExtractService(fixed_downloader(pdf), client, case_repository=repo)
+    before = DEADLINES_EXCEEDED.value("generation")
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded) as info:
+        await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-DEADLINE", timeout_s=0.2))
+    assert info.value.stage == "generation"
+    assert time.perf_counter() - start < 1.5
+    assert DEADLINES_EXCEEDED.value("generation") == before + 1
+
+
+def test_extract_endpoint_returns_504_on_deadline(client, tmp_path, fixed_downloader):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    replay = ReplayGeminiClient([{"raw_text": clean_output(2), "latency_ms": 5000}], sleep=time.sleep)
+    app.dependency_overrides[get_gemini_client] = lambda: replay
+    app.dependency_overrides[get_pdf_downloader] = lambda: fixed_downloader(pdf)
+    try:
+        resp = client.post("/extract", json={"pdf_url": "https://example.com/a.pdf", "case_id": "CASE-504", "timeout_s": 0.1})
+    finally:
+        app.dependency_overrides.pop(get_gemini_client, None)
+        app.dependency_overrides.pop(get_pdf_downloader, None)
+    assert resp.status_code == 504
+    assert resp.json()["detail"] == "deadline exceeded before generation"
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+from benchmarks.synthetic import make_extraction_dict
+from src.application.extraction_models import CaseExtraction
+from src.infrastructure import responses
+from src.infrastructure.case_repository import get_async_case_repository
+from src.main import app
+
+
+class _FakeRepo:
+    def __init__(self, extraction: CaseExtraction):
+        self.extraction = extraction
+
+    async def get_case(self, case_id):
+        return self.extraction if case_id == "BIG-CASE" else None
+
+    async def list_case_summaries(self, limit=50, offset=0):
+        return [("BIG-CASE", self.extraction.resume)]
+
+
+def test_accept_encoding_negotiation(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert responses.choose_encoding("gzip, deflate") == "gzip"
+    assert responses.choose_encoding("br;q=1.0, gzip;q=0.5") == "gzip"  # brotli not installed
+    assert responses.choose_encoding("gzip;q=0") is None
+    assert responses.choose_encoding("*") == "gzip"
+    assert responses.choose_encoding("identity") is None
+    assert responses.choose_encoding(None) is None
+
+    monkeypatch.setattr(responses, "brotli", object())
+    assert responses.choose_encoding("gzip;q=0.5, br") == "br"
+    assert responses.choose_encoding("gzip, br;q=0.1") == "gzip"
+
+
+def test_case_endpoints_serialize_and_compress(client):
+    data = make_extraction_dict(500)
+    app.dependency_overrides[get_async_case_repository] = lambda: _FakeRepo(CaseExtraction(**data))
+    try:
+        plain = client.get("/cases/BIG-CASE", headers={"Accept-Encoding": "identity"})
+        packed = client.get("/cases/BIG-CASE", headers={"Accept-Encoding": "gzip"})
+        listing = client.get("/cases", headers={"Accept-Encoding": "gzip"})
+        missing = client.get("/cases/OTHER")
+    finally:
+        app.dependency_overrides.pop(get_async_case_repository, None)
+
+    assert plain.status_code == 200 and "content-encoding" not in plain.headers
+    body = plain.json()
+    assert body["case_id"] == "BIG-CASE"
+    assert body["timeline"] == data["timeline"] and body["evidence"] == data["evidence"]
+
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.headers["vary"] == "Accept-Encoding"
+    assert int(packed.headers["content-length"]) < len(plain.content) // 4
+    assert packed.json() == body  # httpx decodes transparently
+
+    # Small payloads are never compressed
+    assert "content-encoding" not in listing.headers
+    assert listing.json() == {"items": [{"case_id": "BIG-CASE", "resume": data["resume"]}], "count": 1, "limit": 50, "offset": 0}
+    assert missing.status_code == 404
+
+
+def test_compress_roundtrip():
+    body = json.dumps(make_extraction_dict(50)).encode()
+    assert gzip.decompress(responses.compress(body, "gzip")) == body
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from benchmarks.synthetic import clean_output
+from src.infrastructure.auth import key_id
+from src.infrastructure.gemini_client import get_gemini_client
+from src.infrastructure.job_repository import get_async_job_repository
+from src.infrastructure.pdf_downloader import get_pdf_downloader
+from src.infrastructure.replay_llm_client import ReplayGeminiClient
+from src.infrastructure.resilience import DeadlineExceeded, deadline_scope
+from src.infrastructure.scheduler import LaneScheduler, parse_lane_capacity
+from src.main import app
+
+
+async def _run(scheduler, lane, key, order, hold=0.0):
+    async with scheduler.slot(lane, key):
+        order.append(f"{lane}:{key}")
+        await asyncio.sleep(hold)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_higher_lanes_go_first_and_keys_share_a_lane():
+    scheduler = LaneScheduler(capacity=1)
+    order: list[str] = []
+    blocker = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("bulk", "A"):
+            await blocker.wait()
+
+    holder = asyncio.create_task(hold())
+    await _settle()
+    tasks = [asyncio.create_task(_run(scheduler, "bulk", "A", order)) for _ in range(3)]
+    await _settle()
+    tasks += [asyncio.create_task(_run(scheduler, "bulk", "B", order)) for _ in range(2)]
+    tasks.append(asyncio.create_task(_run(scheduler, "async", "C", order)))
+    tasks.append(asyncio.create_task(_run(scheduler, "interactive", "D", order)))
+    await _settle()
+    assert scheduler.stats()["lanes"]["bulk"]["queued"] == 5 and order == []
+
+    blocker.set()
+    await asyncio.gather(holder, *tasks)
+    # Priority first; within bulk, tenant B is not stuck behind A's backlog
+    assert order == ["interactive:D", "async:C", "bulk:A", "bulk:B", "bulk:A", "bulk:B", "bulk:A"]
+    assert scheduler.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lane_capacity_and_queue_deadline():
+    scheduler = LaneScheduler(capacity=2, lane_capacity=parse_lane_capacity("bulk=1"))
+    order: list[str] = []
+    bulk = [asyncio.create_task(_run(scheduler, "bulk", key, order, hold=0.05)) for key in ("A", "B")]
+    await _settle()
+    assert scheduler.stats()["lanes"]["bulk"] == {"capacity": 1, "running": 1, "queued": 1, "keys_waiting": 1}
+
+    # The free slot is kept for higher lanes
+    await _run(scheduler, "interactive", "C", order)
+    assert order == ["bulk:A", "interactive:C"]
+    await asyncio.gather(*bulk)
+
+    async with scheduler.slot("interactive", "A"), scheduler.slot("interactive", "B"):
+        with deadline_scope(0.05), pytest.raises(DeadlineExceeded) as info:
+            await _run(scheduler, "interactive", "C", order)
+        assert info.value.stage == "queue" and scheduler.stats()["lanes"]["interactive"]["queued"] == 0
+
+    with pytest.raises(ValueError):
+        parse_lane_capacity("realtime=3")
+
+
+class _JobRepo:
+    def __init__(self):
+        self.created, self.statuses = [], []
+
+    async def create_job(self, job_id, case_id, callback_url, *, lane="async", api_key_id=None):
+        self.created.append((lane, api_key_id))
+
+    async def mark_running(self, job_id):
+        self.statuses.append("running")
+
+    async def mark_success(self, job_id):
+        self.statuses.append("completed")
+
+    async def mark_error(self, job_id, message):
+        self.statuses.append(f"failed: {message}")
+
+
+def test_bulk_job_records_lane_and_key(client, tmp_path, fixed_downloader):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    repo = _JobRepo()
+    app.dependency_overrides[get_async_job_repository] = lambda: repo
+    app.dependency_overrides[get_gemini_client] = lambda: ReplayGeminiClient([{"raw_text": clean_output(1)}])
+    app.dependency_overrides[get_pdf_downloader] = lambda: fixed_downloader(pdf)
+    try:
+        resp = client.post(
+            "/extract/async",
+            json={"pdf_url": "https://example.com/a.pdf", "case_id": "CASE-BULK-1", "lane": "bulk"},
+        )
+    finally:
+        for dep in (get_async_job_repository, get_gemini_client, get_pdf_downloader):
+            app.dependency_overrides.pop(dep, None)
+    assert resp.status_code == 200 and resp.json()["lane"] == "bulk"
+    assert repo.created == [("bulk", key_id("test-key"))]
+    assert repo.statuses == ["running", "completed"]
+    assert client.get("/metrics/scheduler").json()["lanes"]["bulk"]["capacity"] == 2
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, inspect
+
+from src.infrastructure.migrations import ALEMBIC_INI, StartupReport, check_and_migrate, head_revisions
+
+
+def test_head_revision_matches_alembic():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    assert head_revisions() == frozenset(ScriptDirectory.from_config(cfg).get_heads())
+
+
+def test_check_and_migrate_flow(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'schema.db'}", future=True)
+
+    report = StartupReport()
+    assert check_and_migrate(engine, migrate=False, report=report) == "outdated"
+    assert not inspect(engine).has_table("cases")
+
+    report = StartupReport()
+    assert check_and_migrate(engine, migrate=True, report=report) == "migrated"
+    assert {"cases", "timeline_events", "evidences", "extraction_jobs"} <= set(inspect(engine).get_table_names())
+    assert "migrate" in report.phases
+
+    # Second boot: fast path only, no migration phase
+    report = StartupReport()
+    assert check_and_migrate(engine, migrate=True, report=report) == "current"
+    assert set(report.phases) == {"head_revision", "schema_check"}
+    assert report.as_dict()["outcome"] == "current"
+    engine.dispose()
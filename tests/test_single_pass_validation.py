@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import copy
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from benchmarks.synthetic import make_extraction_dict
+from src.application.extract_service import ExtractRequest, ExtractResponse, ExtractService
+from src.application.extraction_models import Event, Evidence, validate_items
+from src.infrastructure.gemini_client import GeminiClient
+from src.infrastructure.metrics import VALIDATION_ERRORS
+
+
+def test_validate_items_passes_models_through_and_drops_invalid():
+    data = make_extraction_dict(3)
+    events, dropped = validate_items(data["timeline"], Event)
+    assert dropped == 0 and all(isinstance(e, Event) for e in events)
+
+    again, _ = validate_items(events, Event)
+    assert all(a is b for a, b in zip(again, events))
+
+    data["timeline"][1]["event_page_init"] = "not-a-page"
+    events, dropped = validate_items(data["timeline"], Event)
+    assert dropped == 1 and [e.event_id for e in events] == [0, 2]
+    assert validate_items(None, Evidence) == ([], 0)
+
+
+def test_client_returns_typed_models_and_flags_dropped_items():
+    client = GeminiClient(api_key="dummy", model="m")
+    parsed = make_extraction_dict(4, 2)
+    out = client._finalize_parsed(copy.deepcopy(parsed), raw_text="")
+    assert all(isinstance(e, Event) for e in out["timeline"])
+    assert all(isinstance(e, Evidence) for e in out["evidence"])
+    assert "validation_error" not in out
+
+    parsed["evidence"][0]["evidence_page_end"] = None
+    out = client._finalize_parsed(parsed, raw_text="")
+    assert out["validation_error"] is True
+    assert len(out["timeline"]) == 4 and len(out["evidence"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_service_passes_client_models_through(tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    downloader = Mock()
+    downloader.download.return_value = pdf
+    typed = GeminiClient(api_key="dummy", model="m")._finalize_parsed(make_extraction_dict(5, 3), raw_text="")
+    gemini = Mock()
+    gemini.analyze_pdf.return_value = typed
+    repo = AsyncMock()
+
+    service = ExtractService(downloader, gemini, case_repository=repo)
+    result = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-1"), debug=False)
+
+    assert all(a is b for a, b in zip(result.timeline, typed["timeline"]))
+    saved = repo.save_extraction.await_args.args[1]
+    assert saved.timeline[0] is typed["timeline"][0]
+    assert saved.evidence[2] is typed["evidence"][2]
+
+
+@pytest.mark.asyncio
+async def test_model_errors_keep_the_response_schema(tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    downloader = Mock()
+    downloader.download.return_value = pdf
+    gemini = Mock()
+    gemini.analyze_pdf.side_effect = RuntimeError("quota exhausted")
+
+    repo = AsyncMock()
+    service = ExtractService(downloader, gemini, case_repository=repo)
+    result = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-1"), debug=True)
+    assert result.timeline == [] and result.debug["error"] == "quota exhausted"
+    assert ExtractResponse.model_validate(result.model_dump()) == result
+    repo.save_extraction.assert_not_awaited()  # the stored case is kept
+
+
+@pytest.mark.asyncio
+async def test_items_dropped_by_the_service_count_as_validation_errors(tmp_path):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    downloader = Mock()
+    downloader.download.return_value = pdf
+    data = make_extraction_dict(3, 1)
+    data["timeline"][1]["event_page_init"] = "not-a-page"
+    gemini = Mock(spec=["analyze_pdf"])
+    gemini.analyze_pdf.return_value = data
+    errors = VALIDATION_ERRORS.value()
+
+    service = ExtractService(downloader, gemini, case_repository=AsyncMock())
+    result = await service.extract(ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-1"), debug=True)
+    assert [e.event_id for e in result.timeline] == [0, 2]
+    assert result.debug["validation_error"] is True
+    assert VALIDATION_ERRORS.value() == errors + 1
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.infrastructure.tracing import (
+    FileExporter,
+    InMemoryExporter,
+    SpanContext,
+    configure_tracing,
+    inject_headers,
+    span,
+    use_context,
+)
+from src.infrastructure.pdf_downloader import get_pdf_downloader
+from src.infrastructure.gemini_client import get_gemini_client
+
+
+@pytest.fixture()
+def exporter():
+    exp = InMemoryExporter()
+    configure_tracing(exp)
+    yield exp
+    configure_tracing(None)
+
+
+def test_spans_nest_and_propagate(exporter):
+    with span("parent") as parent:
+        with span("child", rows=3):
+            headers = inject_headers()
+    child = exporter.by_name("child")[0]
+    assert child.parent_id == parent.context.span_id
+    assert child.context.trace_id == parent.context.trace_id
+    assert child.attributes["rows"] == 3
+    ctx = SpanContext.from_traceparent(headers["traceparent"])
+    assert ctx.span_id == child.context.span_id
+
+    # Background jobs re-attach a captured context
+    with use_context(parent.context), span("job"):
+        pass
+    assert exporter.by_name("job")[0].parent_id == parent.context.span_id
+
+
+def test_disabled_tracing_is_noop():
+    configure_tracing(None)
+    with span("ignored") as sp:
+        sp.set_attribute("k", "v")
+        assert inject_headers() == {}
+
+
+def test_file_exporter_writes_jsonl(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(FileExporter(str(path)))
+    try:
+        with span("offline", **{"gemini.model": "m"}):
+            pass
+    finally:
+        configure_tracing(None)
+    record = json.loads(path.read_text().strip())
+    assert record["name"] == "offline"
+    assert record["attributes"]["gemini.model"] == "m"
+
+
+def test_extract_request_produces_pipeline_spans(exporter, tmp_path):
+    pdf = tmp_path / "t.pdf"
+    pdf.write_bytes(b"%PDF-1.4 <</Type /Page>>")
+    downloader = Mock()
+    downloader.download.return_value = pdf
+    gemini = Mock()
+    gemini.analyze_pdf.return_value = {"resume": "r", "timeline": [], "evidence": []}
+
+    app.dependency_overrides[get_pdf_downloader] = lambda: downloader
+    app.dependency_overrides[get_gemini_client] = lambda: gemini
+    try:
+        resp = TestClient(app).post(
+            "/extract",
+            json={"pdf_url": "https://example.com/a.pdf", "case_id": "CASE-TRACE"},
+            headers={"traceparent": "00-" + "a" * 32 + "-" + "b" * 16 + "-01"},
+        )
+    finally:
+        app.dependency_overrides.pop(get_pdf_downloader, None)
+        app.dependency_overrides.pop(get_gemini_client, None)
+    assert resp.status_code == 200
+
+    names = {s.name for s in exporter.spans}
+    assert {"POST /extract", "extract", "extract.download", "extract.llm", "extract.persist"} <= names
+    root = exporter.by_name("extract")[0]
+    assert root.context.trace_id == "a" * 32
+    assert root.attributes["pdf.bytes"] == pdf.stat().st_size
+    assert root.attributes["pdf.pages"] == 1
+    server = exporter.by_name("POST /extract")[0]
+    assert server.parent_id == "b" * 16
+    assert server.attributes["http.route"] == "/extract"
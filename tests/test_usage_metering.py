@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.application.extract_service import ExtractRequest, ExtractService
+from src.infrastructure.auth import ApiKeyIdentity, require_api_key
+from src.infrastructure.metering import UsageMeter
+from src.infrastructure.metrics import USAGE_EVENTS
+from src.infrastructure.models import Base
+from src.infrastructure.usage_repository import AsyncUsageRepository, UsageRecord, get_async_usage_repository
+from src.main import app
+
+DAY1 = datetime(2024, 5, 1, 23, 30, tzinfo=timezone.utc)
+DAY2 = datetime(2024, 5, 2, 0, 30, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture()
+async def repo():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as s:
+        yield AsyncUsageRepository(session=s)
+    await engine.dispose()
+
+
+def _record(key, at, tokens=100, outcome="ok"):
+    r = UsageRecord(api_key_id=key, case_id="CASE-1", created_at=at, outcome=outcome, pdf_bytes=1000, pdf_pages=10)
+    r.add_usage({"prompt_token_count": tokens, "candidates_token_count": 10, "total_token_count": tokens + 10})
+    r.stage_ms["llm"] = 50
+    return r
+
+
+@pytest.mark.asyncio
+async def test_batches_roll_up_per_key_and_day(repo):
+    meter = UsageMeter(repo, batch_size=2)
+    for record in [_record("a", DAY1), _record("a", DAY1, outcome="error"), _record("a", DAY2), _record("b", DAY2)]:
+        meter.record(record)
+    assert await meter.flush() == 4 and meter.pending == 0
+    meter.record(_record("a", DAY1, tokens=1000))
+    await meter.close()  # shutdown flush
+
+    rows = {(r["api_key_id"], r["day"]): r for r in await repo.daily()}
+    assert set(rows) == {("a", "2024-05-01"), ("a", "2024-05-02"), ("b", "2024-05-02")}
+    a1 = rows[("a", "2024-05-01")]
+    assert (a1["extractions"], a1["failed"], a1["pdf_pages"], a1["prompt_tokens"], a1["llm_ms"]) == (3, 1, 30, 1200, 150)
+    assert [r["api_key_id"] for r in await repo.daily(api_key_id="b")] == ["b"]
+
+
+class _FailingRepo:
+    async def write(self, records):
+        raise ConnectionError("db down")
+
+
+@pytest.mark.asyncio
+async def test_bounded_buffer_keeps_failed_batches():
+    meter = UsageMeter(_FailingRepo(), batch_size=2, max_pending=3)
+    dropped = USAGE_EVENTS.value("dropped")
+    assert [meter.record(_record("a", DAY1)) for _ in range(4)] == [True, True, True, False]
+    assert await meter.flush() == 0 and meter.pending == 3
+    assert USAGE_EVENTS.value("dropped") == dropped + 1
+
+
+class _Client:
+    model_name = "fake-model"
+
+    def analyze_pdf(self, file_path, prompt):
+        return {"resume": "r", "timeline": [], "evidence": [], "usage": {"prompt_token_count": 7, "total_token_count": 9}}
+
+
+@pytest.mark.asyncio
+async def test_extraction_is_metered_and_usage_endpoint_is_scoped(tmp_path, repo, fixed_downloader, fake_case_repo):
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 /Type /Page")
+    meter = UsageMeter(repo, flush_interval=3600)
+    meter.start()
+    service = ExtractService(fixed_downloader(pdf), _Client(), case_repository=fake_case_repo(), meter=meter)
+    request = ExtractRequest(pdf_url="https://example.com/a.pdf", case_id="CASE-METER")
+    await service.extract(request, api_key_id="tenant-a")
+    record = meter._buffer[0]  # periodic flush running: the request does not write
+    assert (record.api_key_id, record.model, record.prompt_tokens, record.total_tokens) == ("tenant-a", "fake-model", 7, 9)
+    assert (record.pdf_bytes, record.pdf_pages) == (pdf.stat().st_size, 1)
+    assert {"download", "llm", "persistence"} <= set(record.stage_ms)
+    await meter.close()
+
+    # No lifespan (Lambda): the request writes its own record before returning
+    await service.extract(request, api_key_id="tenant-a")
+    assert meter.pending == 0 and not meter.running
+    await repo.write([_record("tenant-b", datetime.now(timezone.utc))])
+
+    app.dependency_overrides[get_async_usage_repository] = lambda: repo
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            everything = (await client.get("/usage", params={"start": "2000-01-01"})).json()  # API_KEYS (operator) key
+            assert set(everything["totals"]) == {"tenant-a", "tenant-b"}
+            assert everything["totals"]["tenant-a"]["prompt_tokens"] == 14
+            app.dependency_overrides[require_api_key] = lambda: ApiKeyIdentity(key_id="tenant-b", name="b", source="db")
+            own = (await client.get("/usage")).json()
+            assert list(own["totals"]) == ["tenant-b"] and own["count"] == 1
+            assert (await client.get("/usage", params={"api_key_id": "tenant-a"})).status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_async_usage_repository, None)